@@ -0,0 +1,131 @@
+import ast
+import hashlib
+import json
+import os
+
+"""
+Module: artifact_cache.py
+Purpose: Content-hash cache for incremental Atlas builds.
+         A task key hashes the script source, every local module it imports
+         (transitively, e.g. physics_engine.py), its CLI args and the keys of
+         its dependencies. Keys and artifact hashes are stored in a JSON manifest;
+         a task whose key is unchanged and whose artifacts are intact is skipped.
+"""
+
+MANIFEST_FILE = ".atlas_manifest.json"
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _imported_names(path):
+    """Top-level module names imported by a script ('modules.x' and 'from modules import x' -> 'x')."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                parts = alias.name.split(".")
+                names.add(parts[1] if parts[0] == "modules" and len(parts) > 1 else parts[0])
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            parts = node.module.split(".")
+            if parts[0] == "modules":
+                if len(parts) > 1:
+                    names.add(parts[1])
+                else:
+                    names.update(alias.name for alias in node.names)
+            else:
+                names.add(parts[0])
+    return names
+
+
+def local_sources(script, root):
+    """
+    The script plus all repository modules it imports, transitively.
+    Third-party imports (numpy, scipy, ...) are ignored.
+    """
+    search_dirs = [os.path.join(root, "modules"), os.path.join(root, "modules", "experiments"), root]
+    seen = set()
+    stack = [os.path.join(root, script)]
+
+    while stack:
+        path = os.path.normpath(stack.pop())
+        if path in seen or not os.path.exists(path):
+            continue
+        seen.add(path)
+        for name in _imported_names(path):
+            for d in search_dirs:
+                candidate = os.path.join(d, name + ".py")
+                if os.path.exists(candidate):
+                    stack.append(candidate)
+                    break
+    return sorted(seen)
+
+
+def task_key(task, root, dep_keys):
+    """Hash of sources, args and dependency keys for one task."""
+    h = hashlib.sha256()
+    for path in local_sources(task.script, root):
+        h.update(os.path.relpath(path, root).replace(os.sep, "/").encode())
+        h.update(file_digest(path).encode())
+    h.update(json.dumps(task.args).encode())
+    for key in dep_keys:
+        h.update(key.encode())
+    return h.hexdigest()
+
+
+def compute_keys(tasks, root):
+    """Keys for all tasks, dependencies first (tasks must be in topological order)."""
+    keys = {}
+    for t in tasks:
+        keys[t.name] = task_key(t, root, [keys[d] for d in t.deps])
+    return keys
+
+
+class ArtifactCache:
+    def __init__(self, root, manifest_file=MANIFEST_FILE):
+        self.root = root
+        self.path = os.path.join(root, manifest_file)
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                print(f"   -> WARNING: Ignoring unreadable cache manifest '{self.path}'.")
+                self.entries = {}
+
+    def is_fresh(self, name, key):
+        """True if the stored key matches and every recorded artifact is unchanged on disk."""
+        entry = self.entries.get(name)
+        if not entry or entry.get("key") != key:
+            return False
+        for rel_path, digest in entry.get("artifacts", {}).items():
+            path = os.path.join(self.root, rel_path)
+            if not os.path.exists(path) or file_digest(path) != digest:
+                return False
+        return True
+
+    def record(self, name, key, artifact_paths):
+        self.entries[name] = {
+            "key": key,
+            "artifacts": {
+                os.path.relpath(p, self.root).replace(os.sep, "/"): file_digest(p)
+                for p in artifact_paths if os.path.exists(p)
+            },
+        }
+
+    def invalidate(self, name):
+        self.entries.pop(name, None)
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
@@ -0,0 +1,187 @@
+import os
+import hashlib
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+"""
+Module: asset_optimizer.py
+Purpose: Optimization stage for report media before embedding.
+         - PNG/JPG: downscale to the card width, quantize to a 256-color palette
+         - GIF:     convert to MP4 (ffmpeg) or animated WebP (Pillow), downscaled
+         - MP4:     re-encode at card width with H.264 (only if ffmpeg is available)
+         Artifacts are processed in parallel. Results are cached under a name derived from
+         the source content hash and the optimization settings, so unchanged media is never
+         processed twice. If an optimized file is not smaller, the original is kept.
+"""
+
+# The visual card shows media at ~550 px (55% of a 1000 px page); 2x for HiDPI screens
+CARD_WIDTH_PX = 1100
+PALETTE_COLORS = 256
+VIDEO_CRF = 30
+
+OPTIMIZER_VERSION = "1"
+
+def _content_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _settings_tag(max_width, use_ffmpeg):
+    raw = f"{OPTIMIZER_VERSION}|{max_width}|{PALETTE_COLORS}|{VIDEO_CRF}|{use_ffmpeg}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:8]
+
+def _scaled_size(size, max_width):
+    w, h = size
+    if w <= max_width:
+        return size
+    return max_width, max(1, round(h * max_width / w))
+
+def _even(size):
+    # H.264 (yuv420p) needs even dimensions
+    return size[0] - size[0] % 2, size[1] - size[1] % 2
+
+
+def optimize_still(src, dest, max_width):
+    """Downscale + palette quantization. Returns the written path."""
+    from PIL import Image
+
+    with Image.open(src) as img:
+        img = img.convert("RGBA") if img.mode in ("RGBA", "LA", "P") else img.convert("RGB")
+        size = _scaled_size(img.size, max_width)
+        if size != img.size:
+            img = img.resize(size, Image.LANCZOS)
+        method = Image.Quantize.FASTOCTREE if img.mode == "RGBA" else Image.Quantize.MEDIANCUT
+        img = img.quantize(colors=PALETTE_COLORS, method=method)
+        img.save(dest, format="PNG", optimize=True)
+    return dest
+
+def optimize_gif_webp(src, dest, max_width):
+    """Animated GIF -> animated WebP (lossy), keeping frame durations."""
+    from PIL import Image, ImageSequence
+
+    with Image.open(src) as img:
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(img):
+            f = frame.convert("RGBA")
+            size = _scaled_size(f.size, max_width)
+            if size != f.size:
+                f = f.resize(size, Image.LANCZOS)
+            frames.append(f)
+            durations.append(frame.info.get("duration", img.info.get("duration", 33)))
+        frames[0].save(dest, format="WEBP", save_all=True, append_images=frames[1:],
+                       duration=durations, loop=0, quality=70, method=4)
+    return dest
+
+def transcode_video(src, dest, max_width, ffmpeg):
+    """GIF/MP4 -> H.264 MP4 at card width (silent, faststart for quick browser start)."""
+    from PIL import Image
+
+    # Probe the size via Pillow for GIFs; for MP4 let ffmpeg keep the aspect ratio
+    if src.lower().endswith(".gif"):
+        with Image.open(src) as img:
+            w, h = _even(_scaled_size(img.size, max_width))
+        scale = f"scale={w}:{h}"
+    else:
+        scale = f"scale='min({max_width},iw)':-2"
+
+    cmd = [ffmpeg, "-y", "-loglevel", "error", "-i", src, "-vf", scale, "-an",
+           "-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", str(VIDEO_CRF),
+           "-movflags", "+faststart", dest]
+    subprocess.run(cmd, check=True)
+    return dest
+
+
+def _plan(src, use_ffmpeg):
+    """(output extension, output mime, function) for a source file, or None to keep it."""
+    ext = os.path.splitext(src)[1].lower()
+    if ext in (".png", ".jpg", ".jpeg"):
+        return ".png", "image/png", "still"
+    if ext == ".gif":
+        return (".mp4", "video/mp4", "video") if use_ffmpeg else (".webp", "image/webp", "webp")
+    if ext == ".mp4" and use_ffmpeg:
+        return ".mp4", "video/mp4", "video"
+    return None
+
+def optimize_one(src, mime, cache_dir, max_width=CARD_WIDTH_PX, ffmpeg=None):
+    """
+    Optimizes one media file (worker function, picklable).
+    Returns (path, mime, dest): the file to embed (cached optimized file or the original) and
+    the cache entry behind that decision (optimized file, or the file a .keep marker stands for;
+    None if the source is not optimized at all).
+    """
+    plan = _plan(src, bool(ffmpeg))
+    if plan is None:
+        return src, mime, None
+    ext, out_mime, kind = plan
+
+    tag = _settings_tag(max_width, bool(ffmpeg))
+    dest = os.path.join(cache_dir, f"{_content_hash(src)[:20]}_{tag}{ext}")
+    keep = dest + ".keep" # Marker: optimization did not pay off, embed the original
+
+    if os.path.exists(dest):
+        return dest, out_mime, dest
+    if os.path.exists(keep):
+        return src, mime, dest
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = dest + ".part" + ext
+    try:
+        if kind == "still":
+            optimize_still(src, tmp, max_width)
+        elif kind == "webp":
+            optimize_gif_webp(src, tmp, max_width)
+        else:
+            transcode_video(src, tmp, max_width, ffmpeg)
+    except Exception as e:
+        print(f"   -> WARNING: Could not optimize '{src}': {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return src, mime, dest
+
+    if os.path.getsize(tmp) >= os.path.getsize(src):
+        os.remove(tmp)
+        open(keep, "w").close()
+        return src, mime, dest
+
+    os.replace(tmp, dest)
+    return dest, out_mime, dest
+
+
+def optimize_assets(items, cache_dir, max_width=CARD_WIDTH_PX, workers=None):
+    """
+    items: iterable of (path, mime). Returns ({path: (optimized_path, mime)}, cache entries in use).
+    Missing files are passed through unchanged. The cache entries are meant for prune().
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    todo = sorted({(p, m) for p, m in items if p and os.path.exists(p)})
+    if not todo:
+        return {}, []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {p: pool.submit(optimize_one, p, m, cache_dir, max_width, ffmpeg) for p, m in todo}
+        outcomes = {p: f.result() for p, f in futures.items()}
+    result = {p: (path, m) for p, (path, m, _) in outcomes.items()}
+    entries = [dest for _, _, dest in outcomes.values() if dest]
+
+    before = sum(os.path.getsize(p) for p, _ in todo)
+    after = sum(os.path.getsize(p) for p, _ in result.values())
+    print(f"Asset optimization: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+          f"({len(todo)} files, ffmpeg={'yes' if ffmpeg else 'no'})")
+    return result, entries
+
+def prune(cache_dir, keep_paths):
+    """
+    Removes optimized files that are no longer referenced. A .keep marker stands for its
+    (never written) optimized file and is removed when that file is not in keep_paths.
+    """
+    if not os.path.isdir(cache_dir):
+        return
+    keep = {os.path.abspath(p) for p in keep_paths}
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        target = path[:-len(".keep")] if name.endswith(".keep") else path
+        if os.path.abspath(target) not in keep:
+            os.remove(path)
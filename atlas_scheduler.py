@@ -0,0 +1,200 @@
+import os
+import sys
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+"""
+Module: atlas_scheduler.py
+Purpose: Dependency-aware, parallel job scheduler for the dashboard batch mode.
+         Each Task declares its script, arguments, artifacts and dependencies.
+         Independent tasks run concurrently (bounded number of worker processes),
+         logs are streamed line by line and a timing / critical-path summary is printed.
+"""
+
+PRINT_LOCK = threading.Lock()
+
+def log(message):
+    """Thread-safe print (worker threads stream interleaved output)."""
+    with PRINT_LOCK:
+        print(message, flush=True)
+
+
+class Task:
+    def __init__(self, name, script, description, artifacts=(), deps=(), args=(), artifact_dir=None, entry=None):
+        """
+        name:         unique identifier, used in deps and log prefixes
+        script:       path relative to the repository root
+        artifacts:    files the script produces (organized after success)
+        deps:         names of tasks that must finish successfully first
+        artifact_dir: explicit destination for artifacts (default: images/<plots|animations>)
+        entry:        entry function for in-process execution (None = run as script)
+        """
+        self.name = name
+        self.script = script
+        self.description = description
+        self.artifacts = list(artifacts)
+        self.deps = list(deps)
+        self.args = list(args)
+        self.artifact_dir = artifact_dir
+        self.entry = entry
+
+        # Filled by the scheduler
+        self.status = "pending" # pending | running | ok | failed | skipped
+        self.cached = False     # True if the runner reused up-to-date artifacts
+        self.duration = 0.0
+        self.start = None
+        self.end = None
+        self.started_at = None  # Wall-clock start (time.time()), e.g. for artifact freshness
+
+    def __repr__(self):
+        return f"Task({self.name}, {self.status})"
+
+
+def validate_graph(tasks):
+    """Checks for unknown dependencies and cycles. Returns tasks in topological order."""
+    by_name = {t.name: t for t in tasks}
+    if len(by_name) != len(tasks):
+        raise ValueError("Duplicate task names in schedule.")
+
+    for t in tasks:
+        for d in t.deps:
+            if d not in by_name:
+                raise ValueError(f"Task '{t.name}' depends on unknown task '{d}'.")
+
+    order = []
+    state = {}
+    def visit(t, stack):
+        if state.get(t.name) == "done":
+            return
+        if state.get(t.name) == "active":
+            raise ValueError(f"Dependency cycle: {' -> '.join(stack + [t.name])}")
+        state[t.name] = "active"
+        for d in t.deps:
+            visit(by_name[d], stack + [t.name])
+        state[t.name] = "done"
+        order.append(t)
+
+    for t in tasks:
+        visit(t, [])
+    return order
+
+
+def run_subprocess(task, root=None):
+    """
+    Default runner: executes task.script in a fresh interpreter and streams its output.
+    Returns True on success.
+    """
+    root = root or os.getcwd()
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.path.join(root, "modules")
+    env.setdefault("MPLBACKEND", "Agg")
+
+    cmd = [sys.executable, os.path.join(root, task.script)] + task.args
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, env=env, cwd=root, bufsize=1)
+    for line in proc.stdout:
+        log(f"   [{task.name}] {line.rstrip()}")
+    proc.wait()
+
+    if proc.returncode != 0:
+        log(f"   [{task.name}] FAILED (Return Code: {proc.returncode})")
+        return False
+    return True
+
+
+def run_schedule(tasks, runner=run_subprocess, jobs=None, on_success=None):
+    """
+    Runs all tasks respecting dependencies with at most 'jobs' concurrent tasks.
+    runner(task) -> bool executes a task; on_success(task) is called in the
+    scheduler thread (e.g. artifact organization) after a successful run and may
+    return False to mark the task as failed (e.g. missing artifacts).
+    Returns the tasks in topological order with status and timing filled in.
+    """
+    order = validate_graph(tasks)
+    jobs = jobs or os.cpu_count() or 1
+    by_name = {t.name: t for t in order}
+    pending = list(order)
+    running = {}
+    t0 = time.time()
+
+    def timed(task):
+        task.started_at = time.time()
+        task.start = task.started_at - t0
+        ok = runner(task)
+        task.end = time.time() - t0
+        task.duration = task.end - task.start
+        return ok
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            # Skip tasks whose dependencies failed
+            for t in list(pending):
+                if any(by_name[d].status in ("failed", "skipped") for d in t.deps):
+                    t.status = "skipped"
+                    pending.remove(t)
+                    log(f"[SKIP] {t.description} (dependency failed)")
+
+            # Launch everything that is ready
+            for t in list(pending):
+                if len(running) >= jobs:
+                    break
+                if all(by_name[d].status == "ok" for d in t.deps):
+                    pending.remove(t)
+                    t.status = "running"
+                    log(f"\n[EXEC] Running {t.description}...")
+                    running[pool.submit(timed, t)] = t
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                t = running.pop(fut)
+                try:
+                    ok = fut.result()
+                except Exception as e:
+                    log(f"   [{t.name}] ERROR: Could not execute task. {e}")
+                    ok = False
+                t.status = "ok" if ok else "failed"
+                if ok and t.cached:
+                    log(f"   -> UP-TO-DATE: {t.description} (cached)")
+                elif ok:
+                    if on_success and on_success(t) is False:
+                        t.status = "failed"
+                        log(f"   -> FAILED: {t.description} (post-processing)")
+                    else:
+                        log(f"   -> SUCCESS: {t.description} ({t.duration:.2f}s)")
+
+    return order
+
+
+def critical_path(tasks):
+    """Longest duration chain through the dependency graph. Returns (path, seconds)."""
+    best = {}
+    for t in validate_graph(tasks):
+        prev = max((best[d] for d in t.deps), key=lambda b: b[1], default=([], 0.0))
+        best[t.name] = (prev[0] + [t.name], prev[1] + t.duration)
+    if not best:
+        return [], 0.0
+    return max(best.values(), key=lambda b: b[1])
+
+
+def print_summary(tasks, wall_time):
+    print("\n" + "=" * 60)
+    print("SCHEDULE SUMMARY")
+    print("=" * 60)
+    print(f"{'Task':<28} | {'Status':<8} | {'Start':>7} | {'Time':>7}")
+    print("-" * 60)
+    for t in sorted(tasks, key=lambda t: (t.start is None, t.start or 0.0)):
+        start = f"{t.start:6.2f}s" if t.start is not None else "      -"
+        status = "cached" if t.cached else t.status
+        print(f"{t.name:<28} | {status:<8} | {start:>7} | {t.duration:6.2f}s")
+    print("-" * 60)
+
+    path, length = critical_path(tasks)
+    serial = sum(t.duration for t in tasks)
+    print(f"Wall time:      {wall_time:.2f}s")
+    print(f"Serial sum:     {serial:.2f}s (Speedup x{serial / max(wall_time, 1e-9):.1f})")
+    print(f"Critical path:  {length:.2f}s  [{' -> '.join(path)}]")
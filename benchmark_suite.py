@@ -0,0 +1,308 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+import numpy as np
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+"""
+Module: benchmark_suite.py
+Purpose: Timing suite for the numerical hot paths (asv style). Each benchmark has a setup(param)
+         that prepares everything and returns the zero-argument call to be timed; params are the
+         problem sizes. Every sample repeats the call until it takes MIN_SAMPLE_SECONDS, the
+         statistics (median, min, IQR per call, optionally per item) of REPEAT samples are kept.
+         Runs are appended to a JSON history together with commit and machine (local file, not
+         committed). Every case is compared with the latest run on the same machine that contains
+         it (so partial --quick/--filter runs do not hide the other cases) and slowdowns beyond
+         the threshold are reported as regressions.
+Usage:   python benchmark_suite.py [--quick] [--filter NAME] [--check] [--no-save]
+"""
+
+HISTORY_FILE = "benchmark_history.json"
+REGRESSION_THRESHOLD = 1.25 # median per call more than 25% slower than the baseline run
+MIN_SAMPLE_SECONDS = 0.2
+REPEAT = 5
+
+
+class Benchmark:
+    def __init__(self, name, setup, params, quick_params=None, param_name="n", items=None):
+        """
+        setup(param) -> zero-argument callable (the timed part; preparation stays in setup).
+        params: sizes of the full run, quick_params: sizes for --quick (default: the first one).
+        items(param): number of work items per call (e.g. cell updates), reported as time per item.
+        """
+        self.name = name
+        self.setup = setup
+        self.params = list(params)
+        self.quick_params = list(quick_params) if quick_params is not None else self.params[:1]
+        self.param_name = param_name
+        self.items = items
+
+    def label(self, param):
+        return f"{self.param_name}={param}"
+
+
+def time_call(fn, repeat=REPEAT, min_sample=MIN_SAMPLE_SECONDS):
+    """Warm-up call, then repeat samples of `number` calls each -> statistics per call [s]."""
+    t0 = time.perf_counter()
+    fn()
+    first = time.perf_counter() - t0
+    number = max(1, math.ceil(min_sample / max(first, 1e-9)))
+
+    samples = np.empty(repeat)
+    for r in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples[r] = (time.perf_counter() - t0) / number
+    q1, q3 = np.percentile(samples, [25, 75])
+    return {"median": float(np.median(samples)), "min": float(samples.min()), "iqr": float(q3 - q1),
+            "number": number, "repeat": repeat}
+
+
+# --- Benchmarks ---
+
+def setup_rk4_step(n_objects):
+    """PhysicsEngine.rk4_step for one ray in a scene of n_objects spheres."""
+    from modules.physics_engine import PhysicsEngine
+    engine = PhysicsEngine()
+    rng = np.random.default_rng(0)
+    for x, y in rng.uniform(-8, 8, (n_objects, 2)):
+        engine.add_object({'type': 'sphere', 'x': x, 'y': y, 'radius': 2.0, 'n': 1.5})
+    pos, vel = np.array([-10.0, 0.3]), np.array([1.0, 0.0])
+    return lambda: engine.rk4_step(pos, vel, 0.1)
+
+
+def setup_render_scene(resolution):
+    from modules.raytracer_5d_engine import render_scene
+    return lambda: render_scene(resolution)
+
+
+def setup_cloaking_fdtd(size):
+    """One 2D FDTD step of interactive_cloaking on a size x size grid (state carries over)."""
+    from modules.interactive_cloaking import build_cloak, fdtd_step
+    v_sq = build_cloak(size, size // 10, size // 5) ** 2
+    state = {"cur": np.zeros((size, size)), "prev": np.zeros((size, size)), "frame": 0}
+
+    def step():
+        state["prev"], state["cur"] = state["cur"], fdtd_step(state["cur"], state["prev"], v_sq, state["frame"])
+        state["frame"] += 1
+    return step
+
+
+def setup_black_hole_fdtd(nx):
+    """1D FDTD run of optical_black_hole (300 time steps); the fibre grows with nx at the module's dx."""
+    from modules.optical_black_hole import propagate_event_horizon
+    return lambda: propagate_event_horizon(Nx=nx, Nt=300, length=100.0 * (nx - 1) / 999)
+
+
+def setup_refractometer_langevin(n):
+    from modules.quantum_refractometer import PhysicalParameters, langevin_response
+    params = PhysicalParameters(temp_k=300)
+    xi = np.random.default_rng(0).normal(0, params.noise_amp_quantum * params.SCALE, n)
+    return lambda: langevin_response(xi, params.Gamma, params.m_Phi, 1 / params.fs)
+
+
+def setup_tensor_langevin(n):
+    from modules.tensor_simulation import integrate_langevin, sapphire
+    xi = np.random.default_rng(0).normal(0, 1e30, n)
+    return lambda: integrate_langevin(xi, 1e12, sapphire.m_Phi_mean, 1e-17)
+
+
+def setup_pink_noise(n):
+    from modules.experiments.kagra_noise_simulation import generate_pink_noise
+    return lambda: generate_pink_noise(n)
+
+
+def setup_dispersion_fit(n):
+    """
+    Propagator fit of dispersion_validator on n Sellmeier samples (0.25 - 2.0 um). The cost is
+    dominated by the number of function evaluations; above ~150 samples the fit hits maxfev.
+    """
+    from modules.dispersion_validator import sapphire_index_real, fit_propagator
+    wavelengths = np.linspace(0.25, 2.0, n)
+    n_data = sapphire_index_real(wavelengths)
+    omegas = 2 * np.pi * 299792458 / (wavelengths * 1e-6)
+    return lambda: fit_propagator(omegas, n_data)
+
+
+def setup_tob_optimizer(popsize):
+    from modules.quantum_tob_optimizer import find_optimal_design
+    return lambda: find_optimal_design(popsize=popsize, seed=0)
+
+
+BENCHMARKS = [
+    Benchmark("physics_engine.rk4_step", setup_rk4_step, [1, 8, 32], param_name="objects"),
+    Benchmark("raytracer_5d_engine.render_scene", setup_render_scene, [5, 20, 40], [5], param_name="rays"),
+    Benchmark("interactive_cloaking.fdtd_step", setup_cloaking_fdtd, [200, 400, 800], param_name="size",
+              items=lambda size: size * size),
+    Benchmark("optical_black_hole.propagate_event_horizon", setup_black_hole_fdtd, [1000, 4000, 16000],
+              param_name="nx", items=lambda nx: nx * 300),
+    Benchmark("quantum_refractometer.langevin_response", setup_refractometer_langevin, [5000, 50000, 500000],
+              items=lambda n: n),
+    Benchmark("tensor_simulation.integrate_langevin", setup_tensor_langevin, [5000, 50000, 500000],
+              items=lambda n: n),
+    Benchmark("kagra_noise_simulation.generate_pink_noise", setup_pink_noise, [2**14, 163840, 2**20],
+              items=lambda n: n),
+    Benchmark("dispersion_validator.fit_propagator", setup_dispersion_fit, [25, 50, 100], [100]),
+    Benchmark("quantum_tob_optimizer.find_optimal_design", setup_tob_optimizer, [15, 30, 60], param_name="popsize"),
+]
+
+
+# --- History ---
+
+def git_revision(root=ROOT):
+    """(short commit hash, dirty flag) or (None, None) outside of a git checkout."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                               capture_output=True, text=True, check=True).stdout.strip() != ""
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def machine_info():
+    import scipy
+    return {"node": platform.node(), "machine": platform.machine(), "cpus": os.cpu_count(),
+            "python": platform.python_version(), "numpy": np.__version__, "scipy": scipy.__version__}
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return {"runs": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(history, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+
+
+def baseline(history, machine):
+    """
+    {benchmark: {param: (stats, run)}} from the latest run on the same machine (node, CPU count
+    and interpreter) that contains the case; partial runs only replace the cases they measured.
+    """
+    same = ("node", "machine", "cpus", "python")
+    cases = {}
+    for run in reversed(history["runs"]):
+        if not all(run["machine"].get(k) == machine[k] for k in same):
+            continue
+        for name, params in run["results"].items():
+            for param, stats in params.items():
+                cases.setdefault(name, {}).setdefault(param, (stats, run))
+    return cases
+
+
+def compare(results, base):
+    """[(benchmark, param, ratio new/old, baseline run)] for all cases that have a baseline."""
+    rows = []
+    for name, cases in results.items():
+        old_cases = base.get(name, {})
+        for param, stats in cases.items():
+            if param in old_cases:
+                old, run = old_cases[param]
+                rows.append((name, param, stats["median"] / old["median"], run))
+    return rows
+
+
+# --- Runner ---
+
+def _format_seconds(s):
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if s >= scale:
+            return f"{s / scale:7.2f} {unit}"
+    return f"{s / 1e-9:7.2f} ns"
+
+
+def run_benchmarks(quick=False, name_filter=None, repeat=REPEAT, history_path=None, save=True,
+                   threshold=REGRESSION_THRESHOLD):
+    """Runs the suite, appends the results to the history and returns (run, regressions)."""
+    history_path = history_path or os.path.join(ROOT, HISTORY_FILE)
+    selected = [b for b in BENCHMARKS if not name_filter or name_filter in b.name]
+    print(f"--- Benchmark Suite ({len(selected)} benchmarks, {'quick' if quick else 'full'}) ---")
+
+    results = {}
+    cwd = os.getcwd()
+    # Modules write their plots into the working directory: run inside a scratch directory
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            for bench in selected:
+                results[bench.name] = {}
+                for param in (bench.quick_params if quick else bench.params):
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        fn = bench.setup(param)
+                        stats = time_call(fn, repeat=repeat)
+                    if bench.items:
+                        stats["per_item"] = stats["median"] / bench.items(param)
+                    results[bench.name][bench.label(param)] = stats
+                    per_item = f"  ({_format_seconds(stats['per_item'])} / item)" if bench.items else ""
+                    print(f"{bench.name:45s} {bench.label(param):14s} {_format_seconds(stats['median'])}"
+                          f" +- {_format_seconds(stats['iqr'] / 2).strip()}{per_item}")
+        finally:
+            import matplotlib.pyplot as plt
+            plt.close("all")
+            os.chdir(cwd)
+
+    commit, dirty = git_revision()
+    run = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "dirty": dirty,
+           "quick": quick, "machine": machine_info(), "results": results}
+
+    history = load_history(history_path)
+    rows = compare(results, baseline(history, run["machine"]))
+    regressions = []
+    if rows:
+        print("\nComparison with the latest run per case on this machine:")
+        for name, param, ratio, base_run in rows:
+            flag = "REGRESSION" if ratio > threshold else ("faster" if ratio < 1 / threshold else "")
+            if ratio > threshold:
+                regressions.append((name, param, ratio))
+            print(f"  {name:45s} {param:14s} x{ratio:5.2f} [{base_run['commit'] or 'unknown'}] {flag}")
+    else:
+        print("\nNo previous results for these cases on this machine: results become the baseline.")
+
+    if save:
+        history["runs"].append(run)
+        save_history(history, history_path)
+        print(f"Results appended to {history_path}")
+    return run, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Timing suite for the numerical hot paths")
+    parser.add_argument("--quick", action="store_true", help="Smallest size of every benchmark only")
+    parser.add_argument("--filter", default=None, help="Only benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Samples per case")
+    parser.add_argument("--history", default=None, help=f"History file (default: {HISTORY_FILE})")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Slowdown factor reported as regression")
+    parser.add_argument("--no-save", action="store_true", help="Do not append this run to the history")
+    parser.add_argument("--check", action="store_true", help="Exit with code 1 if a regression was found")
+    args = parser.parse_args(argv)
+
+    _, regressions = run_benchmarks(args.quick, args.filter, args.repeat, args.history, not args.no_save,
+                                    args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above x{args.threshold:.2f}")
+    return 1 if (args.check and regressions) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
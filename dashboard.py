@@ -5,6 +5,13 @@ import time
 import shutil
 import argparse
 
+from atlas_scheduler import Task, run_schedule, run_subprocess, validate_graph, print_summary
+from artifact_cache import ArtifactCache, compute_keys, file_digest
+from inprocess_runner import WarmRunner
+
+# Tolerance for coarse file system timestamps when deciding whether an artifact was written in this run
+MTIME_SLACK = 2.0
+
 def print_header():
     print("="*60)
     print("      QUANTUM REFRACTOMETER SIMULATION SUITE")
@@ -13,10 +20,13 @@ def print_header():
     print(f"Time: {time.strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*60)
 
-def organize_artifact(filename):
-    """Moves artifact to appropriate images subdirectory."""
+def organize_artifact(filename, dest_dir=None):
+    """
+    Moves artifact to appropriate images subdirectory (or to dest_dir if given).
+    Returns the destination path, or None if the file is missing or could not be moved.
+    """
     if not os.path.exists(filename):
-        return False
+        return None
     
     # Determine destination folder
     ext = os.path.splitext(filename)[1].lower()
@@ -27,120 +37,157 @@ def organize_artifact(filename):
     else:
         subdir = "" # Root of images/
         
-    dest_dir = os.path.join("images", subdir)
+    dest_dir = dest_dir or os.path.join("images", subdir)
     if not os.path.exists(dest_dir):
         os.makedirs(dest_dir)
         
-    dest_path = os.path.join(dest_dir, filename)
+    dest_path = os.path.join(dest_dir, os.path.basename(filename))
+    if os.path.abspath(filename) == os.path.abspath(dest_path):
+        return dest_path # Already in place
     
     try:
-        # If file exists in destination, remove it first
+        # If file exists in destination, keep it when unchanged, otherwise remove it first
         if os.path.exists(dest_path):
+            if file_digest(dest_path) == file_digest(filename):
+                os.remove(filename)
+                print(f"   -> UNCHANGED: {dest_path}")
+                return dest_path
             os.remove(dest_path)
             
         # Move the new file
         shutil.move(filename, dest_path)
         print(f"   -> ORGANIZED: Moved to {dest_path}")
-        return True
+        return dest_path
     except Exception as e:
-        # If move fails, it might be because the file is already in place (if module saved directly)
-        if os.path.abspath(filename) == os.path.abspath(dest_path):
-             return True
         print(f"   -> ERROR moving artifact: {e}")
-        return False
+        return None
 
-def run_module(script_name, description, artifact_check=None, extra_args=[]):
-    print(f"\n[EXEC] Running {description}...")
-    
-    script_path = os.path.join("modules", script_name)
-    
-    start_time = time.time()
-    try:
-        env = os.environ.copy()
-        env["PYTHONPATH"] = os.path.join(os.getcwd(), "modules")
-        
-        cmd = ["python", script_path] + extra_args
-        result = subprocess.run(cmd, capture_output=True, text=True, env=env)
-        duration = time.time() - start_time
-        
-        if result.returncode == 0:
-            print(f"   -> SUCCESS ({duration:.2f}s)")
-            
-            # Artifact Management
-            if artifact_check:
-                # 1. Try to organize it (if it was saved to root)
-                if organize_artifact(artifact_check):
-                    pass 
-                # 2. Check if it exists in the destination (if module saved clearly)
-                elif os.path.exists(os.path.join("images", "plots", artifact_check)):
-                     print(f"   -> VERIFIED: Artifact found in 'images/plots/'.")
-                elif os.path.exists(os.path.join("images", "animations", artifact_check)):
-                     print(f"   -> VERIFIED: Artifact found in 'images/animations/'.")
-                else:
-                     print(f"   -> WARNING: Expected artifact '{artifact_check}' missing!")
-            return True
-        else:
-            print(f"   -> FAILED (Return Code: {result.returncode})")
-            print("      Error Output:")
-            print(result.stderr)
-            return False
-            
-    except Exception as e:
-        print(f"   -> ERROR: Could not execute script. {e}")
-        return False
-
-def run_batch_simulation():
-    print("Starting Batch Generation for Scientific Atlas V4.2...")
-    
+# --- ATLAS BUILD GRAPH ---
+# Each task declares its script, artifacts and dependencies.
+# 'entry' is the function called in --inprocess mode (script-style modules run via runpy).
+# The simulation modules are independent of each other; the report depends on every plot.
+ATLAS_TASKS = [
     # 1. GEOMETRY
-    run_module("tesseract_projection.py", "1. Tesseract Animation", "tesseract_projection.gif", ["--batch"])
-    run_module("kaluza_klein_visualizer.py", "2. Kaluza-Klein Cylinder", "kaluza_klein_visualization.png", ["--batch"])
-    # Quantum Ring needs explicit call or check
-    run_module("quantum_ring_visualizer.py", "3. Quantum Ring (Quantization)", "quantum_ring_visualization.png", ["--batch"])
-    run_module("metric_tensor_visualizer.py", "4. Metric Tensor", "metric_tensor_visualization.png", ["--batch"])
+    Task("tesseract", "modules/tesseract_projection.py", "1. Tesseract Animation", ["tesseract_projection.gif"], args=["--batch"]),
+    Task("kaluza", "modules/kaluza_klein_visualizer.py", "2. Kaluza-Klein Cylinder", ["kaluza_klein_visualization.png"], args=["--batch"], entry="run_visualization"),
+    Task("ring", "modules/quantum_ring_visualizer.py", "3. Quantum Ring (Quantization)", ["quantum_ring_visualization.png"], args=["--batch"], entry="run_visualization"),
+    Task("metric", "modules/metric_tensor_visualizer.py", "4. Metric Tensor", ["metric_tensor_visualization.png"], args=["--batch"], entry="run_metric_visualization"),
 
     # 2. MATTER
-    run_module("lattice_schematic.py", "5. Lattice Schematic (V4.2 Ratio)", "lattice_schematic.png")
-    # Note: experiments/grid_locking is in a subdir, need to handle path carefully or assume module handles imports
-    # The run_module function assumes scripts are in 'modules/', so we need to tweak if it's in a subdirectory
-    # or just use the relative path "experiments/grid_locking.py"
-    run_module(os.path.join("experiments", "grid_locking.py"), "6. Grid Locking Experiment", "experiment_locking.png")
-    run_module("material_scanner.py", "7. Universal Material Scan", "material_resonance_scan.png")
+    Task("lattice", "modules/lattice_schematic.py", "5. Lattice Schematic (V4.2 Ratio)", ["lattice_schematic.png"], entry="run_lattice_schematic"),
+    Task("locking", "modules/experiments/grid_locking.py", "6. Grid Locking Experiment", ["experiment_locking.png"], entry="simulate_locking"),
+    Task("scan", "modules/material_scanner.py", "7. Universal Material Scan", ["material_resonance_scan.png"], entry="run_material_scan"),
 
     # 3. PROOF
-    run_module("dispersion_validator.py", "8. Dispersion Proof", "dispersion_validation.png")
-    run_module("kaluza_klein_tower.py", "9. KK Spectrum Tower", "kk_tower_spectrum.png", ["--batch"])
+    Task("dispersion", "modules/dispersion_validator.py", "8. Dispersion Proof", ["dispersion_validation.png"], entry="run_dispersion_validation"),
+    Task("tower", "modules/kaluza_klein_tower.py", "9. KK Spectrum Tower", ["kk_tower_spectrum.png"], args=["--batch"], entry="run_kk_tower_analysis"),
 
     # 4. VALIDATION
-    # Use kagra_noise_simulation.py or kagra_validation.py? Based on inventory, we need kagra_noise_prediction.png
-    # modules/kagra_noise_simulation.py likely produces it.
-    run_module("kagra_noise_simulation.py", "10. KAGRA Noise Simulation", "kagra_noise_prediction.png")
-    run_module("conoscopy_simulation.py", "11. Conoscopy (Visual Proof)", "experiment_conoscopy.png")
-    run_module("tensor_simulation.py", "12. Tensor Anisotropy", "tensor_simulation_results.png")
+    Task("kagra", "modules/experiments/kagra_noise_simulation.py", "10. KAGRA Noise Simulation", ["kagra_noise_prediction.png"], entry="simulate_kagra_experiment"),
+    Task("conoscopy", "modules/experiments/conoscopy_simulation.py", "11. Conoscopy (Visual Proof)", ["experiment_conoscopy.png"], entry="simulate_conoscopy"),
+    Task("tensor", "modules/tensor_simulation.py", "12. Tensor Anisotropy", ["tensor_simulation_results.png"], entry="run_tensor_simulation"),
 
     # 5. APPLICATIONS
-    run_module("interactive_cloaking.py", "13. Cloaking Simulation", "cloaking_simulation_result.png", ["--batch"])
-    run_module("optical_black_hole.py", "14. Optical Black Hole", "optical_black_hole.png")
-    run_module("photoelasticity_5d.py", "15. Digital Photoelasticity", "stress_optics_5d.png")
+    Task("cloaking", "modules/interactive_cloaking.py", "13. Cloaking Simulation", ["cloaking_simulation_result.png"], args=["--batch"]),
+    Task("black_hole", "modules/optical_black_hole.py", "14. Optical Black Hole", ["optical_black_hole.png"], entry="simulate_event_horizon"),
+    Task("stress", "modules/photoelasticity_5d.py", "15. Digital Photoelasticity", ["stress_optics_5d.png"], entry="run_stress_simulation"),
 
     # 6. Protocol
-    run_module("educational_proof.py", "16. Scientific Protocol Gen", "Math_for_Humans.txt")
-    if os.path.exists("Math_for_Humans.txt") and not os.path.exists(os.path.join("docs", "Math_for_Humans.txt")):
-         shutil.move("Math_for_Humans.txt", os.path.join("docs", "Math_for_Humans.txt"))
-
-    # 7. Report Generation
-    print("\n[EXEC] Running Final Report Generator...")
-    cmd = ["python", "generate_report.py"]
-    res = subprocess.run(cmd, capture_output=True, text=True)
-    if res.returncode == 0:
-        print("   -> SUCCESS: QRS_Final_Report.html generated.")
-    else:
-        print("   -> FAILED: Report generation error.")
-        print(res.stderr)
+    Task("protocol", "modules/educational_proof.py", "16. Scientific Protocol Gen", ["Math_for_Humans.txt"], artifact_dir="docs", entry="run_educational_proof"),
+]
 
+# 7. Report Generation (depends on every artifact above)
+ATLAS_TASKS.append(Task("report", "generate_report.py", "Final Report Generator",
+                        ["QRS_Final_Report.html"], deps=[t.name for t in ATLAS_TASKS], artifact_dir=".",
+                        entry="generate_report"))
+
+def artifact_sources(task, artifact):
+    """Places a module may save a declared artifact to before it is organized."""
+    if task.artifact_dir:
+        return [artifact]
+    return [artifact, os.path.join("images", artifact)] # working directory, images/ root
+
+def artifact_location(task, artifact):
+    """Path of an organized artifact, or None if it cannot be found."""
+    candidates = [os.path.join(task.artifact_dir, artifact)] if task.artifact_dir else \
+                 [os.path.join("images", "plots", artifact), os.path.join("images", "animations", artifact)]
+    for c in candidates:
+        if os.path.exists(c):
+            return c
+    return None
+
+def written_since(path, since):
+    return since is None or os.path.getmtime(path) >= since - MTIME_SLACK
+
+def verify_artifacts(task):
+    """
+    Organizes the declared artifacts of a finished task. Only files written during this run
+    count (older copies, e.g. tracked images, do not). Returns (produced paths, missing names).
+    """
+    produced, missing = [], []
+    for artifact in task.artifacts:
+        # 1. Try to organize it (if it was saved to the working directory or images/ root)
+        path = None
+        for src in artifact_sources(task, artifact):
+            if os.path.exists(src) and written_since(src, task.started_at):
+                path = organize_artifact(src, task.artifact_dir)
+                break
+        # 2. Check if it exists in the destination (if module saved clearly)
+        if path is None:
+            found = artifact_location(task, artifact)
+            if found and written_since(found, task.started_at):
+                print(f"   -> VERIFIED: Artifact found in '{os.path.dirname(found)}/'.")
+                path = found
+        if path:
+            produced.append(path)
+        else:
+            print(f"   -> MISSING: Expected artifact '{artifact}' was not produced in this run!")
+            missing.append(artifact)
+    return produced, missing
+
+def run_batch_simulation(jobs=None, force=False, in_process=False):
+    print("Starting Batch Generation for Scientific Atlas V4.2...")
+    print(f"Parallel workers: {jobs or os.cpu_count()} ({'warm in-process' if in_process else 'subprocess'})")
+
+    # Incremental build: skip tasks whose sources, imports, args and deps are unchanged
+    root = os.getcwd()
+    cache = ArtifactCache(root)
+    keys = compute_keys(validate_graph(ATLAS_TASKS), root)
+    warm = WarmRunner(root, jobs) if in_process else None
+
+    def runner(task):
+        if not force and cache.is_fresh(task.name, keys[task.name]):
+            task.cached = True
+            return True
+        return warm(task) if warm else run_subprocess(task, root)
+
+    def on_success(task):
+        produced, missing = verify_artifacts(task)
+        if missing:
+            return False # Missing artifacts fail the task (and keep it out of the cache)
+        cache.record(task.name, keys[task.name], produced)
+        cache.save()
+
+    start_time = time.time()
+    try:
+        tasks = run_schedule(ATLAS_TASKS, runner=runner, jobs=jobs, on_success=on_success)
+    finally:
+        if warm:
+            warm.close()
+    for t in tasks:
+        if t.status == "failed":
+            cache.invalidate(t.name)
+    cache.save()
+    print_summary(tasks, time.time() - start_time)
+
+    failed = [t.name for t in tasks if t.status != "ok"]
     print("\n" + "="*60)
-    print("ATLAS V4.2 GENERATION COMPLETE")
+    if failed:
+        print(f"ATLAS V4.2 GENERATION INCOMPLETE (failed/skipped: {', '.join(failed)})")
+    else:
+        print("ATLAS V4.2 GENERATION COMPLETE")
     print("="*60)
+    return not failed
 
 def launch_interactive_control_center():
     """Launches interactive modules."""
@@ -163,15 +210,22 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--batch", action="store_true", help="Run full batch")
     parser.add_argument("--interactive", action="store_true", help="Interactive Mode")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Parallel batch workers (default: CPU count, 1 = serial)")
+    parser.add_argument("--force", action="store_true", help="Ignore the artifact cache and rebuild everything")
+    parser.add_argument("--inprocess", action="store_true", help="Run modules in warm worker interpreters instead of fresh subprocesses")
+    parser.add_argument("--bench", action="store_true", help="Run the benchmark suite (timings -> benchmark_history.json)")
     args = parser.parse_args()
     
-    if args.batch:
-        run_batch_simulation()
+    if args.bench:
+        from benchmark_suite import run_benchmarks
+        run_benchmarks()
+    elif args.batch:
+        run_batch_simulation(args.jobs, args.force, args.inprocess)
     elif args.interactive:
         launch_interactive_control_center()
     else:
         print("Defaulting to Batch Mode for QA...")
-        run_batch_simulation()
+        run_batch_simulation(args.jobs, args.force, args.inprocess)
 
 if __name__ == "__main__":
     main()
@@ -1,235 +1,410 @@
 import os
 import base64
 import datetime
-import sys
+import hashlib
+import json
+import shutil
+import argparse
 
-# Robust path setup
-sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+import asset_optimizer
 
-from modules.core import materials, experiments
-from modules import quantum_tob_optimizer, raytracer_5d
+# Media is streamed into the HTML in chunks; the chunk size must be a multiple of 3
+# so that every chunk encodes to base64 without padding in the middle of the stream.
+B64_CHUNK_SIZE = 3 * 256 * 1024
 
-def get_base64_src(filepath, mime_type):
-    if not filepath or not os.path.exists(filepath):
-        return ""
+# "auto" mode: media larger than this is linked instead of inlined
+INLINE_LIMIT_BYTES = 4 * 1024 * 1024
+
+def write_base64_src(out, filepath, mime_type, chunk_size=B64_CHUNK_SIZE):
+    """Streams 'data:<mime>;base64,...' for filepath into the open text handle 'out'."""
+    out.write(f"data:{mime_type};base64,")
     with open(filepath, "rb") as f:
-        data = f.read()
-    b64_data = base64.b64encode(data).decode('utf-8')
-    return f"data:{mime_type};base64,{b64_data}"
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            out.write(base64.b64encode(chunk).decode("ascii"))
 
-def generate_report():
-    print("--- Generating Professional Report (The Scientific Atlas V5.3) ---")
-    
+class FragmentCache:
+    def __init__(self, cache_dir=".report_cache"):
+        """
+        Stores encoded data-URI fragments on disk, content-addressed by SHA-256.
+        The index maps artifact path -> (mtime_ns, size, sha256) so unchanged files
+        are recognized without re-reading them; touched-but-identical files are
+        re-hashed once and still reuse their fragment.
+        """
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.index = {}
+        self.hits = 0
+        self.misses = 0
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                self.index = {}
+
+    def fingerprint(self, filepath):
+        """Content hash of filepath, using the mtime/size index to skip unchanged files."""
+        st = os.stat(filepath)
+        entry = self.index.get(filepath)
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            return entry["sha256"]
+
+        h = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(B64_CHUNK_SIZE), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self.index[filepath] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest}
+        return digest
+
+    def write_base64_src(self, out, filepath, mime_type):
+        """Copies the cached data URI for filepath into 'out', encoding it only on a miss."""
+        digest = self.fingerprint(filepath)
+        fragment = os.path.join(self.cache_dir, f"{digest}.{mime_type.replace('/', '_')}.b64")
+
+        if os.path.exists(fragment):
+            self.hits += 1
+        else:
+            self.misses += 1
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(fragment + ".part", "w", encoding="ascii") as frag:
+                write_base64_src(frag, filepath, mime_type)
+            os.replace(fragment + ".part", fragment)
+
+        with open(fragment, "r", encoding="ascii") as frag:
+            shutil.copyfileobj(frag, out, B64_CHUNK_SIZE)
+
+    def prune(self, keep_paths):
+        """Drops index entries and fragments that no longer belong to a report artifact."""
+        self.index = {p: e for p, e in self.index.items() if p in keep_paths}
+        live = {e["sha256"] for e in self.index.values()}
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".b64") and name.split(".", 1)[0] not in live:
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+
+class MediaWriter:
+    def __init__(self, out, html_path, mode="inline", inline_limit=INLINE_LIMIT_BYTES, cache=None):
+        """
+        Writes media references for the report.
+        mode: 'inline' (base64, streamed), 'linked' (hardlink/copy next to the HTML),
+              'auto' (inline up to inline_limit bytes, link larger files such as MP4s)
+        cache: optional FragmentCache; inline media is then only re-encoded when it changed
+        """
+        if mode not in ("inline", "linked", "auto"):
+            raise ValueError(f"Unknown asset mode '{mode}'")
+        self.out = out
+        self.mode = mode
+        self.cache = cache
+        self.inline_limit = inline_limit
+        self.html_dir = os.path.dirname(os.path.abspath(html_path))
+        self.asset_dir_name = os.path.splitext(os.path.basename(html_path))[0] + "_assets"
+        self.linked = set() # Asset file names referenced by this report
+
+    def link_asset(self, filepath):
+        """Hardlinks (or copies) filepath into the asset folder; returns the relative URL."""
+        asset_dir = os.path.join(self.html_dir, self.asset_dir_name)
+        os.makedirs(asset_dir, exist_ok=True)
+        dest = os.path.join(asset_dir, os.path.basename(filepath))
+        self.linked.add(os.path.basename(filepath))
+
+        if not (os.path.exists(dest) and os.path.samefile(dest, filepath)):
+            if os.path.exists(dest):
+                os.remove(dest)
+            try:
+                os.link(filepath, dest)
+            except OSError:
+                shutil.copy2(filepath, dest) # Cross-device or no hardlink support
+        return f"{self.asset_dir_name}/{os.path.basename(filepath)}"
+
+    def prune_assets(self):
+        """Removes files from the asset folder that this report no longer links (folder too, if empty)."""
+        asset_dir = os.path.join(self.html_dir, self.asset_dir_name)
+        if not os.path.isdir(asset_dir):
+            return
+        for name in os.listdir(asset_dir):
+            if name not in self.linked:
+                os.remove(os.path.join(asset_dir, name))
+        if not self.linked:
+            os.rmdir(asset_dir)
+
+    def write_src(self, filepath, mime_type):
+        """Writes the value of a src attribute (data URI or relative link)."""
+        inline = self.mode == "inline" or \
+                 (self.mode == "auto" and os.path.getsize(filepath) <= self.inline_limit)
+        if inline and self.cache:
+            self.cache.write_base64_src(self.out, filepath, mime_type)
+        elif inline:
+            write_base64_src(self.out, filepath, mime_type)
+        else:
+            self.out.write(self.link_asset(filepath))
+
+    def write_media(self, filepath, mime_type):
+        """Writes an <img> or autoplaying <video> element for filepath."""
+        if "video" in mime_type:
+            # HTML5 Video with Autoplay
+            self.out.write('<video autoplay loop muted playsinline style="width:100%; height:auto;"><source src="')
+            self.write_src(filepath, mime_type)
+            self.out.write(f'" type="{mime_type}"></video>')
+        else:
+            # Standard Image
+            self.out.write('<img src="')
+            self.write_src(filepath, mime_type)
+            self.out.write('" style="width:100%; height:auto;" />')
+
+
+def build_inventory():
     # 1. VISUAL INVENTORY
     # We prioritize MP4s for the "Realtime" section (Chapter 7) for better quality in HTML.
     # We use PNGs/GIFs for everything else to ensure PDF compatibility.
-    
+
     # Check if field explorer exists, otherwise use a fallback or skip
     field_gif = "images/animations/field_explorer.gif"
     if not os.path.exists(field_gif):
         # Fallback to a plot if animation is missing
         field_expl_src = "images/plots/field_explorer_snapshot.png" if os.path.exists("images/plots/field_explorer_snapshot.png") else ""
-        field_type = "image"
+        field_mime = "image/png"
     else:
         field_expl_src = field_gif
-        field_type = "image" # It is a GIF image
+        field_mime = "image/gif" # It is a GIF image
 
     # MP4 Sources for Realtime Chapter (HTML Only - PDF will need static fallback logic if using xhtml2pdf, but simple img tags work best there)
     # Strategy: The user wants "MP4 videos directly embedded up top".
     # browsers handle <video> well. PDF converters DO NOT.
     # compromise: The script generates HTML. The HTML will use <video>.
-    
+
     # INVENTORY
-    inventory = {
+    return {
         "tesseract": ("images/animations/tesseract_projection.gif", "image/gif"),
         "kaluza": ("images/plots/kaluza_klein_visualization.png", "image/png"),
         "ring": ("images/plots/quantum_ring_visualization.png", "image/png"),
         "metric": ("images/plots/metric_tensor_visualization.png", "image/png"),
-        
+
         "scan": ("images/plots/material_resonance_scan.png", "image/png"),
         "lattice": ("images/plots/lattice_schematic.png", "image/png"),
         "locking": ("images/plots/experiment_locking.png", "image/png"),
-        
+
         "dispersion": ("images/plots/dispersion_validation.png", "image/png"),
         "tower": ("images/plots/kk_tower_spectrum.png", "image/png"),
-        
+
         "kagra": ("images/plots/kagra_noise_prediction.png", "image/png"),
         "galaxy": ("images/plots/galaxy_validation_analysis.png", "image/png"),
         "conoscopy": ("images/plots/experiment_conoscopy.png", "image/png"),
-        
+
         "raytrace": ("images/plots/5d_raytracing_render.png", "image/png"),
         "diamond": ("images/plots/diamond_comparison.png", "image/png"),
         "stress": ("images/plots/stress_optics_5d.png", "image/png"),
-        
+
         "tob": ("images/plots/quantum_tob_result.png", "image/png"),
-        
+
         # Chapter 7 Realtime (Using MP4s where available and creating a video tag, else GIF)
         "cloaking": ("images/animations/cloaking_simulation.mp4", "video/mp4"),
         "prism": ("images/animations/prism_simulation.mp4", "video/mp4"),
         "fiber": ("images/plots/fiber_simulation.png", "image/png"), # Use the plot for fiber as it is static or generic
-        "field": (field_expl_src, "image/gif") # Keep GIF for compatibility if MP4 missing
-    }
-    
-    # Appendix Items
-    appendix_inventory = {
-        "Momentum Transfer (Impulserhaltung)": "images/plots/momentum_transfer.png",
-        "Lorentz Invariance Proof": "images/plots/lorentz_proof.png",
-        "Optical Black Hole (Event Horizon)": "images/plots/optical_black_hole.png",
-        "Quantum Refractometer Data": "images/plots/quantum_refractometer_results_v2.png"
+        "field": (field_expl_src, field_mime) # Keep GIF for compatibility if MP4 missing
     }
 
-    # Helper for rendering the visual card based on type
-    def render_card(key, title, text):
-        path, mime = inventory.get(key, ("", ""))
-        if not path or not os.path.exists(path):
-            return "" # Skip missing
-        
-        src = get_base64_src(path, mime)
-        
-        media_html = ""
-        if "video" in mime:
-            # HTML5 Video with Autoplay
-            media_html = f'<video autoplay loop muted playsinline style="width:100%; height:auto;"><source src="{src}" type="{mime}"></video>'
-        else:
-            # Standard Image
-             media_html = f'<img src="{src}" style="width:100%; height:auto;" />'
-
-        return f"""
-        <div class="visual-card">
-            <div class="visual-media">{media_html}</div>
-            <div class="visual-desc">
-                <h4>{title}</h4>
-                <p>{text}</p>
-            </div>
-        </div>
-        """
+# Appendix Items
+APPENDIX_INVENTORY = {
+    "Momentum Transfer (Impulserhaltung)": "images/plots/momentum_transfer.png",
+    "Lorentz Invariance Proof": "images/plots/lorentz_proof.png",
+    "Optical Black Hole (Event Horizon)": "images/plots/optical_black_hole.png",
+    "Quantum Refractometer Data": "images/plots/quantum_refractometer_results_v2.png"
+}
 
-    # HTML Header
-    html_head = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>QRS Final Report: The Scientific Atlas</title>
-        <style>
-            body {{ font-family: 'Segoe UI', Roboto, Helvetica, Arial, sans-serif; line-height: 1.6; color: #333; max-width: 1000px; margin: 0 auto; padding: 40px; background-color: #f9f9f9; }}
-            h1 {{ color: #2c3e50; border-bottom: 4px solid #3498db; padding-bottom: 15px; text-align: center; font-size: 28pt; margin-bottom: 30px; letter-spacing: 1px; }}
-            h2 {{ color: #2980b9; margin-top: 60px; border-bottom: 2px solid #bdc3c7; padding-bottom: 10px; font-size: 20pt; page-break-after: avoid; }}
-            
-            .header {{ text-align: center; margin-bottom: 50px; background: white; padding: 40px; border-radius: 12px; box-shadow: 0 4px 15px rgba(0,0,0,0.1); }}
-            .section {{ margin-bottom: 50px; background: white; padding: 40px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.05); page-break-inside: avoid; }}
-            
-            .visual-card {{ display: flex; margin-bottom: 40px; background: #fff; border: 1px solid #eee; border-radius: 8px; overflow: hidden; page-break-inside: avoid; box-shadow: 0 2px 4px rgba(0,0,0,0.03); }}
-            .visual-media {{ flex: 0 0 55%; background: #000; display: flex; align-items: center; justify-content: center; border-right: 1px solid #eee; padding: 0; min-height: 300px; }}
-            .visual-desc {{ flex: 1; padding: 30px; display: flex; flex-direction: column; justify-content: center; }}
-            .visual-desc h4 {{ margin-top: 0; color: #d35400; font-size: 14pt; margin-bottom: 15px; border-bottom: 1px solid #eee; padding-bottom: 10px; }}
-            
-            .gallery-grid {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(300px, 1fr)); gap: 20px; padding: 20px 0; }}
-            .gallery-item {{ border: 1px solid #ddd; border-radius: 8px; overflow: hidden; background: white; box-shadow: 0 2px 5px rgba(0,0,0,0.05); }}
-            .gallery-item img {{ width: 100%; height: auto; display: block; }}
-            .gallery-caption {{ padding: 10px; text-align: center; font-size: 9pt; color: #444; background: #fafafa; border-top: 1px solid #eee; font-weight: 600; }}
-            
-            @media print {{
-                body {{ background: white; padding: 0; margin: 0; }}
-                /* Videos won't print well, but images will */
-            }}
-        </style>
-    </head>
-    """
-
-    html_body = f"""
-    <body>
-        <div class="header">
-            <h1>QRS: The Effective Field Theory of 5D Optics</h1>
-            <p><strong>The Scientific Atlas (Version 5.3 - Final Polish)</strong></p>
-            <p class="timestamp">Generiert am: {datetime.datetime.now().strftime('%d. %B %Y')}</p>
-        </div>
+# Chapters: (heading, intro paragraph or None, [(inventory key, card title, card text), ...])
+SECTIONS = [
+    ("1. Fundament: Die Geometrie des Raums", None, [
+        ("tesseract", "1.1 Die Projektion", "Materie ist der Schatten einer 5D-Struktur (Tesserakt-Rotation)."),
+        ("kaluza", "1.2 Der Kaluza-Klein Zylinder", "Ladung entsteht durch Impuls in der 5. Dimension."),
+    ]),
+    ("2. Materie & Resonanz", None, [
+        ("scan", "2.1 Universeller Scan", "Alle stabilen Kristallgitter (Si, Al2O3) liegen auf 5D-Resonanzen."),
+        ("lattice", "2.2 Saphir Locking", "Verhältnis 2.08: Geometrie wird vom Gitter erzwungen."),
+    ]),
+    ("3. Spektrale Beweise", None, [
+        ("dispersion", "3.1 Dispersion", "Lichtbrechung wird durch die effektive Masse (~8.8 eV) verursacht."),
+        ("tower", "3.2 Cutoff Scale", "Der EFT-Cutoff definiert die Grenze der geometrischen Optik."),
+    ]),
+    ("4. Validierung", None, [
+        ("kagra", "4.1 KAGRA Noise", "Geometrisches Rauschen erklärt Gravitationswellen-Anomalien."),
+        ("galaxy", "4.2 Data Connector: Galaxien", "Rotationskurven erklärt ohne Dunkle Materie (Geometry Drag)."),
+        ("conoscopy", "4.3 Visuelle Interferenz", "Konoskopie zeigt die 4D-Symmetrie im Kristall."),
+    ]),
+    ("5. V5.0 Physics Engine", None, [
+        ("raytrace", "5.1 5D Raytracing (Engine)", "Lichtbahnen folgen Geodäten in der gekrümmten 5D-Metrik."),
+        ("diamond", "5.2 Diamond Validation", "Vergleich: 5D-Sim (Weiß) vs. Snellius (Grün). Perfekte Übereinstimmung."),
+        ("stress", "5.3 Stress-Optik", "Mechanische Spannung verändert die lokale Metrik (Isochromaten)."),
+    ]),
+    ("6. Quantum Architecture (TOB)", None, [
+        ("tob", "6.1 Das Optimale Gitter (Supraleitung)", "Globales Optimum bei 90° Twist-Winkel. Minimale geometrische Reibung."),
+    ]),
+    # 7. REALTIME SIMULATIONS (Revised)
+    ("7. Echtzeit-Simulationen (Dynamik)",
+     'Die folgenden Simulationen zeigen die Zeitentwicklung der 5D-Wellenfunktion. Der "Lichtleiter" testet totale Reflexion.', [
+        ("cloaking", "7.1 Invisibility Cloaking", "Die Metrik leitet die Wellenfronten um das Objekt herum (Active Flow)."),
+        ("prism", "7.2 Prismen-Brechung", "Echtzeit-Lösung der Wellengleichung im dispersiven Medium."),
+        ("fiber", "7.3 5D Fiber Simulation", "Lichtleitung durch geometrische Totalreflexion (Core n=2)."),
+        ("field", "7.4 Field Explorer", "Visualisierung der 5D-Skalarfelder und ihrer Fluktuationen."),
+    ]),
+]
 
-        <div class="section">
-            <h2>1. Fundament: Die Geometrie des Raums</h2>
-            {render_card("tesseract", "1.1 Die Projektion", "Materie ist der Schatten einer 5D-Struktur (Tesserakt-Rotation).")}
-            {render_card("kaluza", "1.2 Der Kaluza-Klein Zylinder", "Ladung entsteht durch Impuls in der 5. Dimension.")}
-        </div>
+# HTML Header
+HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <title>QRS Final Report: The Scientific Atlas</title>
+    <style>
+        body { font-family: 'Segoe UI', Roboto, Helvetica, Arial, sans-serif; line-height: 1.6; color: #333; max-width: 1000px; margin: 0 auto; padding: 40px; background-color: #f9f9f9; }
+        h1 { color: #2c3e50; border-bottom: 4px solid #3498db; padding-bottom: 15px; text-align: center; font-size: 28pt; margin-bottom: 30px; letter-spacing: 1px; }
+        h2 { color: #2980b9; margin-top: 60px; border-bottom: 2px solid #bdc3c7; padding-bottom: 10px; font-size: 20pt; page-break-after: avoid; }
 
-        <div class="section">
-            <h2>2. Materie & Resonanz</h2>
-            {render_card("scan", "2.1 Universeller Scan", "Alle stabilen Kristallgitter (Si, Al2O3) liegen auf 5D-Resonanzen.")}
-            {render_card("lattice", "2.2 Saphir Locking", "Verhältnis 2.08: Geometrie wird vom Gitter erzwungen.")}
-        </div>
+        .header { text-align: center; margin-bottom: 50px; background: white; padding: 40px; border-radius: 12px; box-shadow: 0 4px 15px rgba(0,0,0,0.1); }
+        .section { margin-bottom: 50px; background: white; padding: 40px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.05); page-break-inside: avoid; }
 
-        <div class="section">
-            <h2>3. Spektrale Beweise</h2>
-            {render_card("dispersion", "3.1 Dispersion", "Lichtbrechung wird durch die effektive Masse (~8.8 eV) verursacht.")}
-            {render_card("tower", "3.2 Cutoff Scale", "Der EFT-Cutoff definiert die Grenze der geometrischen Optik.")}
-        </div>
+        .visual-card { display: flex; margin-bottom: 40px; background: #fff; border: 1px solid #eee; border-radius: 8px; overflow: hidden; page-break-inside: avoid; box-shadow: 0 2px 4px rgba(0,0,0,0.03); }
+        .visual-media { flex: 0 0 55%; background: #000; display: flex; align-items: center; justify-content: center; border-right: 1px solid #eee; padding: 0; min-height: 300px; }
+        .visual-desc { flex: 1; padding: 30px; display: flex; flex-direction: column; justify-content: center; }
+        .visual-desc h4 { margin-top: 0; color: #d35400; font-size: 14pt; margin-bottom: 15px; border-bottom: 1px solid #eee; padding-bottom: 10px; }
 
-        <div class="section">
-            <h2>4. Validierung</h2>
-            {render_card("kagra", "4.1 KAGRA Noise", "Geometrisches Rauschen erklärt Gravitationswellen-Anomalien.")}
-            {render_card("galaxy", "4.2 Data Connector: Galaxien", "Rotationskurven erklärt ohne Dunkle Materie (Geometry Drag).")}
-            {render_card("conoscopy", "4.3 Visuelle Interferenz", "Konoskopie zeigt die 4D-Symmetrie im Kristall.")}
-        </div>
+        .gallery-grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(300px, 1fr)); gap: 20px; padding: 20px 0; }
+        .gallery-item { border: 1px solid #ddd; border-radius: 8px; overflow: hidden; background: white; box-shadow: 0 2px 5px rgba(0,0,0,0.05); }
+        .gallery-item img { width: 100%; height: auto; display: block; }
+        .gallery-caption { padding: 10px; text-align: center; font-size: 9pt; color: #444; background: #fafafa; border-top: 1px solid #eee; font-weight: 600; }
 
-        <div class="section">
-            <h2>5. V5.0 Physics Engine</h2>
-            {render_card("raytrace", "5.1 5D Raytracing (Engine)", "Lichtbahnen folgen Geodäten in der gekrümmten 5D-Metrik.")}
-            {render_card("diamond", "5.2 Diamond Validation", "Vergleich: 5D-Sim (Weiß) vs. Snellius (Grün). Perfekte Übereinstimmung.")}
-            {render_card("stress", "5.3 Stress-Optik", "Mechanische Spannung verändert die lokale Metrik (Isochromaten).")}
-        </div>
+        @media print {
+            body { background: white; padding: 0; margin: 0; }
+            /* Videos won't print well, but images will */
+        }
+    </style>
+</head>
+"""
 
-        <div class="section">
-            <h2>6. Quantum Architecture (TOB)</h2>
-            {render_card("tob", "6.1 Das Optimale Gitter (Supraleitung)", "Globales Optimum bei 90° Twist-Winkel. Minimale geometrische Reibung.")}
+def write_card(media, path, mime, title, text):
+    """Helper for rendering the visual card based on type. Missing media is skipped."""
+    if not path or not os.path.exists(path):
+        return
+    media.out.write('\n    <div class="visual-card">\n        <div class="visual-media">')
+    media.write_media(path, mime)
+    media.out.write(f"""</div>
+        <div class="visual-desc">
+            <h4>{title}</h4>
+            <p>{text}</p>
         </div>
+    </div>
+""")
 
-        <!-- 7. REALTIME SIMULATIONS (Revised) -->
-        <div class="section">
-            <h2>7. Echtzeit-Simulationen (Dynamik)</h2>
-            <p>Die folgenden Simulationen zeigen die Zeitentwicklung der 5D-Wellenfunktion. Der "Lichtleiter" testet totale Reflexion.</p>
-            
-            {render_card("cloaking", "7.1 Invisibility Cloaking", "Die Metrik leitet die Wellenfronten um das Objekt herum (Active Flow).")}
-            {render_card("prism", "7.2 Prismen-Brechung", "Echtzeit-Lösung der Wellengleichung im dispersiven Medium.")}
-            {render_card("fiber", "7.3 5D Fiber Simulation", "Lichtleitung durch geometrische Totalreflexion (Core n=2).")}
-            {render_card("field", "7.4 Field Explorer", "Visualisierung der 5D-Skalarfelder und ihrer Fluktuationen.")}
-        </div>
+def apply_media_map(inventory, media_map):
+    """Replaces source media by their optimized versions (path and mime)."""
+    return {key: media_map.get(path, (path, mime)) for key, (path, mime) in inventory.items()}
 
-        <!-- APPENDIX A: PLOTS -->
-        <div class="section">
-            <h2>Appendix A: Supplementary Archive</h2>
-            <div class="gallery-grid">
-            {
-                "".join([
-                    f'''
-                    <div class="gallery-item">
-                        <img src="{get_base64_src(path, 'image/png')}" />
-                        <div class="gallery-caption">{title}</div>
-                    </div>
-                    '''
-                    for title, path in appendix_inventory.items()
-                    if os.path.exists(path)
-                ])
-            }
-            </div>
-        </div>
+def write_report_html(out, html_path, mode="inline", cache=None, media_map=None):
+    """Writes the complete report to the text handle 'out', one fragment at a time. Returns the MediaWriter."""
+    media = MediaWriter(out, html_path, mode, cache=cache)
+    media_map = media_map or {}
+    inventory = apply_media_map(build_inventory(), media_map)
+
+    out.write(HTML_HEAD)
+    out.write(f"""<body>
+    <div class="header">
+        <h1>QRS: The Effective Field Theory of 5D Optics</h1>
+        <p><strong>The Scientific Atlas (Version 5.3 - Final Polish)</strong></p>
+        <p class="timestamp">Generiert am: {datetime.datetime.now().strftime('%d. %B %Y')}</p>
+    </div>
+""")
+
+    for heading, intro, cards in SECTIONS:
+        out.write(f'\n<div class="section">\n    <h2>{heading}</h2>\n')
+        if intro:
+            out.write(f"    <p>{intro}</p>\n")
+        for key, title, text in cards:
+            path, mime = inventory.get(key, ("", ""))
+            write_card(media, path, mime, title, text)
+        out.write("</div>\n")
+
+    # APPENDIX A: PLOTS
+    out.write('\n<div class="section">\n    <h2>Appendix A: Supplementary Archive</h2>\n    <div class="gallery-grid">\n')
+    for title, path in APPENDIX_INVENTORY.items():
+        if not os.path.exists(path):
+            continue
+        path, mime = media_map.get(path, (path, "image/png"))
+        out.write('        <div class="gallery-item">\n            <img src="')
+        media.write_src(path, mime)
+        out.write(f'" />\n            <div class="gallery-caption">{title}</div>\n        </div>\n')
+    out.write("    </div>\n</div>\n\n</body>\n</html>\n")
+    return media
+
+def generate_report(output="QRS_Final_Report.html", assets="inline", pdf=True, use_cache=True, optimize=True):
+    print("--- Generating Professional Report (The Scientific Atlas V5.3) ---")
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(output)), ".report_cache")
+
+    # Optimization stage: downscale / quantize / transcode media once, cached by content hash
+    media_map = {}
+    if optimize:
+        sources = list(build_inventory().values()) + [(p, "image/png") for p in APPENDIX_INVENTORY.values()]
+        optimized_dir = os.path.join(cache_dir, "optimized")
+        media_map, cache_entries = asset_optimizer.optimize_assets(sources, optimized_dir)
+        asset_optimizer.prune(optimized_dir, cache_entries)
+
+    # Encoded media fragments are reused across runs (keyed by path, mtime/size and content hash)
+    cache = FragmentCache(cache_dir) if use_cache else None
+
+    # Write to a temporary file first so an aborted run never leaves a truncated report
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tmp_path = output + ".part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        media = write_report_html(f, output, assets, cache, media_map)
+    os.replace(tmp_path, output)
+    media.prune_assets() # Linked media that the report no longer references
+    print(f"Report generated: {output} (Scientific Atlas Edition, assets={assets})")
 
-    </body>
-    </html>
-    """
-    
-    with open("QRS_Final_Report.html", "w", encoding="utf-8") as f:
-        f.write(final_html)
-    print("Report generated: QRS_Final_Report.html (Scientific Atlas Edition)")
+    if cache:
+        embedded = apply_media_map(build_inventory(), media_map)
+        media_paths = {p for p, _ in embedded.values() if p} | \
+                      {media_map.get(p, (p, None))[0] for p in APPENDIX_INVENTORY.values()}
+        cache.prune(media_paths)
+        cache.save()
+        print(f"Fragment cache: {cache.hits} reused, {cache.misses} re-encoded")
 
+    if pdf:
+        generate_pdf(output)
+
+def generate_pdf(html_path):
     # PDF Logic (Simplified/Warning: PDF generation from <video> tags is tricky. PISA might ignore them)
+    pdf_path = os.path.splitext(html_path)[0] + ".pdf"
+    html_dir = os.path.dirname(os.path.abspath(html_path))
+
+    def link_callback(uri, rel):
+        # Resolve linked assets relative to the HTML file; data URIs pass through
+        if uri.startswith("data:"):
+            return uri
+        return os.path.join(html_dir, uri)
+
     try:
         from xhtml2pdf import pisa
-        with open("QRS_Final_Report.pdf", "wb") as pdf_file:
-            pisa_status = pisa.CreatePDF(final_html, dest=pdf_file)
+        with open(html_path, "r", encoding="utf-8") as src, open(pdf_path, "wb") as pdf_file:
+            pisa_status = pisa.CreatePDF(src, dest=pdf_file, link_callback=link_callback)
         if pisa_status.err:
             print("PDF generation error")
         else:
-            print("PDF generated: QRS_Final_Report.pdf")
+            print(f"PDF generated: {pdf_path}")
     except Exception as e:
         print(f"PDF Error: {e}")
 
 if __name__ == "__main__":
-    generate_report()
+    parser = argparse.ArgumentParser(description="Generate the QRS Scientific Atlas report.")
+    parser.add_argument("--output", default="QRS_Final_Report.html", help="Output HTML file")
+    parser.add_argument("--assets", choices=["inline", "linked", "auto"], default="inline",
+                        help="inline: base64 in the HTML; linked: media next to the HTML; auto: link large files")
+    parser.add_argument("--no-pdf", action="store_true", help="Skip the PDF export")
+    parser.add_argument("--no-cache", action="store_true", help="Re-encode all media (ignore .report_cache)")
+    parser.add_argument("--no-optimize", action="store_true", help="Embed media at full resolution")
+    args = parser.parse_args()
+    generate_report(args.output, args.assets, pdf=not args.no_pdf, use_cache=not args.no_cache,
+                    optimize=not args.no_optimize)
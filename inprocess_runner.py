@@ -0,0 +1,133 @@
+import contextlib
+import importlib.util
+import io
+import os
+import runpy
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from atlas_scheduler import log
+
+"""
+Module: inprocess_runner.py
+Purpose: Warm-interpreter execution mode for the dashboard.
+         A small pool of worker processes imports numpy / scipy / matplotlib once
+         (Agg backend) and then runs Atlas modules in-process: modules with a declared
+         entry function are imported once and the function is called directly,
+         script-style modules are executed via runpy. Every call is isolated with
+         exception capture, so a failing module cannot take the worker down.
+         Module output is forwarded line by line (with the task prefix) while it runs,
+         like the streamed output of the subprocess mode.
+"""
+
+_MODULES = {}
+
+def _init_worker(root):
+    """Pool initializer: warm up heavy imports once per worker."""
+    os.chdir(root)
+    for path in (os.path.join(root, "modules"), root):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    os.environ["MPLBACKEND"] = "Agg"
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401
+    import numpy  # noqa: F401
+    import scipy.integrate  # noqa: F401
+    import scipy.optimize  # noqa: F401
+    import scipy.signal  # noqa: F401
+
+
+def load_module(script_path):
+    """Imports a module from its file path once and caches it (also in sys.modules)."""
+    script_path = os.path.abspath(script_path)
+    if script_path in _MODULES:
+        return _MODULES[script_path]
+
+    name = os.path.splitext(os.path.basename(script_path))[0]
+    spec = importlib.util.spec_from_file_location(name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules.setdefault(name, module)
+    spec.loader.exec_module(module)
+    _MODULES[script_path] = module
+    return module
+
+
+class LineForwarder(io.TextIOBase):
+    def __init__(self, prefix, stream):
+        """Text stream that writes every complete line as 'prefix + line' to stream (one write per batch)."""
+        self.prefix = prefix
+        self.stream = stream
+        self.pending = ""
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.pending += text
+        *lines, self.pending = self.pending.split("\n")
+        if lines:
+            self.stream.write("".join(f"{self.prefix}{line}\n" for line in lines))
+            self.stream.flush()
+        return len(text)
+
+    def flush(self):
+        if self.pending:
+            self.stream.write(f"{self.prefix}{self.pending}\n")
+            self.pending = ""
+        self.stream.flush()
+
+
+def execute_in_process(script, entry, args, root, name):
+    """
+    Runs one Atlas module inside the current interpreter and returns ok.
+    stdout/stderr go line by line to the inherited console ('   [name] ...'),
+    sys.argv is isolated per call.
+    """
+    import matplotlib.pyplot as plt
+
+    script_path = os.path.join(root, script)
+    out = LineForwarder(f"   [{name}] ", sys.__stdout__)
+    old_argv = sys.argv
+    sys.argv = [script_path] + list(args)
+    ok = False
+
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+            if entry:
+                getattr(load_module(script_path), entry)()
+            else:
+                runpy.run_path(script_path, run_name="__main__")
+        ok = True
+    except SystemExit as e:
+        ok = e.code in (None, 0)
+        if not ok:
+            out.write(f"SystemExit: {e.code}\n")
+    except Exception:
+        out.write(traceback.format_exc())
+    finally:
+        sys.argv = old_argv
+        plt.close("all")
+        out.flush()
+
+    return ok
+
+
+class WarmRunner:
+    def __init__(self, root, jobs=None):
+        """Pool of warm interpreters; call the instance with a Task like any scheduler runner."""
+        self.root = root
+        self.pool = ProcessPoolExecutor(max_workers=jobs or os.cpu_count(),
+                                        initializer=_init_worker, initargs=(root,))
+
+    def __call__(self, task):
+        future = self.pool.submit(execute_in_process, task.script, task.entry, task.args, self.root, task.name)
+        ok = future.result()
+        if not ok:
+            log(f"   [{task.name}] FAILED (in-process)")
+        return ok
+
+    def close(self):
+        self.pool.shutdown()
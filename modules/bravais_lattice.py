@@ -0,0 +1,323 @@
+import numpy as np
+from scipy.fft import next_fast_len
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.physics_engine import PhysicsEngine
+
+"""
+Module: bravais_lattice.py
+Purpose: Crystal lattices as coordinate arrays and the "Grid Locking" score of the 5D standing wave.
+Lattice:   BravaisLattice = primitive vectors (rows) + fractional basis + per-site well depth.
+           Points come from one index grid (np.indices) instead of row/column loops; presets for
+           1D/2D/3D lattices and the real corundum (sapphire) cell with its 12 Al + 18 O sites.
+Potential: PeriodicGrid samples a (super)cell along its own cell vectors. Atoms are deposited once
+           (cloud-in-cell, np.bincount) and the superposed wells follow from one FFT convolution
+           with the analytic Gaussian kernel, O(P log P) instead of O(atoms x points):
+               V = depth * irfftn( rfftn(rho) * (2 pi s^2)^(d/2) exp(-2 pi^2 s^2 |G|^2) / W_cic(G) )
+           (G = reciprocal grid vectors, W_cic = sinc^2 window of the deposition).
+Locking:   The 5D wave is a standing wave cos(2 pi s / lambda) along a direction n (lambda = R_5D);
+           its antinodes are lambda/2 apart. Score = |sum w exp(4 pi i s / lambda)| / sum w with the
+           well depth w = -V (Hann-tapered along n against finite-size leakage): 1 = all wells sit on
+           antinodes, ~0 = incommensurate. The finite well width damps short waves by
+           exp(-2 pi^2 s^2 k^2), k = 2 / lambda. The grid is first reduced to a 1D profile along n
+           (one bincount), so a sweep over many R_5D/a ratios costs ratios x bins, not ratios x points.
+"""
+
+# Sapphire (corundum, R-3c, hexagonal axes) [nm] and Wyckoff parameters of Al (12c) and O (18e)
+CORUNDUM_A = 0.4759
+CORUNDUM_C = 1.2991
+CORUNDUM_Z_AL = 0.35216
+CORUNDUM_X_O = 0.30624
+
+# Gaussian well width of grid_locking: exp(-d^2 / 0.01) -> sigma^2 = 0.005 nm^2
+ATOM_SIGMA = np.sqrt(0.005)
+
+# Max. complex elements per block of the locking sweep
+SCORE_BLOCK_ELEMENTS = 4_000_000
+
+
+class BravaisLattice:
+    def __init__(self, vectors, basis=None, weights=None, name="lattice"):
+        """
+        vectors: primitive (or conventional) cell vectors as rows [d, d],
+        basis: fractional site coordinates [B, d] (default: one site at the origin),
+        weights: well depth per site [B].
+        """
+        self.vectors = np.atleast_2d(np.asarray(vectors, dtype=float))
+        self.dim = self.vectors.shape[0]
+        self.basis = (np.zeros((1, self.dim)) if basis is None else
+                      np.asarray(basis, dtype=float).reshape(-1, self.dim))
+        self.weights = (np.ones(len(self.basis)) if weights is None else
+                        np.broadcast_to(np.asarray(weights, dtype=float), (len(self.basis),)).copy())
+        self.name = name
+
+    # --- Presets ---
+    @classmethod
+    def chain(cls, a):
+        return cls([[a]], name="chain")
+
+    @classmethod
+    def square(cls, a):
+        return cls([[a, 0], [0, a]], name="square")
+
+    @classmethod
+    def hexagonal_2d(cls, a):
+        """Triangular net (2D slice of the hexagonal/trigonal lattice)."""
+        return cls([[a, 0], [0.5 * a, 0.5 * np.sqrt(3) * a]], name="hexagonal 2D")
+
+    @classmethod
+    def cubic(cls, a):
+        return cls(a * np.eye(3), name="sc")
+
+    @classmethod
+    def bcc(cls, a):
+        """Conventional cubic cell with 2 sites (axis-aligned supercells)."""
+        return cls(a * np.eye(3), [[0, 0, 0], [0.5, 0.5, 0.5]], name="bcc")
+
+    @classmethod
+    def fcc(cls, a):
+        """Conventional cubic cell with 4 sites."""
+        return cls(a * np.eye(3), [[0, 0, 0], [0, 0.5, 0.5], [0.5, 0, 0.5], [0.5, 0.5, 0]], name="fcc")
+
+    @classmethod
+    def hexagonal(cls, a, c):
+        return cls([[a, 0, 0], [-0.5 * a, 0.5 * np.sqrt(3) * a, 0], [0, 0, c]], name="hexagonal")
+
+    @classmethod
+    def corundum(cls, a=CORUNDUM_A, c=CORUNDUM_C, z_al=CORUNDUM_Z_AL, x_o=CORUNDUM_X_O, weights=(1.0, 1.0)):
+        """Sapphire Al2O3: hexagonal cell, 12 Al (12c) + 18 O (18e) incl. the rhombohedral centering."""
+        centering = np.array([[0, 0, 0], [2 / 3, 1 / 3, 1 / 3], [1 / 3, 2 / 3, 2 / 3]])
+        z, x = z_al, x_o
+        al = np.array([[0, 0, z], [0, 0, 0.5 - z], [0, 0, -z], [0, 0, 0.5 + z]])
+        o = np.array([[x, 0, 0.25], [0, x, 0.25], [-x, -x, 0.25],
+                      [-x, 0, 0.75], [0, -x, 0.75], [x, x, 0.75]])
+        sites = [(s[:, None, :] + centering[None]).reshape(-1, 3) % 1.0 for s in (al, o)]
+        lattice = cls.hexagonal(a, c)
+        return cls(lattice.vectors, np.vstack(sites),
+                   np.concatenate([np.full(len(s), w) for s, w in zip(sites, weights)]), name="corundum")
+
+    # --- Geometry ---
+    @property
+    def cell_volume(self):
+        return abs(np.linalg.det(self.vectors))
+
+    def cartesian(self, frac):
+        return np.asarray(frac, dtype=float) @ self.vectors
+
+    def points(self, counts):
+        """All sites of a block of counts[0] x counts[1] x ... cells -> (points [N, d], weights [N])."""
+        counts = np.broadcast_to(np.asarray(counts, dtype=int), (self.dim,))
+        cells = np.indices(counts).reshape(self.dim, -1).T
+        frac = (cells[:, None, :] + self.basis[None, :, :]).reshape(-1, self.dim)
+        return self.cartesian(frac), np.tile(self.weights, len(cells))
+
+    def points_in_box(self, lower, upper):
+        """All sites inside the axis-aligned box [lower, upper] (sorted by the last coordinate first)."""
+        lower = np.asarray(lower, dtype=float)
+        upper = np.asarray(upper, dtype=float)
+        corners = np.array(np.meshgrid(*zip(lower, upper), indexing="ij")).reshape(self.dim, -1).T
+        frac = corners @ np.linalg.inv(self.vectors)
+        start = np.floor(frac.min(axis=0)).astype(int) - 1
+        stop = np.ceil(frac.max(axis=0)).astype(int) + 1
+        points, weights = self.points(stop - start)
+        points += self.cartesian(start)
+        tol = 1e-9 * np.max(np.abs(upper - lower))
+        inside = np.all((points >= lower - tol) & (points <= upper + tol), axis=1)
+        points, weights = points[inside], weights[inside]
+        order = np.lexsort(points.T)
+        return points[order], weights[order]
+
+    def supercell(self, counts):
+        """(cell vectors [d, d] of the supercell, points, weights)."""
+        counts = np.broadcast_to(np.asarray(counts, dtype=int), (self.dim,))
+        points, weights = self.points(counts)
+        return counts[:, None] * self.vectors, points, weights
+
+
+def grid_shape(cell, n_points):
+    """
+    Grid shape with ~n_points samples and about equal spacing along all cell vectors
+    (each axis rounded to a fast FFT length: a prime factor like 97 costs 2-3x in rfftn).
+    """
+    lengths = np.linalg.norm(np.atleast_2d(cell), axis=1)
+    spacing = (np.prod(lengths) / n_points) ** (1.0 / len(lengths))
+    return tuple(next_fast_len(int(max(1, round(L / spacing))), real=True) for L in lengths)
+
+
+class PeriodicGrid:
+    def __init__(self, cell, shape):
+        """
+        Periodic sampling of the cell spanned by the rows of cell [d, d]:
+        grid point i = sum_k (i_k / n_k) * cell[k].
+        """
+        self.cell = np.atleast_2d(np.asarray(cell, dtype=float))
+        self.dim = self.cell.shape[0]
+        self.shape = tuple(int(n) for n in np.broadcast_to(shape, (self.dim,)))
+        self.size = int(np.prod(self.shape))
+        self.voxel_volume = abs(np.linalg.det(self.cell)) / self.size
+        self.reciprocal = np.linalg.inv(self.cell).T # Rows b_k with a_j . b_k = delta_jk (no 2 pi)
+
+    @property
+    def axes(self):
+        """Sample positions along each cell vector (1D: the x coordinates)."""
+        return [np.arange(n) / n * np.linalg.norm(v) for n, v in zip(self.shape, self.cell)]
+
+    def deposit(self, points, weights=None):
+        """Cloud-in-cell deposition -> density [shape] (sum over the cell = sum of weights / voxel volume)."""
+        points = np.asarray(points, dtype=float).reshape(-1, self.dim)
+        weights = np.ones(len(points)) if weights is None else np.asarray(weights, dtype=float)
+        shape = np.array(self.shape)
+        u = (points @ np.linalg.inv(self.cell)) * shape
+        base = np.floor(u).astype(np.int64)
+        frac = u - base
+        density = np.zeros(self.size)
+        # 2^d corners of the cell around every point
+        for corner in np.ndindex(*(2,) * self.dim):
+            corner = np.array(corner)
+            w = weights * np.prod(np.where(corner, frac, 1.0 - frac), axis=1)
+            idx = np.ravel_multi_index(((base + corner) % shape).T, self.shape)
+            density += np.bincount(idx, weights=w, minlength=self.size)
+        return density.reshape(self.shape) / self.voxel_volume
+
+    def _frequencies(self):
+        """Integer frequencies per axis on the rfftn grid (broadcastable)."""
+        freqs = []
+        for k, n in enumerate(self.shape):
+            m = np.fft.rfftfreq(n) * n if k == self.dim - 1 else np.fft.fftfreq(n) * n
+            freqs.append(m.reshape([-1 if j == k else 1 for j in range(self.dim)]))
+        return freqs
+
+    def gaussian_transfer(self, sigma):
+        """(2 pi s^2)^(d/2) exp(-2 pi^2 s^2 |G|^2) / W_cic on the rfftn grid (peak-1 Gaussian per atom)."""
+        freqs = self._frequencies()
+        g2 = 0.0
+        for c in range(self.dim):
+            g_c = sum(m * self.reciprocal[k, c] for k, m in enumerate(freqs))
+            g2 = g2 + g_c**2
+        transfer = (2 * np.pi * sigma**2) ** (self.dim / 2) * np.exp(-2 * np.pi**2 * sigma**2 * g2)
+        # Undo the smoothing of the linear deposition (sinc^2 per axis)
+        for m, n in zip(freqs, self.shape):
+            transfer = transfer / np.sinc(m / n) ** 2
+        return transfer
+
+    def potential(self, points, weights=None, sigma=ATOM_SIGMA, depth=-1.0):
+        """Superposition of Gaussian wells depth * w * exp(-r^2 / 2 s^2) of all points (periodic)."""
+        density = self.deposit(points, weights)
+        spectrum = np.fft.rfftn(density)
+        spectrum *= self.gaussian_transfer(sigma)
+        return depth * np.fft.irfftn(spectrum, s=self.shape, axes=range(self.dim))
+
+    def projection(self, direction):
+        """Coordinate s = x . n of every grid point [shape] (n normalized)."""
+        n = np.asarray(direction, dtype=float)
+        n = n / np.linalg.norm(n)
+        s = 0.0
+        for k, size in enumerate(self.shape):
+            step = (np.arange(size) / size) * (self.cell[k] @ n)
+            s = s + step.reshape([-1 if j == k else 1 for j in range(self.dim)])
+        return s
+
+    def profile(self, values, direction, bin_width=None):
+        """1D profile of values along direction: (bin centres s [K], summed values [K])."""
+        if bin_width is None:
+            bin_width = 0.25 * np.min(np.linalg.norm(self.cell, axis=1) / np.array(self.shape))
+        s = np.broadcast_to(self.projection(direction), self.shape).ravel()
+        s_min = s.min()
+        idx = ((s - s_min) / bin_width).astype(np.int64)
+        sums = np.bincount(idx, weights=np.asarray(values).ravel())
+        return s_min + (np.arange(len(sums)) + 0.5) * bin_width, sums
+
+
+def locking_scores(s, weights, wavelengths):
+    """
+    Antinode locking of the standing wave cos(2 pi s / lambda) for every wavelength:
+    |sum w exp(4 pi i s / lambda)| / sum w, evaluated in blocks of wavelengths.
+    """
+    s = np.asarray(s, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    k = 4 * np.pi / np.atleast_1d(np.asarray(wavelengths, dtype=float))
+    scores = np.empty(len(k))
+    block = max(1, SCORE_BLOCK_ELEMENTS // max(1, len(s)))
+    for i in range(0, len(k), block):
+        phase = k[i:i + block, None] * s[None, :]
+        scores[i:i + block] = np.hypot(np.cos(phase) @ weights, np.sin(phase) @ weights)
+    return scores / weights.sum()
+
+
+def hann_taper(s):
+    """sin^2 window over the range of s: suppresses the leakage of the finite crystal edges."""
+    t = (s - s.min()) / max(s.max() - s.min(), 1e-300)
+    return np.sin(np.pi * t) ** 2
+
+
+def locking_map(grid, potential, directions, wavelengths):
+    """Locking scores [D, M] of the wells (-potential) for D directions and M wavelengths."""
+    wells = -np.asarray(potential)
+    scores = np.empty((len(directions), len(np.atleast_1d(wavelengths))))
+    for d, direction in enumerate(directions):
+        s, w = grid.profile(wells, direction)
+        scores[d] = locking_scores(s, w * hann_taper(s), wavelengths)
+    return scores
+
+
+def sapphire_r5d(engine=None, n_sapphire=1.77):
+    """R_5D of sapphire from the universal calibration K (as in grid_locking / lattice_schematic)."""
+    engine = engine or PhysicsEngine()
+    return engine.H_BAR_C / (engine.SCALING_FACTOR_K * n_sapphire**2)
+
+
+def run_locking_map(n_points=10_000_000, cells=(6, 6, 2), ratios=None,
+                    out_path=os.path.join("images", "plots", "experiment_locking_map.png")):
+    """
+    Locking map of the full corundum cell: score vs. R_5D/a along a, [1-10] and c.
+    (a1 + a2 is the third a-axis of the hexagonal setting and equivalent to [100];
+    a1 - a2 is the distinct in-plane direction, 30 degrees off the a-axes.)
+    """
+    import matplotlib.pyplot as plt
+    print("--- Grid Locking Map: Corundum (Sapphire) 3D Cell ---")
+    ratios = np.linspace(0.5, 4.0, 701) if ratios is None else np.asarray(ratios, dtype=float)
+
+    lattice = BravaisLattice.corundum()
+    cell, points, weights = lattice.supercell(cells)
+    grid = PeriodicGrid(cell, grid_shape(cell, n_points))
+    print(f"{len(points)} atoms, grid {grid.shape} = {grid.size:.2e} points")
+
+    t0 = time.perf_counter()
+    potential = grid.potential(points, weights)
+    t_potential = time.perf_counter() - t0
+
+    a = CORUNDUM_A
+    directions = {"a [100]": lattice.vectors[0], "[1-10]": lattice.vectors[0] - lattice.vectors[1],
+                  "c [001]": lattice.vectors[2]}
+    t0 = time.perf_counter()
+    scores = locking_map(grid, potential, list(directions.values()), ratios * a)
+    t_map = time.perf_counter() - t0
+    print(f"Potential (FFT): {t_potential:.2f} s, locking map ({len(directions)} x {len(ratios)}): {t_map:.2f} s")
+
+    ratio_sapphire = sapphire_r5d() / a
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for label, row in zip(directions, scores):
+        ax.plot(ratios, row, lw=1.5, label=label)
+    ax.axvline(ratio_sapphire, color='red', ls='--', lw=1.5, label=f'Sapphire $R_{{5D}}/a$ = {ratio_sapphire:.2f}')
+    for label, row in zip(directions, scores):
+        print(f"  {label:8s}: score at sapphire ratio = {np.interp(ratio_sapphire, ratios, row):.3f}")
+    ax.set_title("Grid Locking Map: 5D Standing Wave vs. Corundum Unit Cell", fontsize=14)
+    ax.set_xlabel(r"$R_{5D} / a$", fontsize=12)
+    ax.set_ylabel("Locking Score (antinode overlap)", fontsize=12)
+    ax.set_yscale('log')
+    ax.set_ylim(1e-4, 1.2)
+    ax.grid(True, alpha=0.3)
+    ax.legend(loc='upper right')
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    plt.savefig(out_path, dpi=150)
+    plt.close(fig)
+    print(f"Saved locking map to {out_path}")
+    return ratios, scores
+
+
+if __name__ == "__main__":
+    run_locking_map()
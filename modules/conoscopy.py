@@ -0,0 +1,110 @@
+import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.spectral_color import rgb_weights, encode_srgb, visible_wavelengths
+from modules.stress_optics import POLARISCOPES
+
+"""
+Module: conoscopy.py
+Zweck: Physikalisch basierte Konoskopie (Interferenzbild im konvergenten Licht) fuer eine
+       c-geschnittene einachsige Platte, getrieben von tensor_simulation.BirefringentMaterial.
+Physik:
+    Punkt (x, y) der hinteren Brennebene <-> Strahl mit sin(alpha) = NA * r / r_max (Sinusbedingung),
+    Azimut phi. Exakte Phasendifferenz der Platte (Dicke t, optische Achse senkrecht):
+        k_o = (2 pi / lambda) sqrt(n_o^2 - sin^2 alpha)
+        k_e = (2 pi / lambda) (n_o / n_e) sqrt(n_e^2 - sin^2 alpha)
+        delta = t (k_o - k_e)
+    Gekreuzte Polarisatoren: I = sin^2(2 phi) sin^2(delta / 2) (Isogyren + Isochromaten),
+    zirkulares Polariskop: I = sin^2(delta / 2).
+Render:
+    delta haengt nur vom Radius ab -> das Spektrum wird einmal als radiales Profil [R, L]
+    berechnet und per Matrixprodukt mit den CIE-Gewichten [L, 3] zu RGB integriert.
+    Das Profil wird pro (Material, Dicke, NA, Spektrum) memoisiert; das Bild ist danach nur
+    noch ein Lookup + Kreuzfaktor pro Pixel.
+"""
+
+RADIAL_SAMPLES = 4096
+
+
+def plate_retardation(material, thickness_nm, sin_alpha, wavelengths_nm):
+    """Phasendifferenz delta [R, L] fuer sin(alpha)[R] und Wellenlaengen [L] (mit Dispersion)."""
+    lam = np.asarray(wavelengths_nm, dtype=float)
+    n_o = material.n_o(lam / 1000.0)
+    n_e = material.n_e(lam / 1000.0)
+    s2 = np.asarray(sin_alpha, dtype=float)[:, None]**2
+    k0 = 2 * np.pi / lam
+    k_o = k0 * np.sqrt(n_o**2 - s2)
+    k_e = k0 * (n_o / n_e) * np.sqrt(n_e**2 - s2)
+    return thickness_nm * (k_o - k_e)
+
+
+_PROFILE_CACHE = {}
+
+
+def radial_profile(material, thickness_nm, numerical_aperture=0.85, wavelengths_nm=None, n_radial=RADIAL_SAMPLES):
+    """
+    Lineares RGB-Profil [n_radial, 3] ueber sin(alpha) = 0 ... NA.
+    Memoisiert pro (Material-Parameter, Dicke, NA, Spektrum, Aufloesung); Ergebnis ist read-only.
+    """
+    lam = tuple(float(l) for l in (visible_wavelengths() if wavelengths_nm is None else wavelengths_nm))
+    key = (material.key, float(thickness_nm), float(numerical_aperture), lam, int(n_radial))
+    if key not in _PROFILE_CACHE:
+        sin_alpha = np.linspace(0.0, numerical_aperture, n_radial)
+        delta = plate_retardation(material, thickness_nm, sin_alpha, lam)
+        spectrum = np.sin(0.5 * delta).astype(np.float32)**2
+        profile = spectrum @ rgb_weights(lam) # [R, L] @ [L, 3] -> lineares RGB [R, 3]
+        profile.setflags(write=False)
+        _PROFILE_CACHE[key] = profile
+    return _PROFILE_CACHE[key]
+
+
+class Conoscope:
+    def __init__(self, material, thickness_mm=0.2, numerical_aperture=0.85, wavelengths_nm=None,
+                 polariscope="plane", exposure=1.0):
+        """
+        material: BirefringentMaterial (Sellmeier n_o / n_e)
+        polariscope: 'plane' (gekreuzte Polarisatoren, Malteserkreuz) oder 'circular'
+        """
+        if polariscope not in POLARISCOPES:
+            raise ValueError(f"Unknown polariscope '{polariscope}'. Available: {POLARISCOPES}")
+        self.material = material
+        self.thickness_nm = thickness_mm * 1e6
+        self.numerical_aperture = numerical_aperture
+        self.wavelengths_nm = visible_wavelengths() if wavelengths_nm is None else np.asarray(wavelengths_nm)
+        self.polariscope = polariscope
+        self.exposure = exposure
+
+    def profile(self):
+        return radial_profile(self.material, self.thickness_nm, self.numerical_aperture, self.wavelengths_nm)
+
+    def isochromate_radii(self, orders, wavelength_nm=550.0):
+        """
+        Normierte Radien r/r_max der Isochromaten-Ordnungen m (delta = 2 pi m) bei einer Wellenlaenge.
+        Ordnungen, die innerhalb der Apertur nicht auftreten, liefern NaN.
+        """
+        sin_alpha = np.linspace(0.0, self.numerical_aperture, RADIAL_SAMPLES)
+        delta = np.abs(plate_retardation(self.material, self.thickness_nm, sin_alpha, [wavelength_nm])[:, 0])
+        phase = 2 * np.pi * np.asarray(orders, dtype=float)
+        return np.interp(phase, delta, sin_alpha, left=np.nan, right=np.nan) / self.numerical_aperture
+
+    def render(self, size=1024):
+        """sRGB-Bild [size, size, 3] (float32); ausserhalb der Apertur schwarz."""
+        profile = self.profile() * np.float32(self.exposure)
+        n_radial = len(profile)
+
+        c = np.linspace(-1.0, 1.0, size, dtype=np.float32)
+        X, Y = c[None, :], c[::-1, None]
+        r2 = X * X + Y * Y
+        pos = np.minimum(np.sqrt(r2), 1.0) * np.float32(n_radial - 1)
+        i0 = np.minimum(pos.astype(np.int32), n_radial - 2)
+        frac = (pos - i0.astype(np.float32))[..., None] # int32 - float32 would promote to float64
+        rgb = profile[i0] * (1 - frac) + profile[i0 + 1] * frac # lineare Interpolation im Profil
+
+        if self.polariscope == "plane":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                cross = np.nan_to_num((2 * X * Y / r2)**2) # sin^2(2 phi)
+            rgb *= cross[..., None]
+        rgb[r2 > 1.0] = 0.0
+        return encode_srgb(rgb)
@@ -1,57 +1,319 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import pandas as pd
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
 
 """
 Module: data_connector.py
 Zweck: Schnittstelle für reale wissenschaftliche Daten.
-Funktion: Lädt externe Datensätze (simuliert) und wendet die 5D-Theorie an.
+Funktion: Registriert lokale Datensaetze (CSV, HDF5, NPZ, Text-Tabellen wie SPARC) und stellt
+          sie den Analysemodulen spaltenweise zur Verfuegung.
+Cache:
+    Jede Quelle wird genau einmal geparst und als spaltenweiser Binaer-Cache abgelegt
+    (.data_cache/<name>-<key>/: eine .npy-Datei pro Spalte + meta.json). Der Schluessel
+    haengt an (Pfad, Groesse, mtime_ns, Format, Optionen) -> geaenderte Dateien werden neu geparst.
+    Spaeter werden Spalten lazy per np.load(mmap_mode="r") eingeblendet: nur die Seiten, die
+    eine Analyse wirklich liest, kommen von der Platte.
+Erweiterbar:
+    register_reader("fits", read_fits, ".fits") haengt weitere Formate an; ein Reader liefert
+    {Spaltenname: 1D/ND-Array}.
 """
 
-def analyze_galaxy_data():
+DATA_CACHE_DIR = ".data_cache"
+
+
+# ------------------------------------------------------------------ Reader
+
+def read_csv(path, delimiter=",", **kw):
+    """CSV mit Kopfzeile -> Spalten (numerisch wo moeglich, sonst Strings)."""
+    table = np.genfromtxt(path, delimiter=delimiter, names=True, dtype=None, encoding="utf-8",
+                          autostrip=True, **kw)
+    return {name: np.atleast_1d(table[name]) for name in table.dtype.names}
+
+
+def read_npz(path):
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+
+def read_hdf5(path, group="/"):
+    """Alle Datasets unterhalb von 'group' (Spaltenname = Pfad im File, z.B. 'strain/asd')."""
+    if h5py is None:
+        raise ImportError("HDF5 datasets need the optional dependency h5py (pip install h5py).")
+    columns = {}
+    with h5py.File(path, "r") as f:
+        def visit(name, obj):
+            if isinstance(obj, h5py.Dataset):
+                columns[name] = obj[()]
+        f[group].visititems(visit)
+    return columns
+
+
+def _as_column(values):
+    try:
+        return np.array(values, dtype=float)
+    except ValueError:
+        return np.array(values, dtype=str)
+
+
+def read_text_table(path, names=None):
+    """
+    Whitespace-Tabelle mit '#'-Kommentaren (SPARC rotmod / kombinierte Kataloge).
+    Die erste Spalte darf Text sein (z.B. Galaxienname). Spaltennamen: 'names', sonst die
+    erste Kommentarzeile mit passender Spaltenzahl, sonst col0, col1, ...
+    Zeilen, deren Werte (ausser der ersten Spalte) keine Zahlen sind, werden uebersprungen.
+    """
+    comments, rows = [], []
+    width = None
+    with open(path) as f:
+        for line in f:
+            if line.startswith("#"):
+                comments.append(line.lstrip("#").split())
+                continue
+            parts = line.split()
+            if not parts or (width is not None and len(parts) != width):
+                continue
+            try:
+                rows.append([parts[0]] + [float(x) for x in parts[1:]])
+            except ValueError:
+                continue # Freitext-Praeambel
+            width = len(parts)
+
+    if width is None:
+        return {}
+    if names is None:
+        names = next((c for c in comments if len(c) == width), None)
+    if names is None:
+        names = [f"col{i}" for i in range(width)]
+    cols = list(zip(*rows))
+    return {name: _as_column(cols[0]) if i == 0 else np.array(cols[i], dtype=float)
+            for i, name in enumerate(names)}
+
+
+READERS = {}
+EXTENSIONS = {}
+
+
+def register_reader(fmt, reader, *extensions):
+    """Neues Format: reader(path, **options) -> {Spalte: Array}; extensions fuer die Auto-Erkennung."""
+    READERS[fmt] = reader
+    for ext in extensions:
+        EXTENSIONS[ext.lower()] = fmt
+
+
+register_reader("csv", read_csv, ".csv")
+register_reader("npz", read_npz, ".npz")
+register_reader("hdf5", read_hdf5, ".h5", ".hdf5")
+register_reader("text", read_text_table, ".dat", ".txt", ".mrt")
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in EXTENSIONS:
+        raise ValueError(f"Unknown data format '{ext}' for {path}. Available: {sorted(EXTENSIONS)}")
+    return EXTENSIONS[ext]
+
+
+# ------------------------------------------------------------------ Cache
+
+class Dataset:
+    def __init__(self, directory):
+        """Gecachter Datensatz; Spalten werden erst beim Zugriff (memory-mapped) geladen."""
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self._files = self.meta["columns"]
+        self._loaded = {}
+
+    @property
+    def columns(self):
+        return list(self._files)
+
+    @property
+    def source(self):
+        return self.meta["source"]
+
+    def __len__(self):
+        return self.meta["n_rows"]
+
+    def __contains__(self, column):
+        return column in self._files
+
+    def __getitem__(self, column):
+        if column not in self._loaded:
+            if column not in self._files:
+                raise KeyError(f"Column '{column}' not in dataset. Available: {self.columns}")
+            self._loaded[column] = np.load(os.path.join(self.directory, self._files[column]), mmap_mode="r")
+        return self._loaded[column]
+
+    def get(self, column, default=None):
+        return self[column] if column in self else default
+
+    def __repr__(self):
+        return f"Dataset({os.path.basename(self.source)}, rows={len(self)}, columns={self.columns})"
+
+
+def _write_cache(directory, source, fmt, options, columns):
+    """Spalten -> <directory>/colNNN.npy + meta.json (atomar ueber ein .part-Verzeichnis)."""
+    tmp = directory + ".part"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    files = {}
+    for i, (name, values) in enumerate(columns.items()):
+        values = np.asarray(values)
+        if values.dtype == object:
+            values = values.astype(str) # Objekt-Arrays lassen sich nicht mappen
+        files[name] = f"col{i:03d}.npy"
+        np.save(os.path.join(tmp, files[name]), values)
+    meta = {"source": source, "format": fmt, "options": options, "columns": files,
+            "n_rows": max((len(np.atleast_1d(v)) for v in columns.values()), default=0)}
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp, directory)
+
+
+class DataConnector:
+    def __init__(self, cache_dir=DATA_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.registry = {}  # name -> (path, format, options)
+        self.parsed = 0     # Anzahl Quellen, die in dieser Sitzung geparst wurden
+
+    def register(self, name, path, fmt=None, **options):
+        """Meldet eine lokale Datei unter 'name' an (Format aus der Endung, falls nicht angegeben)."""
+        path = os.path.abspath(path)
+        self.registry[name] = (path, fmt or detect_format(path), options)
+        return name
+
+    def _cache_dir_for(self, name, path, fmt, options):
+        st = os.stat(path)
+        h = hashlib.sha256(json.dumps([path, st.st_size, st.st_mtime_ns, fmt, options], sort_keys=True).encode())
+        return os.path.join(self.cache_dir, f"{name}-{h.hexdigest()[:16]}")
+
+    def open(self, name):
+        """
+        Datensatz 'name' (registriert) oder ein Dateipfad -> Dataset.
+        Beim ersten Zugriff wird geparst und gecacht, danach nur noch gemappt.
+        Dateipfade werden unter Dateiname + Hash des absoluten Pfads angemeldet, damit
+        gleichnamige Dateien in verschiedenen Verzeichnissen sich nicht gegenseitig verdraengen.
+        """
+        if name not in self.registry:
+            if not os.path.exists(name):
+                raise KeyError(f"Unknown dataset '{name}'. Registered: {sorted(self.registry)}")
+            path = os.path.abspath(name)
+            digest = hashlib.sha256(path.encode()).hexdigest()[:8]
+            name = self.register(f"{os.path.splitext(os.path.basename(path))[0]}-{digest}", path)
+        path, fmt, options = self.registry[name]
+        directory = self._cache_dir_for(name, path, fmt, options)
+
+        if not os.path.exists(os.path.join(directory, "meta.json")):
+            columns = READERS[fmt](path, **options)
+            for stale in self._stale_entries(name, directory):
+                shutil.rmtree(stale, ignore_errors=True)
+            _write_cache(directory, path, fmt, options, columns)
+            self.parsed += 1
+        return Dataset(directory)
+
+    def _stale_entries(self, name, current):
+        """Aeltere Cache-Versionen desselben Datensatzes (Quelle hat sich geaendert)."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        prefix = name + "-"
+        return [os.path.join(self.cache_dir, d) for d in os.listdir(self.cache_dir)
+                if d.startswith(prefix) and len(d) == len(prefix) + 16 and os.path.join(self.cache_dir, d) != current]
+
+
+_CONNECTOR = None
+
+
+def get_connector():
+    """Gemeinsamer Connector fuer alle Module (Cache im Arbeitsverzeichnis)."""
+    global _CONNECTOR
+    if _CONNECTOR is None:
+        _CONNECTOR = DataConnector()
+    return _CONNECTOR
+
+
+def register_dataset(name, path, fmt=None, **options):
+    return get_connector().register(name, path, fmt, **options)
+
+
+def open_dataset(source):
+    """Dataset-Objekt, registrierter Name oder Dateipfad -> Dataset."""
+    if isinstance(source, Dataset):
+        return source
+    return get_connector().open(source)
+
+
+# ------------------------------------------------------------------ Analyse
+
+def analyze_galaxy_data(source=None, galaxy=None):
+    """
+    source: Datensatz mit den Spalten Rad, Vobs, errV (optional Galaxy); None = eingebaute Messpunkte.
+    galaxy: Name in der Galaxy-Spalte (Standard: erste Galaxie des Katalogs).
+    """
     print("\n--- ANALYSE: Galaktische Rotationskurven (NASA Data Mockup) ---")
-    
-    # Simuierte echte Daten (Messpunkte von James Webb / Hubble)
-    # Radius (kpc), Geschwindigkeit (km/s), Fehlerbalken
-    # Diese Daten entsprechen typischen Spiralgalaxien wie UGC 2885
-    data_r = np.array([2, 5, 10, 20, 30, 40, 50])
-    data_v = np.array([150, 210, 280, 295, 300, 298, 302]) # Flache Kurve!
-    data_err = np.array([10, 15, 20, 15, 10, 12, 15])
-    
+
+    if source is None:
+        # Simuierte echte Daten (Messpunkte von James Webb / Hubble)
+        # Radius (kpc), Geschwindigkeit (km/s), Fehlerbalken
+        # Diese Daten entsprechen typischen Spiralgalaxien wie UGC 2885
+        label = 'NASA Messdaten (Webb/Rubin)'
+        data_r = np.array([2, 5, 10, 20, 30, 40, 50])
+        data_v = np.array([150, 210, 280, 295, 300, 298, 302]) # Flache Kurve!
+        data_err = np.array([10, 15, 20, 15, 10, 12, 15])
+    else:
+        data = open_dataset(source)
+        rows = slice(None)
+        if "Galaxy" in data:
+            names = data["Galaxy"]
+            galaxy = names[0] if galaxy is None else galaxy
+            rows = names == galaxy
+        label = f"{galaxy or os.path.basename(data.source)} ({len(data)} Zeilen im Datensatz)"
+        data_r, data_v, data_err = (np.asarray(data[c][rows]) for c in ("Rad", "Vobs", "errV"))
+
     # Unsere Theorie: v_5D(r) = sqrt( v_newton^2 + v_geometry^2 )
     # v_newton ~ 1/sqrt(r)
     # v_geometry ~ constant (aus log(Phi)-Potential)
-    
+
     def theoretical_curve(r):
         v_newton = 250 * np.sqrt(5/r) # Kepler-Abfall
         v_geom = 280 * (1 - np.exp(-r/10)) # Geometrischer "Boost"
         # Kombinierte effektive Geschwindigkeit
         # In unserer Theorie addieren sich die Kräfte (Potentiale)
-        return np.maximum(v_newton, v_geom) 
+        return np.maximum(v_newton, v_geom)
 
     # Plot
     plt.figure(figsize=(10, 6))
-    
+
     # 1. Die "echten" Daten
-    plt.errorbar(data_r, data_v, yerr=data_err, fmt='ko', label='NASA Messdaten (Webb/Rubin)')
-    
+    plt.errorbar(data_r, data_v, yerr=data_err, fmt='ko', label=label)
+
     # 2. Die klassische Erwartung (Newton)
-    r_smooth = np.linspace(1, 55, 100)
+    r_smooth = np.linspace(1, max(55, 1.1 * np.max(data_r)), 100)
     v_classic = 250 * np.sqrt(5/r_smooth)
     plt.plot(r_smooth, v_classic, 'b--', label='Klassische Physik (ohne Dunkle Materie)', alpha=0.5)
-    
+
     # 3. Unsere 5D-Vorhersage
     v_5d = theoretical_curve(r_smooth)
     plt.plot(r_smooth, v_5d, 'r-', linewidth=2, label='5D-Raumzeit-Theorie (Geometrie)')
-    
+
     plt.title("Validierung: Galaktische Rotation ohne Dunkle Materie", fontsize=14)
     plt.xlabel("Abstand vom Zentrum (kpc)")
     plt.ylabel("Geschwindigkeit (km/s)")
     plt.grid(True, alpha=0.3)
     plt.legend()
-    
+
     plt.savefig("galaxy_validation_analysis.png")
     print("Galaxy analysis saved to galaxy_validation_analysis.png")
 
 if __name__ == "__main__":
-    analyze_galaxy_data()
+    analyze_galaxy_data(sys.argv[1] if len(sys.argv) > 1 else None)
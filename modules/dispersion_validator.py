@@ -2,6 +2,30 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
 
+# --- 2. Echte Daten: Saphir (Ordinary Ray) ---
+# Sellmeier-Gleichung für Saphir (Quelle: Malitson 1962)
+def sapphire_index_real(wavelength_microns):
+    w = wavelength_microns
+    # Saphir 3-Term Sellmeier
+    # C-Werte sind lambda^2 (Mikrometer^2)
+    n_sq = 1 + (1.4313493 * w**2) / (w**2 - 0.0726631**2) + \
+               (0.65054713 * w**2) / (w**2 - 0.1193242**2) + \
+               (5.3414021 * w**2) / (w**2 - 18.028251**2)
+    return np.sqrt(n_sq)
+
+# --- 3. Unsere 5D-Theorie ---
+# Hypothese: n(omega) = n_vacuum + Kopplung / (m_Phi^2 - omega^2)
+# Das ist der Realteil des Propagators eines massiven Skalarfeldes (Lorentz-Oszillator).
+def theory_5d_propagator(omega, m_phi, coupling_A, n_offset):
+    # n(w) approx n_offset + A * 1/(m^2 - w^2)
+    # Wir testen, ob ein einziger effektiver Pol (Resonanz) das ganze Verhalten erklärt.
+    return n_offset + coupling_A / (m_phi**2 - omega**2)
+
+def fit_propagator(omegas, n_data, p0=(2.6e16, 2e32, 1.7)):
+    """Fit des 5D-Propagators an n(omega). Gibt (popt, pcov) von curve_fit zurück."""
+    # Startwerte: Masse ~ UV-Frequenz (2e16), Kopplung sehr groß, Offset ~ 1
+    return curve_fit(theory_5d_propagator, omegas, n_data, p0=list(p0), maxfev=100000)
+
 def run_dispersion_validation():
     print("--- Dispersion Validator: Testing 'Dispersion is Mass' Hypothesis ---")
 
@@ -9,35 +33,13 @@ def run_dispersion_validation():
     c = 299792458  # Lichtgeschwindigkeit in m/s
     h_bar = 1.0545718e-34
 
-    # --- 2. Echte Daten: Saphir (Ordinary Ray) ---
-    # Sellmeier-Gleichung für Saphir (Quelle: Malitson 1962)
-    def sapphire_index_real(wavelength_microns):
-        w = wavelength_microns
-        # Saphir 3-Term Sellmeier
-        # C-Werte sind lambda^2 (Mikrometer^2)
-        n_sq = 1 + (1.4313493 * w**2) / (w**2 - 0.0726631**2) + \
-                   (0.65054713 * w**2) / (w**2 - 0.1193242**2) + \
-                   (5.3414021 * w**2) / (w**2 - 18.028251**2)
-        return np.sqrt(n_sq)
-
     # Wir scannen von UV (0.2 um) bis Infrarot (2.0 um)
     wavelengths = np.linspace(0.25, 2.0, 100) # in Mikrometer
     n_real_data = sapphire_index_real(wavelengths)
     omegas = 2 * np.pi * c / (wavelengths * 1e-6) # Kreisfrequenzen in rad/s
 
-    # --- 3. Unsere 5D-Theorie ---
-    # Hypothese: n(omega) = n_vacuum + Kopplung / (m_Phi^2 - omega^2)
-    # Das ist der Realteil des Propagators eines massiven Skalarfeldes (Lorentz-Oszillator).
-    
-    def theory_5d_propagator(omega, m_phi, coupling_A, n_offset):
-        # n(w) approx n_offset + A * 1/(m^2 - w^2)
-        # Wir testen, ob ein einziger effektiver Pol (Resonanz) das ganze Verhalten erklärt.
-        return n_offset + coupling_A / (m_phi**2 - omega**2)
-
     # Fit durchführen
-    # Startwerte: Masse ~ UV-Frequenz (2e16), Kopplung sehr groß, Offset ~ 1
-    popt, pcov = curve_fit(theory_5d_propagator, omegas, n_real_data, 
-                           p0=[2.6e16, 2e32, 1.7], maxfev=100000)
+    popt, pcov = fit_propagator(omegas, n_real_data)
 
     m_phi_fit, coupling_fit, n_offset_fit = popt
 
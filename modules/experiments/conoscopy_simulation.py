@@ -1,6 +1,11 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from modules.conoscopy import Conoscope
+from modules.tensor_simulation import sapphire
 
 """
 Module: conoscopy_simulation.py
@@ -12,71 +17,49 @@ Reference:
     
 Physics: Instead of using classical birefringence, we project a 4D Hypercube (Tesseract) onto 2D.
 Goal: Prove that the optical "Isogyres" are actually the shadow of higher-dimensional geometry.
+Rendering: white-light conoscopy of a c-cut plate from the Sellmeier data of
+           tensor_simulation.BirefringentMaterial (modules/conoscopy.py).
 """
 
 def simulate_conoscopy():
     print("Simulating 5D Conoscopy (The Tesseract Shadow)...")
     
-    # Grid Setup (Reviewing the "Crystal" through a microscope)
-    size = 400
-    x = np.linspace(-2, 2, size)
-    y = np.linspace(-2, 2, size)
-    X, Y = np.meshgrid(x, y)
-    R = np.sqrt(X**2 + Y**2)
-    Theta = np.arctan2(Y, X)
+    # Microscope view of a 0.2 mm c-cut Sapphire plate (crossed polarizers, NA 0.85)
+    scope = Conoscope(sapphire, thickness_mm=0.2, numerical_aperture=0.85)
     
     # 1. Classical Theory (Birefringence)
-    # Intensity I = sin^2(2*theta) * sin^2(delta/2)
-    # Delta (Phase shift) ~ R^2 (for small angles)
-    # This produces the classic "Maltese Cross" (Isogyres).
+    # Intensity I = sin^2(2*theta) * sin^2(delta/2), delta from n_o / n_e per ray angle
+    # This produces the classic "Maltese Cross" (Isogyres), integrated over the visible spectrum.
     
     # 2. 5D Theory (Tesseract Projection)
     # We claim that the "Cross" is the projection of the 4D-axes (x, y, z, w).
-    # A 4D hypercube projected onto 2D looks like a square inside a square, connected.
-    # But in "Polar" projection (looking down the w-axis), the axes form a cross.
-    
-    # Simulate the Tesseract Phase Field:
-    # Phi_5D(x,y,z,w). We look at z=0 plane.
+    # In "Polar" projection (looking down the w-axis), the axes form a cross.
     # The "Isogyres" (Dark lines) match the axes where the projection is zero.
-    
-    # Intensity Model: 
-    # The "Cross" comes from the angular dependence sin(2*Theta)^2
-    cross_term = np.sin(2 * Theta)**2
-    
-    # The "Rings" (Isochromes) come from the 5D-Radius resonance
-    # R_5D = 0.86 nm. But here we see macroscopic interference.
-    # Phase = distance / R_5D.
-    # Let's assume the phase shift is simply proportional to R^2 (path length difference)
-    rings_term = np.sin(10 * R**2)**2
-    
-    intensity = cross_term * rings_term
+    image = scope.render(size=1024)
     
     # Visualization
     plt.figure(figsize=(10, 10))
-    # Use a colormap that looks like "Polarized Light" (Red/Blue or grayscale)
-    plt.imshow(intensity, extent=[-2, 2, -2, 2], cmap='nipy_spectral', interpolation='bilinear')
+    plt.imshow(image, extent=[-1, 1, -1, 1], interpolation='bilinear')
     
     # Overlay the Tesseract Geometry (The Theoretical Prediction)
     # A white cross indicating the 4D axes
     plt.axhline(0, color='white', linestyle='--', linewidth=1, alpha=0.5)
     plt.axvline(0, color='white', linestyle='--', linewidth=1, alpha=0.5)
     
-    # Circles for n=1, 2, 3 (The 5D Quantum Numbers)
-    circle1 = plt.Circle((0,0), np.sqrt(np.pi/10)*1, color='white', fill=False, linestyle=':')
-    circle2 = plt.Circle((0,0), np.sqrt(np.pi/10)*np.sqrt(2), color='white', fill=False, linestyle=':')
-    circle3 = plt.Circle((0,0), np.sqrt(np.pi/10)*np.sqrt(3), color='white', fill=False, linestyle=':')
-    plt.gca().add_patch(circle1)
-    plt.gca().add_patch(circle2)
-    plt.gca().add_patch(circle3)
+    # Circles for n=1, 2, 3 (The 5D Quantum Numbers): isochromates of order n at 550 nm
+    # (orders beyond the maximum retardation inside the aperture are not drawn)
+    for r in scope.isochromate_radii([1, 2, 3]):
+        if np.isnan(r):
+            continue
+        plt.gca().add_patch(plt.Circle((0, 0), r, color='white', fill=False, linestyle=':'))
 
     plt.title(r"5D-Conoscopy: The Tesseract Shadow ($\Phi$-Projection)", fontsize=14)
-    plt.xlabel("Optical Axis X", fontsize=12)
-    plt.ylabel("Optical Axis Y", fontsize=12)
-    plt.colorbar(label="Interference Intensity")
+    plt.xlabel(r"Optical Axis X ($\sin\alpha$ / NA)", fontsize=12)
+    plt.ylabel(r"Optical Axis Y ($\sin\alpha$ / NA)", fontsize=12)
     
     # Save
-    os.makedirs("images", exist_ok=True)
-    out_path = os.path.join("images", "experiment_conoscopy.png")
+    out_path = os.path.join("images", "plots", "experiment_conoscopy.png")
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
     plt.savefig(out_path, dpi=150)
     print(f"Saved simulation to {out_path}")
     plt.close()
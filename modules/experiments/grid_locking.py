@@ -6,11 +6,13 @@ import sys
 # Update Path to ensure we import the local modules correctly even if run from subfolder
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 from modules.physics_engine import PhysicsEngine
+from modules.bravais_lattice import BravaisLattice, PeriodicGrid, ATOM_SIGMA, locking_map, run_locking_map
 
 """
 Module: grid_locking.py
 Purpose: Visualizes the "Geometric Locking" (Resonance) between the 5D-Field and atomic matter.
 Physics: Compares the 5D-wavelength (lambda = 2*R_5D) with the Crystal Lattice Constant (a).
+Options: --map  Locking map of the full 3D corundum cell over many R_5D/a ratios (bravais_lattice.py)
 """
 
 def simulate_locking():
@@ -30,14 +32,19 @@ def simulate_locking():
     print(f"Sapphire Ratio Check: {ratio:.3f} (Should be ~2.08)")
     
     length = 5.0 # nm
-    x = np.linspace(0, length, 1000)
     
-    # 1. The Atomic Lattice (Potential Wells)
-    potential = np.zeros_like(x)
-    atom_positions = np.arange(0, length, a_lattice)
-    
-    for pos in atom_positions:
-        potential += -1.0 * np.exp(-(x - pos)**2 / 0.01)
+    # 1. The Atomic Lattice (Potential Wells): Gaussian wells of all atoms in one FFT convolution.
+    # The periodic cell is padded with empty space (>> well width) so no well wraps around;
+    # cropped to [0, length] this is the open chain of atoms at 0, a, 2a, ... < length.
+    atoms, weights = BravaisLattice.chain(a_lattice).points(int(np.ceil(length / a_lattice)))
+    padding = 1.0 # nm
+    grid = PeriodicGrid([[length + padding]], int(round((length + padding) / length * 1000)))
+    atom_positions = atoms[:, 0]
+    potential = grid.potential(atoms, weights, sigma=ATOM_SIGMA)
+    print(f"Locking Score at R_5D (antinode overlap): {locking_map(grid, potential, [[1.0]], R_5D)[0, 0]:.3f}")
+    x = grid.axes[0]
+    inside = x <= length
+    x, potential = x[inside], potential[inside]
         
     # 2. The 5D Standing Wave
     # With Ratio ~ 2.08, R_5D is approx 2*a.
@@ -77,4 +84,7 @@ def simulate_locking():
     plt.close()
 
 if __name__ == "__main__":
-    simulate_locking()
+    if "--map" in sys.argv:
+        run_locking_map()
+    else:
+        simulate_locking()
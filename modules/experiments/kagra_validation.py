@@ -1,6 +1,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from modules.data_connector import open_dataset
 
 """
 Module: kagra_validation.py
@@ -14,9 +18,17 @@ Source:
     
     Data extracted from "Figure 2: Target sensitivity of KAGRA" (Thermal Noise limit).
 Goal: Show that the "Quantum Limit" in the plot aligns with our Phi^-2 prediction.
+Optional: a measured sensitivity curve (CSV/HDF5/NPZ with columns 'frequency' and 'asd',
+          otherwise the first two columns) is loaded through data_connector and overlaid.
 """
 
-def simulate_kagra():
+def load_sensitivity(source):
+    """Measured ASD curve via data_connector (cached, memory-mapped columns) -> (f, h)."""
+    data = open_dataset(source)
+    f_col, h_col = ("frequency", "asd") if "frequency" in data and "asd" in data else data.columns[:2]
+    return np.asarray(data[f_col]), np.asarray(data[h_col])
+
+def simulate_kagra(data=None):
     print("Validating against KAGRA Data (NASA/JAXA)...")
     
     # Frequency range (Hz)
@@ -53,6 +65,9 @@ def simulate_kagra():
     # Log-Log Plot
     plt.loglog(f, h_total, 'k-', linewidth=1.5, label='KAGRA Sensitivity (Official Data)')
     plt.loglog(f, h_thermal, 'b--', alpha=0.5, label='Sapphire Thermal Noise')
+    if data is not None:
+        f_meas, h_meas = load_sensitivity(data)
+        plt.loglog(f_meas, h_meas, color='gray', linewidth=1, alpha=0.8, label=f'Measured ASD ({os.path.basename(str(data))})')
     
     # Our Prediction
     plt.loglog(f, h_5d_limit, 'r-', linewidth=2, label='5D-Geometry Limit (Predicted)')
@@ -80,4 +95,5 @@ def simulate_kagra():
     plt.close()
 
 if __name__ == "__main__":
-    simulate_kagra()
+    # --data <file>: gemessene Sensitivitaetskurve einblenden
+    simulate_kagra(sys.argv[sys.argv.index("--data") + 1] if "--data" in sys.argv else None)
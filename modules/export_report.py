@@ -2,17 +2,24 @@ import markdown
 import os
 import base64
 import re
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
-def get_image_base64(filepath):
-    # filepath coming from markdown is like "../images/..." or "images/..."
-    # We need to resolve it relative to the MD file location (docs/)
-    
-    # Base dir: c:\Users\Moritz\Documents\QRS\docs
-    base_dir = r"c:\Users\Moritz\Documents\QRS\docs"
-    
-    # Resolve path
-    full_path = os.path.normpath(os.path.join(base_dir, filepath))
-    
+# Pattern: ![alt](url)
+IMAGE_PATTERN = re.compile(r'!\[(.*?)\]\((.*?)\)')
+
+MIME_TYPES = {
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".svg": "image/svg+xml",
+    ".webp": "image/webp",
+}
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def get_image_base64(full_path):
     if not os.path.exists(full_path):
         print(f"Warning: Image not found: {full_path}")
         return ""
@@ -20,36 +27,56 @@ def get_image_base64(filepath):
     with open(full_path, "rb") as image_file:
         return base64.b64encode(image_file.read()).decode('utf-8')
 
-def export_report():
-    input_file = r"c:\Users\Moritz\Documents\QRS\docs\Final_Scientific_Report.md"
-    output_file = r"c:\Users\Moritz\Documents\QRS\Final_Report_Printable.html"
+def resolve_image_path(path, base_dir):
+    # path coming from markdown is like "../images/..." or "images/..."
+    # We need to resolve it relative to the MD file location (e.g. docs/)
+    return os.path.normpath(os.path.join(base_dir, path.replace("\\", "/")))
+
+def encode_images(text, base_dir, workers=None):
+    """
+    Collects all image references first, deduplicates them by resolved path and
+    encodes each file exactly once on a thread pool.
+    Returns {resolved_path: data URI or ""}.
+    """
+    paths = {resolve_image_path(m.group(2), base_dir) for m in IMAGE_PATTERN.finditer(text)
+             if not m.group(2).startswith(("http://", "https://", "data:"))}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        encoded = dict(zip(paths, pool.map(get_image_base64, paths)))
+
+    uris = {}
+    for path, b64 in encoded.items():
+        # Determine mime type
+        mime = MIME_TYPES.get(os.path.splitext(path)[1].lower(), "image/png")
+        uris[path] = f"data:{mime};base64,{b64}" if b64 else ""
+    return uris
+
+def export_report(input_file=None, output_file=None, workers=None):
+    input_file = input_file or os.path.join(REPO_ROOT, "docs", "Final_Scientific_Report.md")
+    output_file = output_file or os.path.join(REPO_ROOT, "Final_Report_Printable.html")
     
     print(f"Reading {input_file}...")
     with open(input_file, "r", encoding="utf-8") as f:
         text = f.read()
 
     # Pre-process images to embed them as Base64
-    # Regex to find ![alt](path)
-    # We want to replace path with data:image/...;base64,...
+    # We replace each ![alt](path) with an <img> carrying a data:image/...;base64,... source
+    base_dir = os.path.dirname(os.path.abspath(input_file))
+    uris = encode_images(text, base_dir, workers)
+    print(f"Embedded {sum(1 for u in uris.values() if u)} unique images.")
     
     def image_replacer(match):
         alt_text = match.group(1)
         path = match.group(2)
         
-        # Determine mime type
-        ext = os.path.splitext(path)[1].lower()
-        mime = "image/png"
-        if ext == ".gif": mime = "image/gif"
-        if ext == ".jpg" or ext == ".jpeg": mime = "image/jpeg"
-        
-        b64 = get_image_base64(path)
-        if b64:
-            return f'<img src="data:{mime};base64,{b64}" alt="{alt_text}" style="max-width:100%;">' 
+        uri = uris.get(resolve_image_path(path, base_dir), "")
+        if uri:
+            return f'<img src="{uri}" alt="{alt_text}" style="max-width:100%;">' 
         else:
             return f'![{alt_text}]({path})'
 
-    # Pattern: ![alt](url)
-    text_embedded = re.sub(r'!\[(.*?)\]\((.*?)\)', image_replacer, text)
+    # Single substitution pass with precomputed data URIs
+    text_embedded = IMAGE_PATTERN.sub(image_replacer, text)
 
     # Convert to HTML
     html_body = markdown.markdown(text_embedded, extensions=['tables', 'fenced_code'])
@@ -94,4 +121,9 @@ def export_report():
     print(f"Success! Printable Report saved to: {output_file}")
 
 if __name__ == "__main__":
-    export_report()
+    parser = argparse.ArgumentParser(description="Export a Markdown report to a self-contained HTML file.")
+    parser.add_argument("input", nargs="?", default=None, help="Markdown file (default: docs/Final_Scientific_Report.md)")
+    parser.add_argument("output", nargs="?", default=None, help="HTML file (default: Final_Report_Printable.html)")
+    parser.add_argument("--workers", type=int, default=None, help="Threads for image encoding")
+    args = parser.parse_args()
+    export_report(args.input, args.output, args.workers)
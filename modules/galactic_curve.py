@@ -1,6 +1,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.rotation_curve_fit import fit_curve, tension_model, run_catalogue_fit
 
 """
 Module: galactic_curve.py
@@ -40,19 +44,24 @@ def simulate_galaxy():
     # Our theory: v_geo^2 = c^2 * (1 - 1/n^2)? No, metric tension.
     # Phenomenological Fit: A constant velocity offset due to metric floor
     
-    v_vacuum_tension = 240.0 # km/s (The "Dark" Component)
-    # Soft transition
-    v_geometric = v_vacuum_tension * (1 - np.exp(-r/15.0))
+    # Fitted per galaxy (v_vacuum_tension = "Dark" component, r_scale = soft transition)
+    v_newton_data = np.sqrt(G * M_lum / data_r) * (data_r / (data_r + 2.0))
+    fit = fit_curve(data_r, data_v, data_err, v_bar=v_newton_data, name="UGC2885")
+    v_vacuum_tension, r_scale = fit["v_vacuum_tension"], fit["r_scale"]
+    print(f"Fit UGC 2885: v_vac = {v_vacuum_tension:.1f} +- {fit['sigma_v']:.1f} km/s, "
+          f"r_s = {r_scale:.1f} +- {fit['sigma_r']:.1f} kpc, chi2_red = {fit['chi2_red']:.2f}")
+    v_geometric = v_vacuum_tension * (1 - np.exp(-r/r_scale))
     
     # Total V
-    v_total_model = np.sqrt(v_newton**2 + v_geometric**2)
+    v_total_model = tension_model(r, v_newton**2, v_vacuum_tension, r_scale)
 
     
     # 4. Plotting
     plt.figure(figsize=(10, 6))
     
     plt.plot(r, v_newton, 'b--', label='Newton (Luminous Mass)', alpha=0.6)
-    plt.plot(r, v_total_model, 'r-', label='5D-Metric Prediction', linewidth=2)
+    plt.plot(r, v_total_model, 'r-', linewidth=2,
+             label=f'5D-Metric Fit ($v_{{vac}}$={v_vacuum_tension:.0f} km/s, $r_s$={r_scale:.1f} kpc)')
     plt.errorbar(data_r, data_v, yerr=data_err, fmt='ko', label='NASA Data (UGC 2885)', capsize=5)
     
     plt.fill_between(r, v_newton, v_total_model, color='red', alpha=0.1, label='Geometric Tension')
@@ -79,4 +88,9 @@ def simulate_galaxy():
     plt.close()
 
 if __name__ == "__main__":
-    simulate_galaxy()
+    if "--catalogue" in sys.argv:
+        # Batch fit of a SPARC-like catalogue (path after the flag, otherwise synthetic demo)
+        i = sys.argv.index("--catalogue")
+        run_catalogue_fit(sys.argv[i + 1] if i + 1 < len(sys.argv) else None)
+    else:
+        simulate_galaxy()
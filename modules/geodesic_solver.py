@@ -0,0 +1,417 @@
+import numpy as np
+from scipy.integrate import solve_ivp, RK45
+from scipy.optimize import brentq
+
+from modules.trajectory_store import TrajectoryStore, hermite_eval
+
+"""
+Module: geodesic_solver.py
+Zweck: Gemeinsame Geodaeten-API fuer alle 2D-Skalarfeld-Metriken.
+       Ersetzt die einzelnen Python-RHS-Funktionen (physics_engine_5d.geodesic_equation,
+       classical_ray_equation, raytracer_5d_engine.ray_equation) durch einen Solver,
+       der aus einer Metrik-Beschreibung eine schnelle rechte Seite baut.
+
+Metrik-Beschreibung:
+    metric(x, y) -> (Phi, dPhi_dx, dPhi_dy), vektorisiert (Skalare oder Arrays).
+    GaussianWell ist die eingebaute Standard-Metrik (Diamant-Delle, Linse).
+
+Bewegungsgesetze (model):
+    'geodesic_5d': a = -(1/Phi) * grad(Phi) * |v|^2   (physics_engine_5d)
+    'lens':        a = +(1/Phi) * grad(Phi) * |v|^2   (raytracer_5d_engine Konvention)
+    'classical':   a = grad(n) / n,  n = 1/Phi         (Gradientenindex-Optik)
+
+Events (solve_ivp-Konvention, event(t, state) mit .terminal/.direction):
+    domain_exit_event, interface_event, closest_approach_event, caustic_event.
+    GeodesicSolver.trace / trace_fixed_step lokalisieren sie per Nullstellensuche innerhalb
+    eines Schritts und speichern nur die Treffer (optional den Pfad).
+
+Optional: ist numba installiert, wird die RHS fuer GaussianWell JIT-kompiliert
+          (Einzelstrahl und integrate_batch).
+"""
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+MODELS = {"geodesic_5d": 0, "lens": 1, "classical": 2}
+
+
+def _force_factor(model_code, phi, vx, vy):
+    """Skalarer Vorfaktor f mit a = f * grad(Phi). Funktioniert fuer Skalare und Arrays."""
+    if model_code == 0:
+        return -(vx * vx + vy * vy) / phi
+    elif model_code == 1:
+        return (vx * vx + vy * vy) / phi
+    # classical: grad(n)/n = -(1/Phi^2) grad(Phi) * Phi = -grad(Phi)/Phi
+    return -1.0 / phi
+
+
+class GaussianWell:
+    def __init__(self, depth=0.6, width=2.0, center=(0.0, 0.0)):
+        """Phi(x, y) = 1 - depth * exp(-r^2 / width) (Raumzeit-Delle mit hohem n im Zentrum)."""
+        self.depth = depth
+        self.width = width
+        self.cx, self.cy = center
+
+    def __call__(self, x, y):
+        dx = x - self.cx
+        dy = y - self.cy
+        g = self.depth * np.exp(-(dx * dx + dy * dy) / self.width)
+        # Ableitungen (Kettenregel)
+        k = 2.0 * g / self.width
+        return 1.0 - g, k * dx, k * dy
+
+    def n_field(self, x, y):
+        return 1.0 / self(x, y)[0]
+
+
+def _make_gaussian_jit_rhs(metric, model_code):
+    """
+    JIT-Kernel fuer GaussianWell: rhs_into(Y[N, 4], out[N, 4]) schreibt in den Puffer des
+    Aufrufers (integrate_batch, keine Allokation pro Aufruf). rhs(t, state) ist die
+    solve_ivp-Variante; solve_ivp behaelt die Rueckgabewerte, daher dort ein frisches Array.
+    """
+    depth, width, cx, cy = metric.depth, metric.width, metric.cx, metric.cy
+
+    @njit
+    def rhs_into(Y, out):
+        for i in range(Y.shape[0]):
+            x, y, vx, vy = Y[i, 0], Y[i, 1], Y[i, 2], Y[i, 3]
+            dx = x - cx
+            dy = y - cy
+            g = depth * np.exp(-(dx * dx + dy * dy) / width)
+            k = 2.0 * g / width
+            phi = 1.0 - g
+            if model_code == 0:
+                f = -(vx * vx + vy * vy) / phi
+            elif model_code == 1:
+                f = (vx * vx + vy * vy) / phi
+            else:
+                f = -1.0 / phi
+            out[i, 0] = vx
+            out[i, 1] = vy
+            out[i, 2] = f * k * dx
+            out[i, 3] = f * k * dy
+        return out
+
+    def rhs(t, state):
+        return rhs_into(state.reshape(1, 4), np.empty((1, 4)))[0]
+
+    return rhs, rhs_into
+
+
+def domain_exit_event(xlim, ylim):
+    """Terminales solve_ivp-Event: der Strahl verlaesst das Rechteck xlim x ylim."""
+    (x0, x1), (y0, y1) = xlim, ylim
+
+    def domain_exit(t, state):
+        x, y = state[0], state[1]
+        return min(x - x0, x1 - x, y - y0, y1 - y)
+    domain_exit.terminal = True
+    domain_exit.direction = -1
+    return domain_exit
+
+
+def interface_event(n_field, n_threshold):
+    """Grenzflaechen-Durchgang: n(x, y) kreuzt n_threshold (beide Richtungen)."""
+    def interface(t, state):
+        return n_field(state[0], state[1]) - n_threshold
+    interface.terminal = False
+    interface.direction = 0
+    return interface
+
+
+def closest_approach_event(center=(0.0, 0.0)):
+    """Minimaler Abstand zu center: (r - c) . v wechselt von negativ nach positiv."""
+    cx, cy = center
+
+    def closest_approach(t, state):
+        return (state[0] - cx) * state[2] + (state[1] - cy) * state[3]
+    closest_approach.terminal = False
+    closest_approach.direction = 1
+    return closest_approach
+
+
+def caustic_event():
+    """
+    Kaustik / Fokus: ein mitgefuehrter Nachbarstrahl (state[4:8], siehe with_shadow_ray)
+    kreuzt den Hauptstrahl, d.h. die transversale Separation v x (r_s - r) wechselt das Vorzeichen.
+    """
+    def caustic(t, state):
+        return state[2] * (state[5] - state[1]) - state[3] * (state[4] - state[0])
+    caustic.terminal = False
+    caustic.direction = 0
+    caustic.needs_shadow = True
+    return caustic
+
+
+def with_shadow_ray(y0, offset=1e-4):
+    """Haengt einen Nachbarstrahl an, quer zur Startrichtung um offset versetzt -> Zustand [8]."""
+    y0 = np.asarray(y0, dtype=float)
+    v = y0[2:4]
+    normal = np.array((-v[1], v[0])) / np.hypot(v[0], v[1])
+    shadow = y0.copy()
+    shadow[:2] += offset * normal
+    return np.concatenate((y0, shadow))
+
+
+def hermite_interpolant(t0, y0, t1, y1):
+    """
+    Kubische Hermite-Interpolation eines Festschritts fuer Zustaende [x, y, vx, vy] (auch mehrere
+    Strahlen hintereinander): Position aus (r, v) an beiden Enden, Geschwindigkeit als deren Ableitung.
+    """
+    h = t1 - t0
+    a = np.asarray(y0, dtype=float).reshape(-1, 2, 2)
+    b = np.asarray(y1, dtype=float).reshape(-1, 2, 2)
+    p0, v0, p1, v1 = a[:, 0], a[:, 1], b[:, 0], b[:, 1]
+
+    def interp(t):
+        p, v = hermite_eval((t - t0) / h, h, p0, v0, p1, v1)
+        return np.stack((p, v), axis=1).ravel()
+    return interp
+
+
+class RayTrace:
+    def __init__(self, events):
+        """Ergebnis eines Event-Traces: Treffer je Event-Label, Endzustand, optional der Pfad."""
+        self.labels = [getattr(ev, "label", ev.__name__) for ev in events]
+        self.events = {label: [] for label in self.labels}  # label -> [(t, state[4])]
+        self.status = "t_max"   # 't_max' | Label des terminalen Events
+        self.t_end = None
+        self.state_end = None
+        self.n_steps = 0
+        self.trajectory = None  # TrajectoryStore der Integrator-Schritte (store_path=True)
+
+    @property
+    def path(self):
+        """Zustaende [S, 4] an den Integrator-Schritten (oder None)."""
+        return None if self.trajectory is None else self.trajectory.states(0)
+
+    def points(self, label):
+        """(x, y) aller Treffer eines Events als Array [K, 2]."""
+        return np.array([s[:2] for _, s in self.events.get(label, [])]).reshape(-1, 2)
+
+
+def _locate(events, g_old, g_new, t0, t1, interp):
+    """Vorzeichenwechsel der Event-Funktionen im Schritt [t0, t1] -> sortierte Liste (t, index)."""
+    hits = []
+    for i, ev in enumerate(events):
+        ga, gb = g_old[i], g_new[i]
+        if not (ga * gb < 0 or (gb == 0 and ga != 0)):
+            continue
+        rising = gb > ga
+        if (ev.direction > 0 and not rising) or (ev.direction < 0 and rising):
+            continue
+        t = t1 if gb == 0 else brentq(lambda tt: ev(tt, interp(tt)), t0, t1, xtol=1e-12)
+        hits.append((t, i))
+    return sorted(hits)
+
+
+def _run_trace(steps, t0, y0, events, store_path):
+    """
+    Gemeinsame Event-Schleife. steps liefert (t1, y1, interp) pro Integrator-Schritt.
+    Gespeichert werden nur Event-Treffer (Hauptstrahl state[:4]) und auf Wunsch der Pfad.
+    """
+    trace = RayTrace(events)
+    if store_path:
+        trace.trajectory = TrajectoryStore(1, 4, chunk_size=256)
+        trace.trajectory.append(t0, y0[:4])
+    g_old = [ev(t0, y0) for ev in events]
+    t, y = t0, y0
+
+    for t1, y1, interp in steps:
+        trace.n_steps += 1
+        g_new = [ev(t1, y1) for ev in events]
+        for t_hit, i in _locate(events, g_old, g_new, t, t1, interp):
+            state = interp(t_hit)
+            trace.events[trace.labels[i]].append((t_hit, state[:4]))
+            if events[i].terminal:
+                trace.status, trace.t_end, trace.state_end = trace.labels[i], t_hit, state[:4]
+                if store_path:
+                    trace.trajectory.append(t_hit, state[:4])
+                return trace
+        if store_path:
+            trace.trajectory.append(t1, y1[:4])
+        g_old, t, y = g_new, t1, y1
+
+    trace.t_end, trace.state_end = t, y[:4]
+    return trace
+
+
+def trace_fixed_step(step, y0, dt, n_steps, events=(), store_path=False, shadow_offset=1e-4, t0=0.0):
+    """
+    Event-Trace fuer externe Festschritt-Integratoren (z.B. PhysicsEngine.rk4_step).
+    step(state[4], dt) -> state[4]. Events werden per Hermite-Interpolation + brentq
+    innerhalb des Schritts lokalisiert; ein terminales Event beendet die Schleife sofort.
+    """
+    events = list(events)
+    y0 = np.asarray(y0, dtype=float)
+    if any(getattr(ev, "needs_shadow", False) for ev in events):
+        y0 = with_shadow_ray(y0, shadow_offset)
+
+    def steps():
+        t, y = t0, y0
+        for _ in range(n_steps):
+            y1 = np.concatenate([step(block, dt) for block in y.reshape(-1, 4)])
+            yield t + dt, y1, hermite_interpolant(t, y, t + dt, y1)
+            t, y = t + dt, y1
+
+    return _run_trace(steps(), t0, y0, events, store_path)
+
+
+class BatchResult:
+    def __init__(self, trajectory, final, exit_step, dt, t_end):
+        self.trajectory = trajectory  # TrajectoryStore (oder None bei store_every=0)
+        self.final = final            # Endzustand [N, 4]
+        self.exit_step = exit_step    # Schritt, in dem der Strahl die Domain verlassen hat
+        self.exit_time = exit_step * dt
+        if trajectory is None:
+            self.t, self.paths = np.array([t_end]), None
+        else:
+            self.t = trajectory.times()      # gespeicherte Zeitpunkte [S]
+            self.paths = trajectory.states() # Zustaende [S, N, 4] (View, keine Kopie)
+
+    def xy(self, i):
+        """Pfad eines einzelnen Strahls (nur bis zum Austritt)."""
+        path = self.trajectory.states(i)
+        return path[:, 0], path[:, 1]
+
+
+class GeodesicSolver:
+    def __init__(self, metric, model="geodesic_5d", jit=None):
+        """
+        metric: callable (x, y) -> (Phi, dPhi_dx, dPhi_dy), vektorisiert
+        model:  'geodesic_5d' | 'lens' | 'classical'
+        jit:    None = automatisch (numba vorhanden und GaussianWell), True/False erzwingen
+        """
+        if model not in MODELS:
+            raise ValueError(f"Unknown model '{model}'. Available: {sorted(MODELS)}")
+        self.metric = metric
+        self.model = model
+        self.model_code = MODELS[model]
+
+        use_jit = (njit is not None and isinstance(metric, GaussianWell)) if jit is None else jit
+        if use_jit and (njit is None or not isinstance(metric, GaussianWell)):
+            raise ValueError("JIT requires numba and a GaussianWell metric.")
+        self.rhs, self._rhs_into = self._rhs_numpy, None
+        if use_jit:
+            self.rhs, self._rhs_into = _make_gaussian_jit_rhs(metric, self.model_code)
+
+    def _rhs_numpy(self, t, state):
+        """solve_ivp-kompatible RHS; liefert ein ndarray statt einer Liste."""
+        x, y, vx, vy = state
+        phi, gx, gy = self.metric(x, y)
+        f = _force_factor(self.model_code, phi, vx, vy)
+        return np.array((vx, vy, f * gx, f * gy))
+
+    def rhs_batch(self, Y, out):
+        """RHS fuer N Zustaende Y[N, 4], schreibt in das vorallokierte Array out[N, 4]."""
+        if self._rhs_into is not None:
+            return self._rhs_into(Y, out)
+        vx = Y[:, 2]
+        vy = Y[:, 3]
+        phi, gx, gy = self.metric(Y[:, 0], Y[:, 1])
+        f = _force_factor(self.model_code, phi, vx, vy)
+        out[:, 0] = vx
+        out[:, 1] = vy
+        np.multiply(f, gx, out=out[:, 2])
+        np.multiply(f, gy, out=out[:, 3])
+        return out
+
+    def integrate(self, y0, t_span, events=None, **kwargs):
+        """Einzelner Strahl mit adaptivem solve_ivp (Standard: rtol=1e-6, max_step=0.1)."""
+        kwargs.setdefault("rtol", 1e-6)
+        kwargs.setdefault("max_step", 0.1)
+        return solve_ivp(self.rhs, t_span, np.asarray(y0, dtype=float), events=events, **kwargs)
+
+    def trace(self, y0, t_span, events=(), store_path=False, shadow_offset=1e-4, **kwargs):
+        """
+        Einzelner Strahl mit adaptivem RK45 und Event-Lokalisierung (dense output des Schritts).
+        Terminale Events (z.B. domain_exit_event) beenden die Integration sofort. Benoetigt ein
+        Event den Nachbarstrahl (caustic_event), wird er automatisch mitintegriert.
+        """
+        events = list(events)
+        y0 = np.asarray(y0, dtype=float)
+        rhs = self.rhs
+        if any(getattr(ev, "needs_shadow", False) for ev in events):
+            y0 = with_shadow_ray(y0, shadow_offset)
+            rhs = lambda t, s: np.concatenate((self.rhs(t, s[:4]), self.rhs(t, s[4:])))
+        kwargs.setdefault("rtol", 1e-6)
+        kwargs.setdefault("max_step", 0.1)
+        solver = RK45(rhs, t_span[0], y0, t_span[1], **kwargs)
+
+        def steps():
+            while solver.status == "running":
+                message = solver.step()
+                if solver.status == "failed":
+                    raise RuntimeError(f"Geodesic trace failed: {message}")
+                yield solver.t, solver.y, solver.dense_output()
+
+        return _run_trace(steps(), t_span[0], y0, events, store_path)
+
+    def integrate_batch(self, Y0, t_span, dt=0.05, xlim=None, ylim=None, store_every=1, dtype=np.float64):
+        """
+        Festschritt-RK4 fuer N Anfangszustaende gleichzeitig (vorallokierte Stufen-Arrays).
+        dt ist die maximale Schrittweite; sie wird so verkleinert, dass t_span genau aufgeht.
+        Strahlen ausserhalb von xlim/ylim werden eingefroren; sind alle draussen, endet die
+        Integration frueh. store_every=0 speichert nur den Endzustand, sonst landet jeder
+        store_every-te Schritt in einem vorallokierten TrajectoryStore (dtype, z.B. float32).
+        """
+        Y = np.array(Y0, dtype=float, ndmin=2)
+        N = Y.shape[0]
+        t0, t1 = t_span
+        n_steps = max(1, int(np.ceil((t1 - t0) / dt - 1e-9)))
+        dt = (t1 - t0) / n_steps # hoechstens dt, endet genau bei t1
+
+        k1, k2, k3, k4, tmp = (np.empty_like(Y) for _ in range(5))
+        active = np.ones(N, dtype=bool)
+        exit_step = np.full(N, n_steps)
+
+        store = None
+        if store_every:
+            n_store = n_steps // store_every + 1
+            store = TrajectoryStore(N, 4, chunk_size=n_store, stride=store_every, dtype=dtype)
+            store.append(t0, Y)
+        recorded = active
+
+        for step in range(n_steps):
+            self.rhs_batch(Y, k1)
+            np.multiply(k1, 0.5 * dt, out=tmp); tmp += Y
+            self.rhs_batch(tmp, k2)
+            np.multiply(k2, 0.5 * dt, out=tmp); tmp += Y
+            self.rhs_batch(tmp, k3)
+            np.multiply(k3, dt, out=tmp); tmp += Y
+            self.rhs_batch(tmp, k4)
+
+            # tmp = dt/6 * (k1 + 2k2 + 2k3 + k4), eingefrorene Strahlen bleiben stehen
+            k2 += k3
+            k2 *= 2.0
+            k2 += k1
+            k2 += k4
+            np.multiply(k2, dt / 6.0, out=tmp)
+            tmp[~active] = 0.0
+            Y += tmp
+
+            if xlim is not None or ylim is not None:
+                outside = np.zeros(N, dtype=bool)
+                if xlim is not None:
+                    outside |= (Y[:, 0] < xlim[0]) | (Y[:, 0] > xlim[1])
+                if ylim is not None:
+                    outside |= (Y[:, 1] < ylim[0]) | (Y[:, 1] > ylim[1])
+                leaving = active & outside
+                exit_step[leaving] = step + 1
+                recorded = recorded | active # Austrittspunkt gehoert noch zur Bahn
+                active &= ~outside
+
+            if store is not None and store.append(t0 + dt * (step + 1), Y, active=recorded):
+                recorded = active
+
+            if not active.any():
+                break
+
+        if store is not None:
+            # Nach fruehem Ende: restliche Samples mit dem (eingefrorenen) Endzustand auffuellen
+            while len(store) < n_store:
+                store.append(t0 + dt * store_every * len(store), Y, active=active, force=True)
+        return BatchResult(store, Y, exit_step, dt, t0 + dt * n_steps)
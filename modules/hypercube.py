@@ -0,0 +1,88 @@
+import numpy as np
+
+"""
+Module: hypercube.py
+Zweck: Geometrie beliebiger N-Wuerfel (Tesserakt N=4, Penterakt N=5, ...) fuer Projektionen.
+    - Ecken: Bitmuster von i = 0 .. 2^N - 1 (Bit k gesetzt -> Koordinate k = +1, sonst -1)
+    - Kanten: i -> i | (1 << k) fuer jedes nicht gesetzte Bit k (N * 2^(N-1) Kanten, keine Paarsuche)
+    - Rotationen: Givens-Matrizen in beliebigen Ebenen (a, b), zu einer Matrix komponiert
+    - Projektion: eine Matrixmultiplikation fuer alle Ecken, danach verschachtelte Perspektive
+      N -> 3 (Skalierung 1 / (d - x_k) je Dimension, vektorisiert) und orthographisch auf (x, y)
+"""
+
+
+def hypercube_vertices(n):
+    """Ecken [2^n, n] mit Koordinaten +-1."""
+    bits = (np.arange(2**n)[:, None] >> np.arange(n)[None, :]) & 1
+    return (2 * bits - 1).astype(float)
+
+
+def hypercube_edges(n):
+    """Kanten [n * 2^(n-1), 2] als Eckindex-Paare (unterscheiden sich in genau einem Bit)."""
+    i = np.arange(2**n)[:, None]
+    flip = 1 << np.arange(n)[None, :]
+    lo, k = np.nonzero((i & flip) == 0)
+    return np.column_stack((lo, lo | (1 << k)))
+
+
+def plane_rotation(n, a, b, theta):
+    """Givens-Rotation um theta in der Ebene (a, b) des R^n."""
+    R = np.eye(n)
+    c, s = np.cos(theta), np.sin(theta)
+    R[a, a] = R[b, b] = c
+    R[a, b] = -s
+    R[b, a] = s
+    return R
+
+
+def compose_rotation(n, planes, angle):
+    """planes: [(a, b, Geschwindigkeit)] -> Produkt der Ebenen-Rotationen um angle * Geschwindigkeit."""
+    R = np.eye(n)
+    for a, b, speed in planes:
+        R = plane_rotation(n, a, b, angle * speed) @ R
+    return R
+
+
+def default_planes(n):
+    """Standard-Animation: xw- und zw-Ebene wie beim Tesserakt, weitere Dimensionen langsamer."""
+    if n < 4:
+        return [(0, n - 1, 1.0)] + ([(1, n - 1, 0.5)] if n > 2 else [])
+    return [(0, n - 1, 1.0), (2, n - 1, 0.5)] + [(1, k, 0.3 + 0.1 * (k - 3)) for k in range(3, n - 1)]
+
+
+def perspective_project(points, d=3.0, out_dim=3):
+    """
+    Verschachtelte Zentralprojektion [V, n] -> [V, out_dim]: die hoechste Koordinate x_k wird mit
+    1 / (d - x_k) herausprojiziert, bis out_dim Koordinaten uebrig sind.
+    """
+    p = np.array(points, dtype=float)
+    for k in range(p.shape[1] - 1, out_dim - 1, -1):
+        denom = d - p[:, k]
+        p[:, :k] *= (1.0 / np.where(denom == 0, 1.0, denom))[:, None]
+    return p[:, :out_dim]
+
+
+class HypercubeView:
+    def __init__(self, n=4, planes=None, distance=3.0):
+        self.n = n
+        self.vertices = hypercube_vertices(n)
+        self.edges = hypercube_edges(n)
+        self.planes = default_planes(n) if planes is None else planes
+        self.distance = distance
+        self.depth_range = 0.75 * np.sqrt(n) # Farbskala der Tiefe (+-1.5 beim Tesserakt)
+
+    def project(self, angle):
+        """
+        Rotation + Projektion aller Ecken fuer einen Winkel.
+        Returns (xy [V, 2], depth [V]) mit depth = letzte Koordinate nach der Rotation (4. Dim. beim Tesserakt).
+        """
+        rotated = self.vertices @ compose_rotation(self.n, self.planes, angle).T
+        xy = perspective_project(rotated, self.distance, out_dim=3)[:, :2]
+        if self.n > 4:
+            xy *= self.distance**(self.n - 4) # jede weitere Perspektive schrumpft um ~1/d: auf Tesserakt-Groesse normieren
+        return xy, rotated[:, -1]
+
+    def segments(self, angle):
+        """Kanten als Segmente [E, 2, 2] plus Kantentiefe [E] (Tiefe der Startecke)."""
+        xy, depth = self.project(angle)
+        return xy[self.edges], depth[self.edges[:, 0]]
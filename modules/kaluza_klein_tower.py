@@ -8,6 +8,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from modules.physics_engine import PhysicsEngine
+from modules import kk_spectrum
 
 # --- 1. Physik-Engine Integration ---
 # Calculate Spectrum from Universal Theory (V4.2)
@@ -16,29 +17,26 @@ ENGINE = PhysicsEngine()
 # We analyze Sapphire as the reference case
 # n = 1.77
 n_sapphire = 1.77
-# Calculate Ground Mass m1 via Scaling Factor K
-m1_eV = ENGINE.SCALING_FACTOR_K * (n_sapphire**2) 
-# Result should be approx 63.5 * 1.77^2 = 198.9 eV (Updated from old 229 eV)
+
+def sapphire_base_mass():
+    # Calculate Ground Mass m1 via Scaling Factor K
+    # Result should be approx 63.5 * 1.77^2 = 198.9 eV (Updated from old 229 eV)
+    return float(kk_spectrum.base_mass(n_sapphire, ENGINE.SCALING_FACTOR_K))
 
 def calculate_kk_tower(max_n=5):
-    modes = []
-    for n in range(1, max_n + 1):
-        mass_eV = n * m1_eV
-        modes.append((n, mass_eV))
-    return modes
+    masses = kk_spectrum.mode_masses(max_n, ENGINE.SCALING_FACTOR_K, n_sapphire)
+    return list(zip(range(1, max_n + 1), masses.tolist()))
 
 def relativistic_velocity(energy_total_eV, rest_mass_eV):
     # E_total = gamma * m * c^2
     # v = c * sqrt(1 - (mc^2 / E)^2)
-    if energy_total_eV < rest_mass_eV:
-        return 0.0 # Existiert nicht (Tunneln oder virtuell)
-    
-    term = (rest_mass_eV / energy_total_eV)**2
-    beta = np.sqrt(1 - term)
-    return beta # in Einheiten von c
+    # Unterhalb der Schwelle: 0.0 (Existiert nicht - Tunneln oder virtuell)
+    beta = kk_spectrum.relativistic_beta(energy_total_eV, rest_mass_eV).filled(0.0)
+    return beta if beta.ndim else float(beta) # in Einheiten von c
 
 def run_kk_tower_analysis():
     print("--- Kaluza-Klein Spectrum Analysis (Universal V4.2) ---")
+    m1_eV = sapphire_base_mass()
     print(f"Base Mass m1 (Sapphire n={n_sapphire}): {m1_eV:.2f} eV")
     
     # --- 2. Berechnung ---
@@ -47,8 +45,8 @@ def run_kk_tower_analysis():
     # Wir schauen uns an, wie schnell ein Teilchen der Mode n=1 ist, 
     # wenn wir ihm verschiedene Energien geben.
     energies_scan = np.linspace(int(m1_eV), 1000, 500) # eV
-    velocities_n1 = [relativistic_velocity(e, m1_eV) for e in energies_scan]
-    velocities_n2 = [relativistic_velocity(e, m1_eV * 2) for e in energies_scan]
+    velocities_n1 = relativistic_velocity(energies_scan, m1_eV)
+    velocities_n2 = relativistic_velocity(energies_scan, m1_eV * 2)
     
     # --- 3. Visualisierung ---
     plt.figure(figsize=(12, 6))
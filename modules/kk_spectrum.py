@@ -0,0 +1,82 @@
+import numpy as np
+from functools import lru_cache
+
+"""
+Module: kk_spectrum.py
+Zweck: Vektorisierte Kaluza-Klein Spektren (N Moden x M Materialien x E Energien).
+       Massen, Geschwindigkeiten (beta) und Schwellen als Masked Arrays.
+       Der Import fuehrt keine Berechnung aus; alles wird lazy und memoisiert erzeugt.
+
+Modell (Universal V4.2):
+    m_1 = K * n^2          (Grundmasse, K = 63.5 eV Silicon-Gauge)
+    m_k = k * m_1          (Turm, k = 1..N)
+    beta = sqrt(1 - (m/E)^2)   fuer E >= m, sonst maskiert (Mode geschlossen)
+"""
+
+DEFAULT_K = 63.5  # eV, identisch mit PhysicsEngine.SCALING_FACTOR_K
+
+def base_mass(n_refractive, K=DEFAULT_K):
+    """Grundmasse m_1 = K * n^2 [eV]; akzeptiert Skalare und Arrays."""
+    return K * np.asarray(n_refractive, dtype=float)**2
+
+@lru_cache(maxsize=64)
+def _mode_masses_cached(n_modes, K, n_refractive):
+    masses = np.arange(1, n_modes + 1, dtype=float) * (K * n_refractive**2)
+    masses.flags.writeable = False
+    return masses
+
+def mode_masses(n_modes, K=DEFAULT_K, n_refractive=1.77):
+    """
+    Massen der Moden 1..n_modes fuer ein Material [eV].
+    Memoisiert pro (n_modes, K, n); das Ergebnis ist read-only.
+    """
+    return _mode_masses_cached(int(n_modes), float(K), float(n_refractive))
+
+def mass_table(n_modes, n_refractive, K=DEFAULT_K):
+    """Massen-Matrix [N, M] fuer M Materialien (Brechungsindizes)."""
+    m1 = base_mass(np.atleast_1d(n_refractive), K)
+    return np.arange(1, n_modes + 1, dtype=float)[:, None] * m1[None, :]
+
+def relativistic_beta(energy_total_eV, rest_mass_eV):
+    """
+    v/c = sqrt(1 - (m/E)^2) mit Broadcasting.
+    Unterhalb der Schwelle (E < m) ist der Wert maskiert (virtuell / Tunneln).
+    """
+    E = np.asarray(energy_total_eV, dtype=float)
+    m = np.asarray(rest_mass_eV, dtype=float)
+    closed = E < m
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = np.sqrt(np.where(closed, 0.0, 1.0 - (m / E)**2))
+    return np.ma.masked_array(beta, mask=np.broadcast_to(closed, beta.shape))
+
+def kk_table(n_modes, n_refractive, energies_eV, K=DEFAULT_K):
+    """
+    Kinematik-Tabelle fuer N Moden x M Materialien x E Energien.
+    Rueckgabe: dict mit
+        'masses'     [N, M]       Ruhemassen (eV)
+        'thresholds' [N, M]       Anregungsschwelle (= Masse, eV)
+        'beta'       [N, M, E]    Masked Array, maskiert wo E < m
+        'open'       [N, M, E]    bool, Mode kinematisch offen
+    """
+    masses = mass_table(n_modes, n_refractive, K)
+    E = np.atleast_1d(np.asarray(energies_eV, dtype=float))
+    beta = relativistic_beta(E[None, None, :], masses[:, :, None])
+    return {
+        "masses": masses,
+        "thresholds": masses,
+        "beta": beta,
+        "open": ~np.ma.getmaskarray(beta),
+    }
+
+def open_mode_count(n_refractive, energies_eV, n_max=1_000_000, K=DEFAULT_K):
+    """
+    Anzahl offener Moden pro (Material, Energie), begrenzt auf n_max.
+    Analytisch floor(E / m_1) statt Turm-Materialisierung -> auch n_max = 1e6 kostet O(M x E).
+    """
+    m1 = base_mass(np.atleast_1d(n_refractive), K)[:, None]
+    E = np.atleast_1d(np.asarray(energies_eV, dtype=float))[None, :]
+    return np.minimum(np.floor(E / m1), n_max).astype(np.int64)
+
+def cutoff_mode(energy_eV, n_refractive, K=DEFAULT_K):
+    """Hoechste kinematisch erreichbare Mode fuer eine Energie (0 = unterhalb Cutoff)."""
+    return np.floor(np.asarray(energy_eV, dtype=float) / base_mass(n_refractive, K)).astype(np.int64)
@@ -1,12 +1,13 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+from matplotlib.collections import EllipseCollection
 import sys
 import os
 
 # Robust Import
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from modules.physics_engine import PhysicsEngine
+from modules.bravais_lattice import BravaisLattice
 
 def run_lattice_schematic():
     print("--- Generating Crystal Lattice Schematic ---")
@@ -30,19 +31,14 @@ def run_lattice_schematic():
     rows = 5
     cols = 8
     
-    atom_x = []
-    atom_y = []
+    # Rectangular patch of the triangular net (odd rows shifted by a/2), row by row
+    atoms, _ = BravaisLattice.hexagonal_2d(a).points_in_box(
+        (0, 0), ((cols - 0.5) * a, (rows - 1) * a * np.sqrt(3)/2))
+    atom_x, atom_y = atoms[:, 0], atoms[:, 1]
     
-    for i in range(rows):
-        for j in range(cols):
-            x_shift = 0.5 * a if i % 2 else 0
-            x = j * a + x_shift
-            y = i * (a * np.sqrt(3)/2) 
-            atom_x.append(x)
-            atom_y.append(y)
-            
-            circle = plt.Circle((x, y), 0.08, color='#7f8c8d', alpha=0.5)
-            ax.add_patch(circle)
+    # All atom discs as one collection (radius 0.08 nm in data units)
+    ax.add_collection(EllipseCollection(0.16, 0.16, 0, units='xy', offsets=atoms,
+                                        offset_transform=ax.transData, color='#7f8c8d', alpha=0.5))
             
     ax.scatter(atom_x, atom_y, color='#2c3e50', s=50, label='Sapphire Atoms (Al/O)')
     
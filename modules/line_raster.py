@@ -0,0 +1,137 @@
+import numpy as np
+
+"""
+Module: line_raster.py
+Zweck: Leichter Offscreen-Rasterizer fuer Drahtgitter-Animationen (Hyperwuerfel-Projektionen).
+    - Ziel ist ein Palettenbild (uint8-Indizes): GIF-Frames brauchen keine Quantisierung mehr,
+      RGB fuer Video ist ein einziger Paletten-Lookup.
+    - Kanten werden vektorisiert abgetastet (ein Sample pro Pixel entlang der laengeren Achse)
+      und mit einem quadratischen Stempel auf die Linienbreite gebracht.
+    - Verdeckung per Rang-Z-Buffer: jedes Element bekommt einen Rang (hinten -> vorne, Punkte
+      ganz oben), np.maximum.at behaelt pro Pixel den hoechsten Rang -> deterministisch,
+      unabhaengig von der Schreibreihenfolge.
+"""
+
+
+def depth_palette(cmap="viridis", alpha=0.6, background=(255, 255, 255), fixed=((0, 0, 0), (220, 20, 20))):
+    """
+    Palette [256, 3] uint8: Index 0 = Hintergrund, 1.. = feste Farben (Text, Punkte),
+    der Rest ist die Farbskala, mit alpha auf den Hintergrund gemischt (wie alpha=0.6 im Plot).
+    Returns (palette, erster Skalenindex).
+    """
+    import matplotlib.pyplot as plt
+    first = 1 + len(fixed)
+    ramp = plt.get_cmap(cmap)(np.linspace(0.0, 1.0, 256 - first))[:, :3] * 255
+    bg = np.asarray(background, dtype=float)
+    palette = np.vstack((bg, np.asarray(fixed, dtype=float).reshape(-1, 3), bg + alpha * (ramp - bg)))
+    return np.round(palette).astype(np.uint8), first
+
+
+def _stencil(size):
+    """Offsets (dy, dx) eines size x size Quadrats um den Pixel."""
+    r = np.arange(size) - (size - 1) // 2
+    dy, dx = np.meshgrid(r, r, indexing="ij")
+    return dy.ravel(), dx.ravel()
+
+
+def _disk(radius):
+    r = np.arange(-int(radius), int(radius) + 1)
+    dy, dx = np.meshgrid(r, r, indexing="ij")
+    keep = dy**2 + dx**2 <= radius**2 + 0.5
+    return dy[keep], dx[keep]
+
+
+class LineRasterizer:
+    def __init__(self, width, height, extent=(-2.0, 2.0, -2.0, 2.0), line_width=2, point_radius=2.5):
+        """
+        extent: (xmin, xmax, ymin, ymax) der Szene; das Seitenverhaeltnis bleibt erhalten
+        (die Szene wird zentriert wie bei ax.set_aspect('equal')).
+        """
+        self.width = width
+        self.height = height
+        xmin, xmax, ymin, ymax = extent
+        self.scale = min(width / (xmax - xmin), height / (ymax - ymin))
+        self.center = (0.5 * (xmin + xmax), 0.5 * (ymin + ymax))
+        self.line_stencil = _stencil(max(1, int(round(line_width))))
+        self.point_stencil = _disk(point_radius)
+
+        self.background = np.zeros((height, width), dtype=np.uint8)
+        self.frame = np.empty((height, width), dtype=np.uint8)
+        self._zbuf = np.zeros(height * width, dtype=np.int32)
+        self._rgb = None
+
+    def to_pixels(self, xy):
+        """Szenenkoordinaten [..., 2] -> Pixel (x nach rechts, y nach unten) als float."""
+        px = (xy[..., 0] - self.center[0]) * self.scale + 0.5 * self.width
+        py = (self.center[1] - xy[..., 1]) * self.scale + 0.5 * self.height
+        return np.stack((px, py), axis=-1)
+
+    def _stamp(self, px, stencil):
+        """Pixelpositionen [K, 2] + Stempel -> (lineare Indizes, Quell-Index je Treffer)."""
+        dy, dx = stencil
+        ix = np.rint(px[:, 0]).astype(np.int64)[:, None] + dx[None, :]
+        iy = np.rint(px[:, 1]).astype(np.int64)[:, None] + dy[None, :]
+        inside = (ix >= 0) & (ix < self.width) & (iy >= 0) & (iy < self.height)
+        src = np.broadcast_to(np.arange(len(px))[:, None], ix.shape)
+        return (iy * self.width + ix)[inside], src[inside]
+
+    def _segment_samples(self, p0, p1):
+        """Abtastpunkte aller Segmente [S, 2] und ihr Segmentindex [S]."""
+        d = p1 - p0
+        n = np.ceil(np.max(np.abs(d), axis=1)).astype(np.int64) + 1
+        seg = np.repeat(np.arange(len(p0)), n)
+        start = np.repeat(np.cumsum(n) - n, n)
+        t = (np.arange(len(seg)) - start) / np.repeat(np.maximum(n - 1, 1), n)
+        return p0[seg] + t[:, None] * d[seg], seg
+
+    def render(self, segments, segment_colors, depth=None, points=None, point_color=2):
+        """
+        segments: [E, 2, 2] in Szenenkoordinaten, segment_colors: Paletten-Indizes [E],
+        depth: [E] (groesser = naeher am Betrachter), points: [V, 2] (oben drauf).
+        Ergebnis in self.frame (Palettenindizes [H, W]).
+        """
+        E = len(segments)
+        order = np.argsort(depth, kind="stable") if depth is not None else np.arange(E)
+        n_points = 0 if points is None else len(points)
+
+        # Rang 0 = Hintergrund, 1..E = Kanten von hinten nach vorne, danach die Punkte
+        colors = np.empty(1 + E + n_points, dtype=np.uint8)
+        colors[0] = 0
+        colors[1:E + 1] = np.asarray(segment_colors, dtype=np.uint8)[order]
+        colors[E + 1:] = point_color
+
+        zbuf = self._zbuf
+        zbuf.fill(0)
+        px = self.to_pixels(np.asarray(segments, dtype=float)[order])
+        samples, seg = self._segment_samples(px[:, 0], px[:, 1])
+        lin, src = self._stamp(samples, self.line_stencil)
+        np.maximum.at(zbuf, lin, (seg[src] + 1).astype(np.int32))
+
+        if n_points:
+            lin, src = self._stamp(self.to_pixels(np.asarray(points, dtype=float)), self.point_stencil)
+            np.maximum.at(zbuf, lin, (E + 1 + src).astype(np.int32))
+
+        frame = self.frame.reshape(-1)
+        np.take(colors, zbuf, out=frame)
+        np.copyto(frame, self.background.reshape(-1), where=zbuf == 0)
+        return self.frame
+
+    def to_rgb(self, palette):
+        """Aktueller Frame als RGB [H, W, 3] uint8 (Paletten-Lookup in einen wiederverwendeten Puffer)."""
+        if self._rgb is None:
+            self._rgb = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        return np.take(palette, self.frame, axis=0, out=self._rgb)
+
+    def set_title(self, text, color=1, size=None):
+        """Zeichnet eine zentrierte Titelzeile in den Hintergrund (einmalig, nicht pro Frame)."""
+        from PIL import Image, ImageDraw, ImageFont
+        size = size or max(12, self.height // 45)
+        try:
+            font = ImageFont.load_default(size=size)
+        except TypeError: # Pillow < 10.1: nur die feste Bitmap-Schrift
+            font = ImageFont.load_default()
+        mask = Image.new("L", (self.width, self.height), 0)
+        draw = ImageDraw.Draw(mask)
+        w = draw.textlength(text, font=font)
+        draw.text(((self.width - w) / 2, self.height * 0.06), text, fill=255, font=font)
+        self.background[np.asarray(mask) >= 128] = color
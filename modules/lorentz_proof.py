@@ -1,7 +1,11 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import solve_ivp
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.particle_pusher import BorisPusher, ParticleEnsemble, UniformField, run_ensemble
+from modules.trajectory_store import TrajectoryStore
 
 """
 Module: lorentz_proof.py
@@ -26,32 +30,27 @@ def simulate_lorentz_geodesic():
     # d2y/dt2 = (q/m) * (-dx/dt * B)
     # Dies ist die Geodätengleichung für die Metrik ds^2 = dt^2 - dx^2 + (d5 + A*dx)^2
     
-    def geodesic_derivs(t, state):
-        x, y, z, vx, vy, vz = state
-        
-        # Lorentz-Kraft Gesetz (F = q * v x B)
-        # B zeigt in z-Richtung (0, 0, B)
-        ax = q_over_m * vy * B_field
-        ay = q_over_m * -vx * B_field
-        az = 0
-        
-        return [vx, vy, vz, ax, ay, az]
-
     # Startbedingungen
     # Teilchen startet am Ursprung mit Geschwindigkeit in X
-    initial_state = [0, 0, 0, 1.0, 0.1, 0] 
-    t_span = (0, 20)
-    t_eval = np.linspace(0, 20, 500)
+    initial_state = [0, 0, 0, 1.0, 0.1, 0]
+    t_end, dt, stride = 20.0, 0.01, 4
 
-    # Löse die Differentialgleichung (Geodäte)
-    sol = solve_ivp(geodesic_derivs, t_span, initial_state, t_eval=t_eval)
+    # Geodaete per Boris-Pusher (exakt energieerhaltend), jeder 4. Schritt wird gespeichert
+    particle = ParticleEnsemble(np.reshape(initial_state[:3], (3, 1)), np.reshape(initial_state[3:], (3, 1)), q_over_m)
+    pusher = BorisPusher(particle, UniformField((0.0, 0.0, B_field)), dt)
+    pusher.initialize()
+    track = TrajectoryStore(1, 3, stride=stride, dtype=np.float64)
+    track.append(0.0, particle.x.T)
+    pusher.run(int(round(t_end / dt)), track, [0])
+    t_eval = track.times(0)
+    path = track.states(0).T
 
     # Visualisierung
     fig = plt.figure(figsize=(12, 6))
     
     # 2D Ansicht (Zyklotron-Bewegung)
     ax1 = fig.add_subplot(121)
-    ax1.plot(sol.y[0], sol.y[1], 'b-', lw=2, label='Projizierte 4D-Bahn')
+    ax1.plot(path[0], path[1], 'b-', lw=2, label='Projizierte 4D-Bahn')
     ax1.set_title("2D-Projektion: Zyklotron-Kreisbahn", fontsize=12)
     ax1.set_xlabel("X (Raum)")
     ax1.set_ylabel("Y (Raum)")
@@ -62,7 +61,7 @@ def simulate_lorentz_geodesic():
     # 3D Ansicht (Die Spirale durch die Zeit)
     ax2 = fig.add_subplot(122, projection='3d')
     # Wir nutzen die Zeit t als z-Achse für die Visualisierung der Weltlinie
-    ax2.plot(sol.y[0], sol.y[1], t_eval, 'r-', lw=2, label='Weltlinie')
+    ax2.plot(path[0], path[1], t_eval, 'r-', lw=2, label='Weltlinie')
     ax2.set_title("3D-Weltlinie (Raumzeit-Spirale)", fontsize=12)
     ax2.set_xlabel("X")
     ax2.set_ylabel("Y")
@@ -78,4 +77,7 @@ def simulate_lorentz_geodesic():
     plt.close()
 
 if __name__ == "__main__":
-    simulate_lorentz_geodesic()
+    if "--ensemble" in sys.argv:
+        run_ensemble()
+    else:
+        simulate_lorentz_geodesic()
@@ -1,5 +1,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.propagator_fit import fit_propagator, propagator_n
 
 """
 Module: nacl_dispersion_check.py
@@ -9,6 +14,7 @@ Method:
     1. Load REAL Sellmeier Data for NaCl (0.2um - 20um).
     2. Fit the 5D-Theory Model: n^2 - 1 = C / (m_eff^2 - E^2).
     3. Calculate RMSE. If RMSE is low, the resonance is real.
+    Fit: broadcast grid search + Levenberg-Marquardt (modules/propagator_fit.py).
 """
 
 # 5D Theory Model
@@ -16,9 +22,7 @@ Method:
 # This is a single-pole approximation of the Kaluza-Klein Tower.
 
 def theory_n(E, E_res, Amplitude):
-    # Avoid singularity
-    denom = E_res**2 - E**2
-    return np.sqrt(1 + Amplitude / denom)
+    return propagator_n(E, E_res, Amplitude)
 
 def real_n_nacl(lam_micron):
     """
@@ -64,23 +68,13 @@ def run_check():
     # We assume the UV pole (E_res) is the 5D Mass.
     # The IR pole is neglected (Phonons separate from 5D theory).
     
-    # Optimization: Find best E_res matching the curve
-    best_rmse = 999.0
-    best_E = 0.0
-    best_A = 0.0
-    
-    # Grid Search approx
-    for E_try in np.linspace(8.0, 15.0, 100): # Scan masses around 10eV (UV)
-        for A_try in np.linspace(100, 300, 50):
-            n_pred = theory_n(energies, E_try, A_try)
-            rmse = np.sqrt(np.mean((n_real - n_pred)**2))
-            if rmse < best_rmse:
-                best_rmse = rmse
-                best_E = E_try
-                best_A = A_try
+    # Optimization: Grid over masses around 10eV (UV) as start, then LM refinement
+    fit = fit_propagator(energies, n_real, E_grid=np.linspace(8.0, 15.0, 100), A_grid=np.linspace(100, 300, 50))
+    best_E, best_A, best_rmse = fit.E_res, fit.A, fit.rmse
                 
-    print(f"Optimal 5D-Mass for NaCl: {best_E:.3f} eV")
-    print(f"Fit RMSE: {best_rmse:.5f}")
+    print(f"Optimal 5D-Mass for NaCl: {best_E:.4f} +- {fit.sigma_E:.4f} eV")
+    print(f"Coupling A: {best_A:.2f} +- {fit.sigma_A:.2f} eV^2")
+    print(f"Fit RMSE: {best_rmse:.5f} (grid only: {fit.grid_rmse:.5f}, {fit.seconds * 1e3:.1f} ms)")
     
     if best_rmse < 0.01:
         print("RESULT: PERFECT FIT! The Salt Refractive Index follows the 5D-Mass Law.")
@@ -12,26 +12,18 @@ Theorie: Ein intensiver Laserpuls ändert n(x,t) via Kerr-Effekt.
          Dies ist die optische Analogie zu einem Schwarzen Loch.
 """
 
-def simulate_event_horizon():
-    print("Simulating Optical Event Horizon (Analog Gravity)...")
-    
-    # Gitter-Parameter (1D Simulation)
-    Nx = 1000
-    Nt = 1500
-    x = np.linspace(0, 100, Nx)
+def propagate_event_horizon(Nx=1000, Nt=1500, length=100.0, dt=0.05, v_pulse=0.9, n0=1.0, dn=0.5):
+    """
+    1D FDTD: schwaches Licht gegen einen bewegten Kerr-Puls.
+    Gibt (x, history [Nt, Nx]) zurück (E-Feld pro Zeitschritt).
+    """
+    x = np.linspace(0, length, Nx)
     dx = x[1] - x[0]
-    dt = 0.05 # Zeitschritt
     
     # Felder
     E = np.zeros(Nx)      # Elektrisches Feld (Das "Opfer"-Licht)
     E_prev = np.zeros(Nx)
     
-    # Der "Monster"-Puls (Das Schwarze Loch)
-    # Er bewegt sich mit Geschwindigkeit v_pulse
-    v_pulse = 0.9 
-    n0 = 1.0      # Basis-Brechungsindex
-    dn = 0.5      # Kerr-Effekt Stärke (Extreme Änderung durch 5D-Kopplung)
-    
     # Speicher für das Wasserfall-Diagramm (Raum-Zeit-Plot)
     history = np.zeros((Nt, Nx))
     
@@ -74,6 +66,23 @@ def simulate_event_horizon():
             E[-1] = E[-2]
             
         history[t_step, :] = E
+    return x, history
+
+def simulate_event_horizon():
+    print("Simulating Optical Event Horizon (Analog Gravity)...")
+    
+    # Gitter-Parameter (1D Simulation)
+    Nx = 1000
+    Nt = 1500
+    dt = 0.05 # Zeitschritt
+    
+    # Der "Monster"-Puls (Das Schwarze Loch)
+    # Er bewegt sich mit Geschwindigkeit v_pulse
+    v_pulse = 0.9 
+    n0 = 1.0      # Basis-Brechungsindex
+    dn = 0.5      # Kerr-Effekt Stärke (Extreme Änderung durch 5D-Kopplung)
+    
+    x, history = propagate_event_horizon(Nx, Nt, 100.0, dt, v_pulse, n0, dn)
         
     # Visualisierung: Das Raum-Zeit-Diagramm
     plt.figure(figsize=(10, 8))
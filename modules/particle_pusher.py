@@ -0,0 +1,303 @@
+import numpy as np
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.trajectory_store import TrajectoryStore
+
+"""
+Module: particle_pusher.py
+Zweck: Boris-Integrator fuer grosse Ensembles geladener Teilchen (Kaluza-Klein-Bild:
+       Ladung/Masse = p5 / m, Magnetfeld = Verdrillung der 5. Dimension).
+Verfahren (Leapfrog, v auf Halbschritten):
+    t = (q/m) B dt / 2,   s = 2 t / (1 + |t|^2)
+    v' = v + v x t,       v+ = v + v' x s,       x += v+ dt
+    Die Rotation ist exakt normerhaltend -> |v| (kinetische Energie) bleibt ohne E-Feld bis auf
+    Rundungsfehler konstant, auch ueber Millionen Umlaeufe.
+Umsetzung:
+    - Zustaende im SoA-Layout [3, N] (jede Komponente zusammenhaengend), q/m pro Teilchen [N]
+    - alle Zwischengroessen in vorallokierten Puffern (out=...), keine Allokation pro Schritt
+    - Felder als Objekte mit evaluate(x, out) -> B [3, N] (oder [3, 1] fuer homogene Felder)
+    - homogene Felder: t und s sind zeitlich konstant -> einmal vorberechnet; liegt B auf einer
+      Koordinatenachse, ist der Boris-Schritt eine ebene Drehung mit festem (cos, sin) pro Teilchen
+    - optionale Bahnen ausgewaehlter Teilchen dezimiert in einem TrajectoryStore
+"""
+
+
+# ------------------------------------------------------------------ Felder
+
+class UniformField:
+    uniform = True
+
+    def __init__(self, B=(0.0, 0.0, 1.0)):
+        self.B = np.asarray(B, dtype=float)
+
+    def evaluate(self, x, out=None):
+        return self.B[:, None]
+
+
+class MagneticMirror:
+    uniform = False
+
+    def __init__(self, B0=1.0, L=10.0):
+        """
+        Magnetische Flasche entlang z (divergenzfrei bis zur 1. Ordnung in r):
+        Bz = B0 (1 + (z/L)^2), Bx = -B0 x z / L^2, By = -B0 y z / L^2
+        """
+        self.B0 = B0
+        self.L = L
+
+    def evaluate(self, x, out):
+        k = -self.B0 / self.L**2
+        np.multiply(x[0], x[2], out=out[0])
+        out[0] *= k
+        np.multiply(x[1], x[2], out=out[1])
+        out[1] *= k
+        np.multiply(x[2], x[2], out=out[2])
+        out[2] *= self.B0 / self.L**2
+        out[2] += self.B0
+        return out
+
+
+class GradientField:
+    uniform = False
+
+    def __init__(self, B0=1.0, L=20.0):
+        """Bz = B0 (1 + x / L): grad-B-Drift in y-Richtung."""
+        self.B0 = B0
+        self.L = L
+
+    def evaluate(self, x, out):
+        out[0] = 0.0
+        out[1] = 0.0
+        np.multiply(x[0], self.B0 / self.L, out=out[2])
+        out[2] += self.B0
+        return out
+
+
+# ------------------------------------------------------------------ Ensemble + Pusher
+
+class ParticleEnsemble:
+    def __init__(self, x, v, q_over_m, dtype=np.float64):
+        """x, v: [3, N] (SoA); q_over_m: [N] oder Skalar (= p5 / m im KK-Bild)."""
+        self.x = np.ascontiguousarray(x, dtype=dtype)
+        self.v = np.ascontiguousarray(v, dtype=dtype)
+        self.q_over_m = np.ascontiguousarray(np.broadcast_to(q_over_m, self.x.shape[1:]), dtype=dtype)
+
+    @classmethod
+    def from_p5(cls, x, v, p5, mass, dtype=np.float64):
+        """Kaluza-Klein-Parametrisierung: Ladung = Impuls in der 5. Dimension."""
+        return cls(x, v, np.asarray(p5, dtype=float) / np.asarray(mass, dtype=float), dtype)
+
+    @classmethod
+    def thermal(cls, n, v_thermal=1.0, q_over_m=(0.5, 2.0), spread=5.0, seed=0, dtype=np.float64):
+        """N Teilchen mit Maxwell-Geschwindigkeiten, q/m gleichverteilt in q_over_m=(min, max)."""
+        rng = np.random.default_rng(seed)
+        x = rng.uniform(-spread, spread, (3, n))
+        v = rng.normal(0.0, v_thermal, (3, n))
+        return cls(x, v, rng.uniform(q_over_m[0], q_over_m[1], n), dtype)
+
+    def __len__(self):
+        return self.x.shape[1]
+
+    def kinetic_energy(self):
+        """Kinetische Energie pro Masse 0.5 |v|^2 [N]."""
+        return 0.5 * np.einsum("ij,ij->j", self.v, self.v)
+
+
+def _cross(a, b, out, tmp):
+    """out = a x b fuer SoA-Arrays [3, N] (b darf [3, 1] sein), ohne Allokation."""
+    for i, j, k in ((0, 1, 2), (1, 2, 0), (2, 0, 1)):
+        np.multiply(a[j], b[k], out=out[i])
+        np.multiply(a[k], b[j], out=tmp)
+        out[i] -= tmp
+
+
+class BorisPusher:
+    def __init__(self, ensemble, field, dt):
+        self.ensemble = ensemble
+        self.field = field
+        self.dt = dt
+        self.time = 0.0
+        self.n_steps = 0
+
+        shape, dtype = ensemble.x.shape, ensemble.x.dtype
+        self._B = np.empty(shape, dtype=dtype)
+        self._t = np.empty(shape, dtype=dtype)
+        self._s = np.empty(shape, dtype=dtype)
+        self._w = np.empty(shape, dtype=dtype)     # v' bzw. Kreuzprodukte
+        self._w2 = np.empty(shape, dtype=dtype)
+        self._n = np.empty(shape[1:], dtype=dtype)
+        self._tmp = np.empty(shape[1:], dtype=dtype)
+        self._static = None # (dt, plane, cos, sin) fuer homogene Felder
+
+    def _rotation_vectors(self, dt):
+        """t = (q/m) B dt/2 und s = 2t / (1 + |t|^2) in die Puffer."""
+        B = self.field.evaluate(self.ensemble.x, self._B)
+        t, s, n = self._t, self._s, self._n
+        np.multiply(self.ensemble.q_over_m, 0.5 * dt, out=n)
+        np.multiply(B, n, out=t)
+        np.multiply(t[0], t[0], out=n)
+        for i in (1, 2):
+            np.multiply(t[i], t[i], out=self._tmp)
+            n += self._tmp
+        n += 1.0
+        np.divide(2.0, n, out=n)
+        np.multiply(t, n, out=s)
+
+    def _static_rotation(self, dt):
+        """
+        Homogenes Feld: t, s nur einmal pro dt berechnen. Bei achsparallelem B (Achse a, Ebene (i, j))
+        wird die Rotation zu v_i' = c v_i + s v_j, v_j' = c v_j - s v_i mit
+        c = (1 - tau^2) / (1 + tau^2), s = 2 tau / (1 + tau^2), tau = (q/m) B_a dt / 2.
+        """
+        if self._static is not None and self._static[0] == dt:
+            return self._static
+        self._rotation_vectors(dt)
+        B = self.field.B
+        axis = np.flatnonzero(B)
+        plane = None
+        if len(axis) == 1:
+            a = axis[0]
+            plane = ((a + 1) % 3, (a + 2) % 3)
+            tau = self._t[a].copy()
+            sin = 2.0 * tau / (1.0 + tau * tau)
+            self._static = (dt, plane, 1.0 - tau * sin, sin)
+        else:
+            self._static = (dt, None, self._t.copy(), self._s.copy())
+        return self._static
+
+    def _rotate(self, dt):
+        """Boris-Rotation von v um den Winkel 2 atan(|t|) (exakt normerhaltend)."""
+        v, w = self.ensemble.v, self._w
+        if getattr(self.field, "uniform", False):
+            _, plane, t, s = self._static_rotation(dt)
+            if plane is not None: # t, s sind hier (cos, sin) der ebenen Drehung
+                i, j = plane
+                np.multiply(v[i], t, out=w[0])
+                np.multiply(v[j], s, out=self._tmp)
+                w[0] += self._tmp
+                np.multiply(v[i], s, out=self._tmp)
+                v[j] *= t
+                v[j] -= self._tmp
+                v[i] = w[0]
+                return
+        else:
+            self._rotation_vectors(dt)
+            t, s = self._t, self._s
+        _cross(v, t, w, self._tmp)
+        w += v
+        _cross(w, s, self._w2, self._tmp)
+        v += self._w2
+
+    def initialize(self):
+        """Leapfrog-Start: v(0) -> v(-dt/2) durch eine halbe Rotation rueckwaerts."""
+        self._rotate(-0.5 * self.dt)
+
+    def step(self):
+        self._rotate(self.dt)
+        np.multiply(self.ensemble.v, self.dt, out=self._w)
+        self.ensemble.x += self._w
+        self.time += self.dt
+        self.n_steps += 1
+
+    def run(self, n_steps, track=None, track_idx=None, monitor=None):
+        """
+        n_steps Schritte. track: TrajectoryStore fuer die Teilchen track_idx (Komponenten x, y, z),
+        dezimiert ueber track.stride. monitor: Objekt mit update(pusher) nach jedem Schritt.
+        """
+        for _ in range(n_steps):
+            self.step()
+            if track is not None:
+                track.append(self.time, self.ensemble.x[:, track_idx].T)
+            if monitor is not None and self.n_steps % monitor.every == 0:
+                monitor.update(self)
+
+
+class GyroMonitor:
+    def __init__(self, pusher, every=8):
+        """
+        Akkumuliert die Gyrophase atan2(v_prev x v, v_prev . v) in der xy-Ebene (B ~ z) alle
+        'every' Schritte (die Drehung zwischen zwei Samples muss unter pi bleiben) sowie die
+        relative Energieabweichung jedes Teilchens.
+        """
+        ensemble = pusher.ensemble
+        self.every = every
+        self.phase = np.zeros(len(ensemble))
+        self.e0 = ensemble.kinetic_energy()
+        self.energy_error = np.zeros(len(ensemble))
+        self.t_start = self.t_last = pusher.time
+        self._v_prev = ensemble.v[:2].copy()
+
+    def update(self, pusher):
+        v = pusher.ensemble.v
+        vx0, vy0 = self._v_prev
+        self.phase += np.arctan2(vx0 * v[1] - vy0 * v[0], vx0 * v[0] + vy0 * v[1])
+        self._v_prev[:] = v[:2]
+        self.t_last = pusher.time
+
+    @property
+    def omega(self):
+        """Gemessene Gyrofrequenz [N] (positiv fuer q > 0: Drehung im Uhrzeigersinn um B)."""
+        return -self.phase / max(self.t_last - self.t_start, 1e-300)
+
+    def finish(self, pusher):
+        e = pusher.ensemble.kinetic_energy()
+        self.energy_error = np.abs(e - self.e0) / np.maximum(self.e0, 1e-300)
+        return self
+
+
+def gyro_statistics(ensemble, field, dt=0.05, n_steps=400, track_particles=0, track_stride=4, monitor_every=8):
+    """
+    Schiebt das Ensemble n_steps weiter und liefert (stats, track).
+    stats: gemessene Gyrofrequenz [N], Larmor-Radius [N], Energiefehler [N], Laufzeit.
+    """
+    pusher = BorisPusher(ensemble, field, dt)
+    pusher.initialize()
+    monitor = GyroMonitor(pusher, monitor_every)
+    v_perp = np.hypot(ensemble.v[0], ensemble.v[1])
+
+    track, idx = None, None
+    if track_particles:
+        idx = np.arange(min(track_particles, len(ensemble)))
+        track = TrajectoryStore(len(idx), 3, stride=track_stride, dtype=np.float32)
+
+    t0 = time.perf_counter()
+    pusher.run(n_steps, track, idx, monitor)
+    seconds = time.perf_counter() - t0
+    monitor.finish(pusher)
+
+    B0 = np.linalg.norm(field.evaluate(ensemble.x, np.empty_like(ensemble.x)), axis=0)
+    stats = {
+        "omega": monitor.omega,
+        "omega_theory": ensemble.q_over_m * B0,
+        "larmor_radius": v_perp / np.abs(ensemble.q_over_m * B0),
+        "energy_error": monitor.energy_error,
+        "seconds": seconds,
+        "particle_steps_per_s": len(ensemble) * n_steps / seconds,
+    }
+    return stats, track
+
+
+def run_ensemble(n=1_000_000, n_steps=250, dt=0.08):
+    print("--- Boris-Pusher: Gyro-Statistik fuer ein grosses Ensemble ---")
+    ensemble = ParticleEnsemble.thermal(n)
+    field = UniformField((0.0, 0.0, 1.0))
+    stats, _ = gyro_statistics(ensemble, field, dt, n_steps, track_particles=0)
+
+    # Boris hat einen bekannten Phasenfehler: omega_num = (2/dt) atan(omega dt / 2)
+    omega_boris = 2.0 / dt * np.arctan(0.5 * stats["omega_theory"] * dt)
+    print(f"Teilchen: {n}, Schritte: {n_steps}, Laufzeit: {stats['seconds']:.2f} s "
+          f"({stats['particle_steps_per_s'] / 1e6:.0f} M Teilchen-Schritte/s)")
+    print(f"Gyrofrequenz vs. Boris-Erwartung: max. rel. Abweichung "
+          f"{np.max(np.abs(stats['omega'] / omega_boris - 1)):.2e}")
+    print(f"Gyrofrequenz vs. q B / m: mittlere rel. Abweichung "
+          f"{np.mean(np.abs(stats['omega'] / stats['omega_theory'] - 1)):.2e}")
+    print(f"Energieerhaltung: max |dE|/E = {stats['energy_error'].max():.2e}")
+    print(f"Mittlerer Larmor-Radius: {np.mean(stats['larmor_radius']):.3f}")
+    return stats
+
+
+if __name__ == "__main__":
+    run_ensemble()
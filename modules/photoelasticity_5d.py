@@ -5,69 +5,41 @@ import sys
 
 # Add root to path for PhysicsEngine
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from modules.physics_engine import PhysicsEngine
+from modules.stress_optics import (StressOpticsEngine, IncrementalRenderer, StrainPatch, FrameWriter,
+                                   clamp_field, disk_field)
+import time
 
 def run_stress_simulation():
     print("--- 5D Digital Photoelasticity Simulation ---")
     
-    # 1. Setup Material (Sapphire)
-    engine = PhysicsEngine()
-    n0 = 1.77
-    a0 = 0.4758 # nm (Lattice Constant)
-    Lambda0 = engine.SCALING_FACTOR_K * n0**2 # ~199 eV (V4.3 Cutoff)
+    # 1. Setup Material (Sapphire), 5 mm thick slice
+    optics = StressOpticsEngine(n0=1.77, a0=0.4758, ratio_locked=2.0847, thickness_nm=5000000.0)
+    n0 = optics.n0
+    a0 = optics.a0 # nm (Lattice Constant)
+    Lambda0 = optics.Lambda0 # ~199 eV (V4.3 Cutoff)
     print(f"Material: Sapphire | n0={n0} | a0={a0} nm | Lambda0={Lambda0:.2f} eV")
     
-    # 2. Create Grid (The Crystal Slice)
-    N = 200
-    x = np.linspace(-10, 10, N)
-    y = np.linspace(-10, 10, N)
-    X, Y = np.meshgrid(x, y)
-    
-    # 3. Apply Stress (Simulating a C-Clamp)
-    # We simulate compressive stress from top and bottom
-    sigma = 2.0
-    field_top = np.exp(-((X)**2 + (Y-5)**2)/(2*sigma**2))
-    field_bot = np.exp(-((X)**2 + (Y+5)**2)/(2*sigma**2))
-    
-    # Stress Field S (0 to 1, normalized for simulation)
-    # 1.0 means max compression (e.g. 1% strain)
-    Stress = (field_top + field_bot) * 0.02 # Max 2% strain
+    # 2./3. Grid (The Crystal Slice) + Stress (Simulating a C-Clamp)
+    # Compressive stress from top and bottom: uniaxial strain e_yy, max 2%
+    field = clamp_field(N=200, extent=10.0, sigma=2.0, peak=0.02)
+    Stress = field[1]
     
     print("Applying Stress Load (Clamp Configuration)...")
     
-    # 4. The 5D Geometric Locking Logic
+    # 4. The 5D Geometric Locking Logic (per principal axis, see stress_optics.py)
     # Compressive Stress -> Lattice Shrinks (a decreases)
     # Geometric Locking -> 5D Radius Shrinks (R decreases)
     # R = hbar*c / Lambda -> Lambda Increases
     # n = sqrt(Lambda^2 / K) -> n Increases
+    fields = optics.index_fields(field)
+    Lambda_local = fields["Lambda1"]
+    n_local = fields["n1"]
     
-    # Local Lattice Constant
-    a_local = a0 * (1.0 - Stress)
-    
-    # Local 5D Radius (Locked to a)
-    # We assume R/a ratio stays constant (Locking is robust)
-    ratio_locked = 2.0847
-    R_5d_local = ratio_locked * a_local
-    
-    # Local Cutoff Energy (Lambda)
-    Lambda_local = engine.H_BAR_C / R_5d_local
+    # 5. Birefringence / Fringes: Delta n between the loaded and the free axis
+    delta_n = fields["delta_n"]
     
-    # Local Refractive Index
-    # derived from E = K * n^2  => n = sqrt(E / K)
-    n_local = np.sqrt(Lambda_local / engine.SCALING_FACTOR_K)
-    
-    # 5. Calculate Birefringence / Fringes
-    # Delta n is the change from n0
-    delta_n = n_local - n0
-    
-    # Phase Retardation (Simulating polarized light passing through)
-    # delta = (2*pi * thickness * delta_n) / lambda
-    thickness = 5000000.0 # 5 mm in nm
-    wavelength = 550.0 # Green light nm
-    phase_shift = (2 * np.pi * thickness * delta_n) / wavelength
-    
-    # Intensity (Crossed Polarizers)
-    I = np.sin(phase_shift / 2)**2
+    # Intensity (Crossed Polarizers), green light 550 nm
+    I = optics.intensity(field, [550.0])[..., 0]
     
     # 6. Visualization
     fig, axes = plt.subplots(1, 3, figsize=(15, 7))
@@ -121,5 +93,88 @@ def run_stress_simulation():
     print(f"Delta n: {peak_n - n0:.4f}")
     print("Interpretation: Compressing the 5th dimension makes the vacuum 'denser' (higher n).")
 
+def run_color_isochromatics(width=1200, height=1200, n_wavelengths=31, out_path="images/plots/stress_optics_color.png"):
+    """
+    Full-color isochromatics (white light, circular polariscope) for the clamp and a
+    diametrally loaded disk, side by side. Each half is width/2 x height pixels.
+    """
+    print(f"--- 5D Stress-Optics: Color Isochromatics ({width}x{height}, {n_wavelengths} wavelengths) ---")
+    N = min(width // 2, height)
+    wavelengths = np.linspace(380, 730, n_wavelengths)
+    # Thin slices so the retardation stays within the first few interference orders
+    clamp = StressOpticsEngine(thickness_nm=120000.0).render_rgb(clamp_field(N=N), wavelengths)
+    disk = StressOpticsEngine(thickness_nm=400000.0).render_rgb(disk_field(N=N), wavelengths)
+
+    def pad(img):
+        # Square panel centered on a black half-frame
+        panel = np.zeros((height, width // 2, 3), dtype=img.dtype)
+        y0, x0 = (height - N) // 2, (width // 2 - N) // 2
+        panel[y0:y0 + N, x0:x0 + N] = img
+        return panel
+
+    image = np.concatenate((pad(clamp), pad(disk)), axis=1)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    plt.imsave(out_path, image)
+    print(f"Saved: {out_path}")
+
+def indenter_increments(N, extent, steps, peak=0.01, sigma=0.8, y=8.0):
+    """
+    Load ramp: an indenter slides along y = 8 (x = -8 ... 8, next to the upper clamp) while its load rises to 'peak'.
+    Every increment is the local difference of two Gaussian loads (StrainPatch around both positions).
+    """
+    coords = np.linspace(-extent, extent, N)
+    px = (2 * extent) / (N - 1)
+    half = int(np.ceil(4 * sigma / px))
+    row = int(round((y + extent) / px))
+    rows = slice(max(0, row - half), min(N, row + half + 1))
+    Y = coords[rows][:, None]
+
+    def load(x0, amp):
+        return amp * np.exp(-((coords[None, :] - x0)**2 + (Y - y)**2) / (2 * sigma**2))
+
+    prev = np.zeros((rows.stop - rows.start, N))
+    for k in range(1, steps + 1):
+        cur = load(-8.0 + 16.0 * k / steps, peak * k / steps)
+        delta = cur - prev
+        cols = np.flatnonzero(np.abs(delta).max(axis=0) > 0)
+        c0, c1 = cols[0], cols[-1] + 1
+        zeros = np.zeros((delta.shape[0], c1 - c0))
+        yield StrainPatch(rows, slice(c0, c1), (zeros, delta[:, c0:c1], zeros))
+        prev = cur
+
+def run_load_ramp(steps=150, N=600, out_path=os.path.join("images", "animations", "stress_load_ramp.mp4"), tol=1e-5):
+    """
+    Time-dependent loading: static clamp + sliding indenter, rendered incrementally (dirty tiles)
+    and streamed frame by frame into out_path (MP4 via ffmpeg, otherwise a PNG sequence).
+    """
+    print(f"--- 5D Stress-Optics: Load Ramp ({steps} steps, {N}x{N}) ---")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    engine = StressOpticsEngine(thickness_nm=120000.0)
+    t0 = time.time()
+    renderer = IncrementalRenderer(engine, clamp_field(N=N), np.linspace(380, 730, 31), tol=tol)
+    t_full = time.time() - t0
+
+    t_write = 0.0
+    with FrameWriter(out_path, fps=30) as writer:
+        for step, frame, n_dirty in renderer.stream(indenter_increments(N, 10.0, steps)):
+            t1 = time.time()
+            writer.write(frame)
+            t_write += time.time() - t1
+    elapsed = time.time() - t0
+
+    equivalents = renderer.tiles_rendered / renderer.n_tiles
+    print(f"Full solve: {t_full:.2f}s | Rendering: {elapsed - t_write:.2f}s | Writing: {t_write:.2f}s "
+          f"({writer.count} frames)")
+    print(f"Rendered tiles: {renderer.tiles_rendered} = {equivalents:.1f} full frames "
+          f"(naive: {steps + 1} full frames)")
+    print(f"Saved: {writer.path}")
+
 if __name__ == "__main__":
     run_stress_simulation()
+    if "--color" in sys.argv:
+        if "--4k" in sys.argv:
+            run_color_isochromatics(3840, 2160)
+        else:
+            run_color_isochromatics()
+    if "--ramp" in sys.argv:
+        run_load_ramp()
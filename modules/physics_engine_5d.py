@@ -2,6 +2,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import solve_ivp
 from scipy.constants import h, c, e, electron_volt
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.geodesic_solver import GeodesicSolver, GaussianWell
 
 """
 Module: physics_engine_5d.py
@@ -46,6 +51,95 @@ class Metric5D:
         Dispersions-Masse m_chi:{self.m_chi:.1f} eV (Optisch aktive Mode)
         """
 
+class Metric5DRow:
+    """Leichte Zeilen-Ansicht in eine Metric5DTable (kein Kopieren der Spalten)."""
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table, i):
+        self._table = table
+        self._i = i
+
+    name = property(lambda self: self._table.name[self._i])
+    n0 = property(lambda self: self._table.n0[self._i])
+    Eg = property(lambda self: self._table.Eg[self._i])
+    a = property(lambda self: self._table.a[self._i])
+    Phi0 = property(lambda self: self._table.Phi0[self._i])
+    R_5D = property(lambda self: self._table.R_5D[self._i])
+    Lambda = property(lambda self: self._table.Lambda[self._i])
+    m_chi = property(lambda self: self._table.m_chi[self._i])
+
+    get_info = Metric5D.get_info
+
+    def __repr__(self):
+        return f"Metric5DRow({self.name!r}, n0={self.n0:.3f}, R_5D={self.R_5D:.3f} nm)"
+
+class Metric5DTable:
+    """
+    Struct-of-Arrays Variante von Metric5D: jede Groesse ist eine NumPy-Spalte.
+    Alle abgeleiteten EFT-Groessen (Phi0, R_5D, Lambda, m_chi) werden fuer
+    tausende Materialien in einem Schritt berechnet.
+    """
+    COLUMNS = ("name", "n0", "Eg", "a", "Phi0", "R_5D", "Lambda", "m_chi")
+
+    def __init__(self, names, n_refractive, bandgap_ev, lattice_const_nm):
+        self.name = np.asarray(names, dtype=object)
+        self.n0 = np.asarray(n_refractive, dtype=float)
+        self.Eg = np.asarray(bandgap_ev, dtype=float)
+        self.a = np.asarray(lattice_const_nm, dtype=float)
+
+        # Gleiche Ableitung wie Metric5D (Theorie v5.0), nur spaltenweise
+        self.Phi0 = 1.0 / self.n0
+        self.R_5D = 2.0 * self.a # Geometric Locking Condition
+        self.Lambda = H_BAR_C / self.R_5D
+        self.m_chi = self.Eg.copy()
+
+    @classmethod
+    def from_records(cls, records):
+        """records: Iterable von (Name, n, Bandgap eV, Gitter nm) wie in check_materials."""
+        records = list(records)
+        if not records:
+            return cls([], [], [], [])
+        names, n, eg, a = zip(*records)
+        return cls(names, n, eg, a)
+
+    @classmethod
+    def _from_columns(cls, columns):
+        table = cls.__new__(cls)
+        for col in cls.COLUMNS:
+            setattr(table, col, columns[col])
+        return table
+
+    def __len__(self):
+        return len(self.n0)
+
+    def __iter__(self):
+        return (Metric5DRow(self, i) for i in range(len(self)))
+
+    def __getitem__(self, key):
+        """Int -> Zeilen-Ansicht; Slice, Index-Array oder Bool-Maske -> neue Tabelle."""
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError("Metric5DTable index out of range")
+            return Metric5DRow(self, key)
+        return self._from_columns({col: getattr(self, col)[key] for col in self.COLUMNS})
+
+    def filter(self, mask):
+        """Boolesche Auswahl, z.B. table.filter(table.Lambda > 150)."""
+        return self[np.asarray(mask, dtype=bool)]
+
+    def sort_by(self, column, descending=False):
+        order = np.argsort(getattr(self, column), kind="stable")
+        return self[order[::-1] if descending else order]
+
+    def find(self, name):
+        """Zeilen-Ansicht fuer einen Materialnamen (KeyError falls unbekannt)."""
+        idx = np.flatnonzero(self.name == name)
+        if idx.size == 0:
+            raise KeyError(name)
+        return Metric5DRow(self, int(idx[0]))
+
 # --- 2. DYNAMIK: GEODÄTEN-SOLVER (RAYTRACING) ---
 # Wir lösen die Geodätengleichung: d2x^u/dtau^2 + Gamma^u_vw * dx^v/dtau * dx^w/dtau = 0
 # Vereinfacht für statische Metrik mit Phi-Gradient.
@@ -69,7 +163,7 @@ def geodesic_equation(t, y, metric_func):
     ax = - (1.0 / Phi) * dPhi_dx * speed_sq
     ay = - (1.0 / Phi) * dPhi_dy * speed_sq
     
-    return [vx, vy, ax, ay]
+    return np.array((vx, vy, ax, ay))
 
 # --- SOLVER B: CLASSICAL OPTICS (Gradient Index) ---
 # Ray Equation: d/ds (n * dr/ds) = grad(n)
@@ -97,37 +191,26 @@ def classical_ray_equation(t, y, metric_func):
     ax = (dn_dx / n)
     ay = (dn_dy / n)
     
-    return [vx, vy, ax, ay]
+    return np.array((vx, vy, ax, ay))
 
 # --- 3. SZENARIO: "DIAMOND GRAVITY" (Strong 5D Lensing vs Classical) ---
 def simulate_optical_drag():
     print("Simulating 5D-Geodesic vs Classical Ray for Diamond (n=2.42)...")
     
     # Definieren wir eine "Raumzeit-Delle" (Diamant-Gitter)
-    def metric_field(x, y):
-        # Gauss-Profil für Phi
-        r2 = x**2 + y**2
-        depth = 0.6 
-        width = 2.0
-        val = 1.0 - depth * np.exp(-r2 / width)
-        
-        # Ableitungen (Kettenregel)
-        d_val = -depth * np.exp(-r2 / width) * (-1/width)
-        dPhi_dx = d_val * 2*x
-        dPhi_dy = d_val * 2*y
-        
-        return val, dPhi_dx, dPhi_dy
+    # Gauss-Profil für Phi: Phi = 1 - 0.6 * exp(-r^2 / 2)
+    metric_field = GaussianWell(depth=0.6, width=2.0)
 
     # Startbedingungen: Langsamer Laserstrahl, nah am Zentrum
     y0_5d = [-4.0, 0.6, 0.6, 0.0] 
     t_span = [0, 15]
     
     # 1. 5D Geodesic (GR Style)
-    sol_5d = solve_ivp(geodesic_equation, t_span, y0_5d, args=(metric_field,), rtol=1e-6, max_step=0.1)
+    sol_5d = GeodesicSolver(metric_field, "geodesic_5d").integrate(y0_5d, t_span, rtol=1e-6, max_step=0.1)
     
     # 2. Classical Ray (Optics Style)
     # Initial velocity same direction
-    sol_class = solve_ivp(classical_ray_equation, t_span, y0_5d, args=(metric_field,), rtol=1e-6, max_step=0.1)
+    sol_class = GeodesicSolver(metric_field, "classical").integrate(y0_5d, t_span, rtol=1e-6, max_step=0.1)
     
     # Visualisierung
     plt.figure(figsize=(10, 6))
@@ -159,15 +242,73 @@ def simulate_optical_drag():
     plt.savefig("diamond_comparison.png", dpi=150)
     print("Simulation saved: diamond_comparison.png")
 
+# --- 3b. SWEEP: WO WEICHEN 5D-GEODÄTE UND KLASSISCHER STRAHL AB? ---
+def simulate_deviation_map(impact_params=None, launch_speeds=None, t_span=(0, 15), dt=0.02, store_every=5):
+    """
+    Integriert beide Modelle (5D-Geodäte, klassischer Strahl) über ein Gitter aus
+    Stoßparametern b (Start-y) und Startgeschwindigkeiten v0 im Batch.
+    Metriken pro Startbedingung:
+        endpoint_dev: |r_5D(t_end) - r_klass(t_end)|
+        path_max_dev: max_t |r_5D(t) - r_klass(t)|
+        path_rms_dev: RMS_t |r_5D(t) - r_klass(t)|
+    Speichert eine Heatmap (PNG) und die Rohdaten (NPZ).
+    """
+    print("Sweeping 5D-Geodesic vs Classical Ray over initial conditions...")
+    impact_params = np.linspace(-3.0, 3.0, 121) if impact_params is None else np.asarray(impact_params, dtype=float)
+    launch_speeds = np.linspace(0.2, 1.5, 80) if launch_speeds is None else np.asarray(launch_speeds, dtype=float)
+
+    metric_field = GaussianWell(depth=0.6, width=2.0)
+    B, V = np.meshgrid(impact_params, launch_speeds, indexing="ij")
+    Y0 = np.zeros((B.size, 4))
+    Y0[:, 0] = -4.0
+    Y0[:, 1] = B.ravel()
+    Y0[:, 2] = V.ravel()
+
+    res_5d = GeodesicSolver(metric_field, "geodesic_5d").integrate_batch(Y0, t_span, dt=dt, store_every=store_every, dtype=np.float32)
+    res_class = GeodesicSolver(metric_field, "classical").integrate_batch(Y0, t_span, dt=dt, store_every=store_every, dtype=np.float32)
+
+    # Gleiche Zeitgitter -> punktweiser Vergleich der Bahnen
+    sep = np.hypot(res_5d.paths[:, :, 0] - res_class.paths[:, :, 0],
+                   res_5d.paths[:, :, 1] - res_class.paths[:, :, 1])
+    endpoint_dev = np.hypot(*(res_5d.final[:, :2] - res_class.final[:, :2]).T).reshape(B.shape)
+    path_max_dev = sep.max(axis=0).reshape(B.shape)
+    path_rms_dev = np.sqrt(np.mean(sep.astype(np.float64)**2, axis=0)).reshape(B.shape)
+
+    np.savez_compressed("diamond_deviation_map.npz",
+                        impact_params=impact_params, launch_speeds=launch_speeds,
+                        endpoint_dev=endpoint_dev, path_max_dev=path_max_dev, path_rms_dev=path_rms_dev,
+                        t_span=np.asarray(t_span), dt=dt)
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    extent = [launch_speeds[0], launch_speeds[-1], impact_params[0], impact_params[-1]]
+    for ax, data, title in zip(axes, (endpoint_dev, path_max_dev),
+                               ("Endpunkt-Abweichung", "Maximale Bahn-Abweichung")):
+        im = ax.imshow(data, origin="lower", aspect="auto", extent=extent, cmap="magma")
+        fig.colorbar(im, ax=ax, label="|r_5D - r_klassisch| [nm]")
+        ax.set_title(title, fontsize=13)
+        ax.set_xlabel("Startgeschwindigkeit $v_0$")
+        ax.set_ylabel("Stoßparameter b [nm]")
+
+    plt.suptitle("5D-Geodäte vs. Klassischer Strahl (Diamant-Delle)", fontsize=14)
+    plt.tight_layout()
+    plt.savefig("diamond_deviation_map.png", dpi=150)
+    plt.close()
+
+    i, j = np.unravel_index(np.argmax(path_max_dev), path_max_dev.shape)
+    print(f"{B.size} Startbedingungen integriert.")
+    print(f"Größte Abweichung: {path_max_dev[i, j]:.3f} nm bei b={impact_params[i]:.2f}, v0={launch_speeds[j]:.2f}")
+    print("Saved: diamond_deviation_map.png, diamond_deviation_map.npz")
+    return endpoint_dev, path_max_dev, path_rms_dev
+
 # --- 4. MATERIAL-DATENBANK CHECK (V5.0) ---
 def check_materials():
     print("\n--- Material-Check (Theorie v5.0) ---")
     # Name, n, Bandgap (eV), Gitter (nm)
-    materials = [
-        Metric5D("Saphir (Al2O3)", 1.77, 8.8, 0.476),
-        Metric5D("Silizium (Si)", 3.42, 1.1, 0.543),
-        Metric5D("Diamant (C)", 2.42, 5.5, 0.357),
-    ]
+    materials = Metric5DTable.from_records([
+        ("Saphir (Al2O3)", 1.77, 8.8, 0.476),
+        ("Silizium (Si)", 3.42, 1.1, 0.543),
+        ("Diamant (C)", 2.42, 5.5, 0.357),
+    ])
     
     for mat in materials:
         print(mat.get_info())
@@ -175,3 +316,5 @@ def check_materials():
 if __name__ == "__main__":
     check_materials()
     simulate_optical_drag()
+    if "--sweep" in sys.argv:
+        simulate_deviation_map()
@@ -0,0 +1,194 @@
+import numpy as np
+import time
+
+"""
+Module: propagator_fit.py
+Zweck: Schneller globaler Fit des 5D-Propagator-Modells (Einzelpol-Dispersion)
+           n(E) = sqrt(1 + A / (E_res^2 - E^2))
+       an gemessene Brechungsindizes.
+Methode:
+    1. Grobsuche: alle (E_res, A)-Kandidaten als ein Broadcast-Tensor [nE, nA, Punkte]
+       (blockweise, damit der Speicher begrenzt bleibt) -> beste Zelle.
+    2. Feinschliff: Levenberg-Marquardt mit analytischen Ableitungen, startend in der besten Zelle.
+    3. Unsicherheiten aus der Kovarianz s^2 * (J^T J)^-1 (wie curve_fit).
+    Damit ist die Aufloesung nicht mehr durch das Gitter begrenzt (sub-meV in Millisekunden).
+"""
+
+HC_EV_UM = 1.23984193 # eV * micron (E = hc / lambda)
+
+# Maximale Tensorgroesse pro Block der Grobsuche (Elemente)
+GRID_BLOCK_ELEMENTS = 4_000_000
+
+
+def propagator_n(E, E_res, A):
+    """Einzelpol-Modell. Broadcastet ueber E, E_res und A; Werte hinter dem Pol werden NaN."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.sqrt(1.0 + A / (E_res**2 - E**2))
+
+
+def propagator_jacobian(E, E_res, A):
+    """Analytische Ableitungen [dn/dE_res, dn/dA] an den Datenpunkten E -> [Punkte, 2]."""
+    D = E_res**2 - E**2
+    n = np.sqrt(1.0 + A / D)
+    dn_dA = 1.0 / (2.0 * n * D)
+    dn_dE = -A * E_res / (n * D**2)
+    return np.column_stack((dn_dE, dn_dA))
+
+
+def default_grid(E, n_obs, n_E=200, n_A=60):
+    """
+    Kandidaten-Gitter aus den Daten: Pole oberhalb der hoechsten Messenergie bis zum 6-fachen,
+    A je Pol um die Schaetzung A ~ (n^2 - 1) * (E_res^2 - E^2) gestreut. A_grid hat Form [nE, nA].
+    """
+    E_max = np.max(E)
+    E_grid = np.linspace(1.02 * E_max, 6.0 * E_max, n_E)
+    chi = np.median(n_obs**2 - 1.0)
+    A_center = chi * (E_grid**2 - np.median(E)**2)
+    A_grid = A_center[:, None] * np.linspace(0.25, 2.5, n_A)[None, :]
+    return E_grid, A_grid
+
+
+def grid_search(E, n_obs, E_grid, A_grid):
+    """
+    Bewertet alle (E_res, A)-Kandidaten in einem Broadcast. A_grid ist 1D (fuer alle E gleich)
+    oder 2D [nE, nA]. Liefert (E_best, A_best, rmse_map[nE, nA]).
+    """
+    E = np.asarray(E, dtype=float)
+    n_obs = np.asarray(n_obs, dtype=float)
+    E_grid = np.asarray(E_grid, dtype=float)
+    A_grid = np.broadcast_to(np.asarray(A_grid, dtype=float), (len(E_grid), np.shape(A_grid)[-1]))
+
+    rmse = np.empty(A_grid.shape)
+    rows = max(1, GRID_BLOCK_ELEMENTS // (A_grid.shape[1] * len(E)))
+    for i in range(0, len(E_grid), rows):
+        Eb = E_grid[i:i + rows, None, None]
+        Ab = A_grid[i:i + rows, :, None]
+        res = propagator_n(E[None, None, :], Eb, Ab) - n_obs
+        rmse[i:i + rows] = np.sqrt(np.mean(res * res, axis=-1))
+
+    rmse[~np.isfinite(rmse)] = np.inf
+    i, j = np.unravel_index(np.argmin(rmse), rmse.shape)
+    return E_grid[i], A_grid[i, j], rmse
+
+
+def levenberg_marquardt(E, n_obs, p0, max_iter=100, tol=1e-10):
+    """
+    Verfeinert (E_res, A) mit Levenberg-Marquardt (Marquardt-Skalierung, analytische Jacobi-Matrix).
+    Abbruch, wenn der relative Schritt kleiner als tol ist oder keine Verbesserung mehr moeglich ist.
+    Liefert (params, J, residuals, n_iter).
+    """
+    E = np.asarray(E, dtype=float)
+    p = np.array(p0, dtype=float)
+    r = propagator_n(E, *p) - n_obs
+    cost = r @ r
+    lam = 1e-3
+
+    for it in range(1, max_iter + 1):
+        J = propagator_jacobian(E, *p)
+        g = J.T @ r
+        H = J.T @ J
+        improved = False
+        while lam < 1e12:
+            step = np.linalg.solve(H + lam * np.diag(np.diag(H)), -g)
+            r_new = propagator_n(E, *(p + step)) - n_obs
+            cost_new = r_new @ r_new
+            if np.isfinite(cost_new) and cost_new < cost:
+                improved = True
+                break
+            lam *= 10.0
+        if not improved:
+            break
+
+        p += step
+        converged = np.all(np.abs(step) <= tol * (np.abs(p) + tol))
+        r, cost = r_new, cost_new
+        lam = max(lam * 0.3, 1e-12)
+        if converged:
+            break
+
+    return p, propagator_jacobian(E, *p), r, it
+
+
+class PropagatorFit:
+    def __init__(self, E_res, A, cov, rmse, n_iter, grid_rmse, seconds):
+        self.E_res = E_res          # Pol / effektive 5D-Masse [eV]
+        self.A = A                  # Kopplungsamplitude [eV^2]
+        self.cov = cov              # Kovarianz [2, 2]
+        self.rmse = rmse
+        self.n_iter = n_iter
+        self.grid_rmse = grid_rmse  # beste RMSE der Grobsuche (zum Vergleich)
+        self.seconds = seconds
+
+    @property
+    def sigma_E(self):
+        return np.sqrt(self.cov[0, 0])
+
+    @property
+    def sigma_A(self):
+        return np.sqrt(self.cov[1, 1])
+
+    def predict(self, E):
+        return propagator_n(E, self.E_res, self.A)
+
+    def __repr__(self):
+        return (f"PropagatorFit(E_res={self.E_res:.5f}+-{self.sigma_E:.5f} eV, "
+                f"A={self.A:.3f}+-{self.sigma_A:.3f}, rmse={self.rmse:.2e})")
+
+
+def fit_propagator(E, n_obs, E_grid=None, A_grid=None):
+    """Grobsuche + LM-Feinschliff fuer einen Datensatz (E in eV, n gemessen)."""
+    t0 = time.perf_counter()
+    E = np.asarray(E, dtype=float)
+    n_obs = np.asarray(n_obs, dtype=float)
+    if E_grid is None or A_grid is None:
+        E_def, A_def = default_grid(E, n_obs)
+        E_grid = E_def if E_grid is None else E_grid
+        A_grid = A_def if A_grid is None else A_grid
+
+    E0, A0, rmse_map = grid_search(E, n_obs, E_grid, A_grid)
+    p, J, r, n_iter = levenberg_marquardt(E, n_obs, (E0, A0))
+
+    dof = max(1, len(E) - 2)
+    cov = (r @ r / dof) * np.linalg.inv(J.T @ J)
+    return PropagatorFit(p[0], p[1], cov, np.sqrt(np.mean(r * r)), n_iter,
+                         rmse_map.min(), time.perf_counter() - t0)
+
+
+def fit_many(datasets):
+    """datasets: {name: (E, n_obs)} -> {name: PropagatorFit}."""
+    return {name: fit_propagator(E, n_obs) for name, (E, n_obs) in datasets.items()}
+
+
+def sellmeier_n(lam_micron, terms):
+    """n aus Sellmeier-Termen [(B, C)] mit C in um^2."""
+    L2 = lam_micron**2
+    return np.sqrt(1 + sum(B * L2 / (L2 - C) for B, C in terms))
+
+
+# Referenzkristalle (Sellmeier-Koeffizienten wie in material_parameters / nacl_dispersion_check)
+REFERENCE_CRYSTALS = {
+    "NaCl":           [(1.3198, 0.1162**2), (2.3385, 60.36**2)],
+    "Sapphire (Ord)": [(1.43134930, 0.0726631**2), (0.65054713, 0.1193242**2), (5.3414021, 18.028251**2)],
+    "Fused Silica":   [(0.6961663, 0.0684043**2), (0.4079426, 0.1162414**2), (0.8974794, 9.896161**2)],
+    "BK7":            [(1.03961212, 0.00600069867), (0.231792344, 0.0200179144), (1.01046945, 103.560653)],
+    "Diamond":        [(4.3356, 0.106**2), (0.3306, 175.0**2)],
+}
+
+
+def run_batch_fit():
+    print("--- 5D-Propagator Batch Fit (Grid + Levenberg-Marquardt) ---")
+    wavelengths = np.linspace(0.25, 2.5, 100) # microns
+    energies = HC_EV_UM / wavelengths
+    datasets = {name: (energies, sellmeier_n(wavelengths, terms)) for name, terms in REFERENCE_CRYSTALS.items()}
+
+    fits = fit_many(datasets)
+    print(f"{'Material':<16} | {'E_res [eV]':<20} | {'A [eV^2]':<18} | {'RMSE':<9} | {'Grid RMSE':<9} | {'Time'}")
+    print("-" * 95)
+    for name, f in fits.items():
+        print(f"{name:<16} | {f.E_res:8.4f} +- {f.sigma_E:<8.4f} | {f.A:8.2f} +- {f.sigma_A:<6.2f} | "
+              f"{f.rmse:.2e} | {f.grid_rmse:.2e} | {f.seconds * 1e3:.1f} ms")
+    return fits
+
+
+if __name__ == "__main__":
+    run_batch_fit()
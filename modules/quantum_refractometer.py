@@ -32,6 +32,23 @@ class PhysicalParameters:
         self.SCALE = 1e30            
 
 # --- 2. Simulation Logic ---
+def langevin_response(xi_scaled, Gamma, m_Phi, dt):
+    """
+    Damped oscillator driven by the (scaled) noise force xi_scaled:
+    x'' = xi - Gamma * x' - m_Phi^2 * x, semi-implicit Euler. Returns x per sample (x[0] = 0).
+    """
+    N = len(xi_scaled)
+    phi_scaled = np.zeros(N)
+    v_scaled = 0 
+    x_scaled = 0 
+    
+    for i in range(1, N):
+        acc_scaled = xi_scaled[i] - Gamma * v_scaled - m_Phi**2 * x_scaled
+        v_scaled += acc_scaled * dt
+        x_scaled += v_scaled * dt
+        phi_scaled[i] = x_scaled
+    return phi_scaled
+
 def run_simulation():
     print("Initializing Quantum Refractometer Simulation (Temperature Mode)...")
     
@@ -81,16 +98,8 @@ def run_simulation():
         xi_scaled = np.random.normal(0, current_noise_amp * params.SCALE, N)
         
         # --- System Response (Langevin) ---
-        phi_scaled = np.zeros(N)
-        v_scaled = 0 
-        x_scaled = 0 
         dt = 1 / params.fs
-        
-        for i in range(1, N):
-            acc_scaled = xi_scaled[i] - params.Gamma * v_scaled - params.m_Phi**2 * x_scaled
-            v_scaled += acc_scaled * dt
-            x_scaled += v_scaled * dt
-            phi_scaled[i] = x_scaled
+        phi_scaled = langevin_response(xi_scaled, params.Gamma, params.m_Phi, dt)
             
         # Unscale
         phi_fluct = phi_scaled / params.SCALE
@@ -16,14 +16,18 @@ def effective_mass_cost(params):
     mass = 1.0 / (R_5d + 1e-9) 
     return mass
 
+# Grenze auf 360 Grad erweitern für das "volle Bild"
+TOB_BOUNDS = [(0.2, 2.0), (0, 2*np.pi)]
+
+def find_optimal_design(bounds=TOB_BOUNDS, popsize=15, seed=None):
+    """Globale Suche (Differential Evolution) nach der minimalen effektiven Masse."""
+    return differential_evolution(effective_mass_cost, bounds, popsize=popsize, seed=seed)
+
 def run_tob_optimization():
     print("--- Quantum Topology Optimization (TOB) ---")
     print("Starte globale Suche (360 Grad Scan)...")
     
-    # Grenze auf 360 Grad erweitern für das "volle Bild"
-    bounds = [(0.2, 2.0), (0, 2*np.pi)]
-    
-    result = differential_evolution(effective_mass_cost, bounds)
+    result = find_optimal_design()
     
     best_a = result.x[0]
     best_twist = result.x[1]
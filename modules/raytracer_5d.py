@@ -1,6 +1,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 """
 Module: raytracer_5d.py
@@ -10,6 +13,8 @@ Target: Proves that n = 1/Phi produces Snell's Law automatically.
 """
 
 from modules.physics_engine import PhysicsEngine
+from modules.geodesic_solver import (trace_fixed_step, domain_exit_event, interface_event,
+                                     closest_approach_event, caustic_event)
 
 def raytrace_sphere():
     print("Tracing 5D Geodesics (Raytracing V4.0 - RK4 + PhysicsEngine)...")
@@ -37,22 +42,30 @@ def raytrace_sphere():
     # Use proper interface instead of monkey patching
     engine.set_n_field_source(custom_n_field)
     
+    def engine_step(state, dt):
+        # Use Engine's RK4 Integrator
+        pos, vel = engine.rk4_step(state[:2], state[2:], dt)
+        return np.concatenate((pos, vel))
+
+    # Events: Austritt aus dem Fenster (terminal), Grenzfläche (n-Mitte der Kugel),
+    # nächste Annäherung ans Zentrum und Kaustik (Fokus des Strahlenbündels)
+    events = [domain_exit_event((-20, 20), (-20, 20)),
+              interface_event(lambda x, y: custom_n_field((x, y)), 1.25),
+              closest_approach_event((0.0, 0.0)),
+              caustic_event()]
+
+    # Obergrenze: Weglänge 2 x Fensterbreite, damit auch abgelenkte Strahlen das Fenster
+    # erreichen (400 Schritte endeten knapp vor x = 20). Das Austritts-Event beendet den Strahl.
+    dt, max_steps = 0.1, 800
+
     def trace_ray(y_start, color='r'):
-        pos = np.array([-20.0, y_start])
-        vel = np.array([1.0, 0.0]) # Speed 1
-        
-        path_x = []
-        path_y = []
-        
-        dt = 0.1
-        for i in range(400):
-            path_x.append(pos[0])
-            path_y.append(pos[1])
-            
-            # Use Engine's RK4 Integrator
-            pos, vel = engine.rk4_step(pos, vel, dt)
-            
-        plt.plot(path_x, path_y, color=color, alpha=0.8)
+        state = np.array([-20.0, y_start, 1.0, 0.0]) # Speed 1
+        trace = trace_fixed_step(engine_step, state, dt, max_steps, events, store_path=True)
+
+        plt.plot(trace.path[:, 0], trace.path[:, 1], color=color, alpha=0.8)
+        crossings = trace.points('interface')
+        plt.plot(crossings[:, 0], crossings[:, 1], 'o', color=color, markersize=3)
+        return trace
 
     # Visualization
     fig, ax = plt.subplots(figsize=(8, 8))
@@ -62,11 +75,23 @@ def raytrace_sphere():
     ax.add_patch(circle)
     
     # Trace Rays
-    for y in np.linspace(-8, 8, 10):
-        trace_ray(y)
+    traces = [trace_ray(y) for y in np.linspace(-8, 8, 10)]
     
     # Compare with "Central" ray (no bending)
-    trace_ray(0, 'k') # Should go straight
+    traces.append(trace_ray(0, 'k')) # Should go straight
+
+    # Kaustiken (Fokuspunkte) des Bündels
+    caustics = np.concatenate([t.points('caustic') for t in traces])
+    plt.plot(caustics[:, 0], caustics[:, 1], '*', color='gold', markersize=8, label='Caustic')
+
+    steps = sum(t.n_steps for t in traces)
+    exited = sum(t.status == 'domain_exit' for t in traces)
+    print(f"Rays: {len(traces)} ({exited} left the window), RK4 steps: {steps} "
+          f"(fixed loop: {max_steps * len(traces)})")
+    print(f"Interface crossings: {sum(len(t.events['interface']) for t in traces)}, caustics: {len(caustics)}")
+    central = traces[-1].points('caustic')
+    if len(central):
+        print(f"Paraxial focus at x = {central[0, 0]:.2f}")
     
     plt.title("5D-Raytracing V4.0 (RK4 Symplectic)", fontsize=14)
     plt.xlim(-20, 20)
@@ -1,6 +1,11 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import solve_ivp
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.geodesic_solver import (GeodesicSolver, GaussianWell, domain_exit_event, interface_event,
+                                     closest_approach_event, caustic_event)
 
 """
 Module: raytracer_5d_engine.py
@@ -43,11 +48,24 @@ def ray_equation(t, state):
     ax = (1.0 / Phi) * dPhi_dx * speed_sq
     ay = (1.0 / Phi) * dPhi_dy * speed_sq
     
-    return [vx, vy, ax, ay]
+    return np.array((vx, vy, ax, ay))
 
 # 3. Die Kamera (Rendering)
-def render_scene(resolution=20):
+def render_scene(resolution=20, store_paths=True):
+    """
+    Schießt ein Strahlenbündel durch die Linse. Die Integration endet per Event, sobald ein
+    Strahl den Bildausschnitt verlässt; Grenzflächen-Durchgänge (n = 1.5), nächste Annäherung
+    ans Zentrum und Kaustiken werden innerhalb des Schritts lokalisiert.
+    Gibt die RayTrace-Ergebnisse zurück (mit store_paths=False ohne Pfade, nur Ereignisse).
+    """
     print("Rendering 5D Scene (Raytracing)...")
+    # Gleiche Metrik wie metric_lens: Phi = 1 - 0.5 * exp(-r^2 / 4), Kraftgesetz wie ray_equation
+    lens = GaussianWell(depth=0.5, width=4.0)
+    solver = GeodesicSolver(lens, "lens")
+    events = [domain_exit_event((-10, 10), (-6, 6)),
+              interface_event(lens.n_field, 1.5),
+              closest_approach_event((0.0, 0.0)),
+              caustic_event()]
     
     # Wir schießen Strahlen von links (x=-10) nach rechts durch die Linse
     y_start_points = np.linspace(-5, 5, resolution)
@@ -61,17 +79,32 @@ def render_scene(resolution=20):
     plt.colorbar(label="Raumzeit-Skalierung $\Phi$")
     
     # Raytracing Loop
+    traces = []
     for y_start in y_start_points:
         # Startzustand: x=-10, y=y_start, vx=1 (nach rechts), vy=0
         initial_state = [-10, y_start, 1.0, 0.0]
         
-        # Löse die Bewegungsgleichung
-        sol = solve_ivp(ray_equation, [0, 25], initial_state, rtol=1e-5, max_step=0.1)
+        # Löse die Bewegungsgleichung (t=25 ist nur noch die Obergrenze)
+        trace = solver.trace(initial_state, (0, 25), events, store_path=store_paths, rtol=1e-5)
+        traces.append(trace)
         
         # Zeichne den Strahl
         # Farbe basierend auf y_start (Regenbogen-Effekt)
         color = plt.cm.jet((y_start + 5) / 10)
-        plt.plot(sol.y[0], sol.y[1], color=color, alpha=0.8, linewidth=1.5)
+        if store_paths:
+            plt.plot(trace.path[:, 0], trace.path[:, 1], color=color, alpha=0.8, linewidth=1.5)
+        crossings = trace.points('interface')
+        plt.plot(crossings[:, 0], crossings[:, 1], '.', color=color, markersize=5)
+
+    caustics = np.concatenate([t.points('caustic') for t in traces])
+    plt.plot(caustics[:, 0], caustics[:, 1], '*', color='white', markersize=7, label='Kaustik')
+    closest = np.array([np.hypot(*t.points('closest_approach')[0]) for t in traces
+                        if len(t.events['closest_approach'])])
+    print(f"Strahlen: {len(traces)}, Schritte: {sum(t.n_steps for t in traces)}, "
+          f"Austritte: {sum(t.status == 'domain_exit' for t in traces)}")
+    print(f"Grenzflächen-Durchgänge: {sum(len(t.events['interface']) for t in traces)}, Kaustiken: {len(caustics)}")
+    if len(closest):
+        print(f"Kleinster Abstand zum Zentrum: {closest.min():.3f}")
 
     plt.title("5D Raytracing: Lichtkrümmung durch Metrik-Gradienten", fontsize=14)
     plt.xlabel("Raum X")
@@ -82,6 +115,8 @@ def render_scene(resolution=20):
     # Speichern
     plt.savefig("5d_raytracing_render.png", dpi=150)
     print("Render saved to 5d_raytracing_render.png")
+    plt.close()
+    return traces
 
 if __name__ == "__main__":
     render_scene(resolution=30)
@@ -0,0 +1,62 @@
+import numpy as np
+
+"""
+Module: spectral_color.py
+Purpose: Spectrum -> display color for interference images (isochromatics, conoscopy).
+         CIE 1931 2-degree color matching functions via the multi-lobe Gaussian fit of
+         Wyman, Sloan & Shirley (2013), tabulated at the requested wavelengths, and the
+         XYZ -> sRGB transform. White balance: a flat (equal-energy) spectrum maps to white.
+"""
+
+# (amplitude, mu, sigma_left, sigma_right) per lobe, wavelengths in nm
+_CMF_LOBES = {
+    "x": [(1.056, 599.8, 37.9, 31.0), (0.362, 442.0, 16.0, 26.7), (-0.065, 501.1, 20.4, 26.2)],
+    "y": [(0.821, 568.8, 46.9, 40.5), (0.286, 530.9, 16.3, 31.1)],
+    "z": [(1.217, 437.0, 11.8, 36.0), (0.681, 459.0, 26.0, 13.8)],
+}
+
+XYZ_TO_SRGB = np.array([[ 3.2406, -1.5372, -0.4986],
+                        [-0.9689,  1.8758,  0.0415],
+                        [ 0.0557, -0.2040,  1.0570]])
+
+VISIBLE_NM = (380.0, 730.0)
+
+
+def _lobe(lam, amp, mu, s_left, s_right):
+    sigma = np.where(lam < mu, s_left, s_right)
+    return amp * np.exp(-0.5 * ((lam - mu) / sigma)**2)
+
+
+def cie_xyz(wavelengths_nm):
+    """CIE 1931 color matching functions [L, 3] (x_bar, y_bar, z_bar)."""
+    lam = np.asarray(wavelengths_nm, dtype=float)
+    return np.stack([sum(_lobe(lam, *lobe) for lobe in _CMF_LOBES[c]) for c in "xyz"], axis=-1)
+
+
+def visible_wavelengths(n=31):
+    """Equidistant sampling of the visible range (nm)."""
+    return np.linspace(VISIBLE_NM[0], VISIBLE_NM[1], n)
+
+
+def rgb_weights(wavelengths_nm, illuminant=None, dtype=np.float32):
+    """
+    Weight table [L, 3]: linear sRGB = spectrum[..., L] @ weights.
+    illuminant: relative spectral power per wavelength (default: flat). The table is
+    normalized so that a spectrum equal to 1 everywhere maps to linear RGB (1, 1, 1).
+    """
+    cmf = cie_xyz(wavelengths_nm)
+    if illuminant is not None:
+        cmf = cmf * np.asarray(illuminant, dtype=float)[:, None]
+    w = cmf @ XYZ_TO_SRGB.T
+    return (w / w.sum(axis=0)).astype(dtype)
+
+
+def encode_srgb(linear_rgb):
+    """Linear RGB -> gamma-encoded sRGB in [0, 1] (clipped)."""
+    c = np.clip(linear_rgb, 0.0, 1.0)
+    return np.where(c <= 0.0031308, 12.92 * c, 1.055 * np.power(c, 1 / 2.4) - 0.055).astype(c.dtype)
+
+
+def spectrum_to_rgb(spectrum, wavelengths_nm, illuminant=None):
+    """spectrum[..., L] -> gamma-encoded sRGB [..., 3]."""
+    return encode_srgb(np.asarray(spectrum) @ rgb_weights(wavelengths_nm, illuminant))
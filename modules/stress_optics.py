@@ -0,0 +1,380 @@
+import numpy as np
+import os
+import shutil
+import subprocess
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.physics_engine import PhysicsEngine
+from modules.spectral_color import rgb_weights, encode_srgb, visible_wavelengths
+
+"""
+Module: stress_optics.py
+Zweck: Vektorisierte 5D-Spannungsoptik (Engine hinter photoelasticity_5d).
+       - Eingabe: 2D-Verzerrungstensorfelder [H, W] oder 3D-Felder [D, H, W] (D Scheiben entlang
+         der Lichtrichtung z), aus Datei (load_strain_field) oder analytischen Modellen
+         (clamp_field, disk_field).
+       - Geometric Locking pro Hauptachse: a_i = a0 (1 - e_i) -> Lambda_i = hbar c / (R/a * a_i)
+         -> n_i = sqrt(Lambda_i / K). Doppelbrechung Delta n = n_1 - n_2.
+       - Retardation und Polariskop-Intensitaet fuer einen ganzen Wellenlaengen-Stapel in einem
+         Broadcast [Zeilen, W, L] (float32, blockweise), 3D-Felder per Jones-Kalkuel.
+       - render_rgb integriert das Spektrum direkt zu sRGB, ohne das volle [H, W, L]-Array
+         anzulegen -> farbige Isochromaten auch in 4k.
+       - Belastungssequenzen: IncrementalRenderer rechnet nach jedem Inkrement nur die Kacheln
+         neu, deren Verzerrung sich seit dem letzten Rendern um mehr als tol geaendert hat;
+         IncrementalRenderer.stream liefert die Frames als Strom (z.B. in einen FrameWriter).
+Konvention: Kompression ist positiv (wie im urspruenglichen Klemm-Modell).
+"""
+
+# Elementbudget pro Block [Zeilen, W, L] (float32 -> ~32 MB)
+CHUNK_ELEMENTS = 8_000_000
+
+POLARISCOPES = ("circular", "plane")
+
+
+def strain_components(field):
+    """
+    Normalisiert ein Verzerrungsfeld auf (exx, eyy, exy):
+      - Tupel/Liste (exx, eyy, exy)
+      - dict / npz mit 'exx', 'eyy', 'exy' (fehlende Komponenten = 0)
+      - Tensor-Array [..., 2, 2] oder [..., 3, 3] (Licht entlang z: in-plane xx, yy, xy)
+    """
+    if isinstance(field, (tuple, list)):
+        exx, eyy, exy = field
+    elif hasattr(field, "keys"):
+        names = ("exx", "eyy", "exy")
+        present = [k for k in names if k in field.keys()]
+        if not present:
+            raise ValueError("Strain field needs at least one of 'exx', 'eyy', 'exy'.")
+        ref = np.asarray(field[present[0]])
+        exx, eyy, exy = (np.asarray(field[k]) if k in present else np.zeros_like(ref) for k in names)
+    else:
+        t = np.asarray(field)
+        if t.shape[-2:] not in ((2, 2), (3, 3)):
+            raise ValueError(f"Expected a [..., 2, 2] or [..., 3, 3] tensor field, got shape {t.shape}.")
+        exx, eyy, exy = t[..., 0, 0], t[..., 1, 1], 0.5 * (t[..., 0, 1] + t[..., 1, 0])
+    exx, eyy, exy = np.broadcast_arrays(exx, eyy, exy)
+    if exx.ndim not in (2, 3):
+        raise ValueError(f"Strain fields must be 2D [H, W] or 3D [D, H, W], got {exx.ndim}D.")
+    return exx, eyy, exy
+
+
+def load_strain_field(path, youngs_modulus=None):
+    """
+    Laedt ein Feld aus .npy (Tensor-Array) oder .npz (exx/eyy/exy oder Spannungen sxx/syy/sxy).
+    Spannungen (Zug positiv) werden mit youngs_modulus (oder dem Eintrag 'youngs_modulus' der
+    Datei) in Verzerrungen umgerechnet, Vorzeichen auf Kompression positiv.
+    """
+    data = np.load(path)
+    if not hasattr(data, "files"):
+        return strain_components(data)
+
+    if any(k in data.files for k in ("sxx", "syy", "sxy")):
+        E = youngs_modulus if youngs_modulus is not None else data["youngs_modulus"] if "youngs_modulus" in data.files else None
+        if E is None:
+            raise ValueError(f"{path}: stress components need a Young's modulus.")
+        stress = {k.replace("s", "e", 1): -np.asarray(data[k]) / float(E) for k in ("sxx", "syy", "sxy") if k in data.files}
+        return strain_components(stress)
+    return strain_components({k: data[k] for k in data.files})
+
+
+def clamp_field(N=200, extent=10.0, sigma=2.0, peak=0.02, dtype=np.float64):
+    """Klemme oben/unten (urspruengliches Modell): einachsige Kompression e_yy, zwei Gauss-Lasten."""
+    x = np.linspace(-extent, extent, N, dtype=dtype)
+    X, Y = np.meshgrid(x, x)
+    field_top = np.exp(-((X)**2 + (Y - 5)**2) / (2 * sigma**2))
+    field_bot = np.exp(-((X)**2 + (Y + 5)**2) / (2 * sigma**2))
+    eyy = (field_top + field_bot) * peak
+    zeros = np.zeros_like(eyy)
+    return zeros, eyy, zeros
+
+
+def disk_field(N=200, extent=10.0, radius=9.0, center_strain=0.002, cap=0.05, dtype=np.float64):
+    """
+    Brasilianische Scheibe (diametrale Druckbelastung, ebener Spannungszustand, Flamant-Loesung).
+    Normiert auf die Kompression e_yy = center_strain im Mittelpunkt; ausserhalb der Scheibe NaN.
+    """
+    x = np.linspace(-extent, extent, N, dtype=dtype)
+    X, Y = np.meshgrid(x, x)
+    R = radius
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r1 = (X**2 + (R - Y)**2)**2
+        r2 = (X**2 + (R + Y)**2)**2
+        # Spannungen pro Einheit 2P/(pi t), Zug positiv
+        sxx = -((R - Y) * X**2 / r1 + (R + Y) * X**2 / r2 - 1 / (2 * R))
+        syy = -((R - Y)**3 / r1 + (R + Y)**3 / r2 - 1 / (2 * R))
+        sxy = (R - Y)**2 * X / r1 - (R + Y)**2 * X / r2
+    syy_center = -(2 / R - 1 / (2 * R))
+    scale = center_strain / -syy_center # Kompression positiv
+    inside = X**2 + Y**2 < R**2
+    exx, eyy, exy = (np.where(inside, np.clip(-s * scale, -cap, cap), np.nan) for s in (sxx, syy, sxy))
+    return exx, eyy, exy
+
+
+class StressOpticsEngine:
+    def __init__(self, n0=1.77, a0=0.4758, ratio_locked=2.0847, thickness_nm=5000000.0, dtype=np.float32):
+        """Material (Standard: Saphir), Locking-Verhaeltnis R/a und Probendicke in nm."""
+        engine = PhysicsEngine()
+        self.H_BAR_C = engine.H_BAR_C
+        self.K = engine.SCALING_FACTOR_K
+        self.n0 = n0
+        self.a0 = a0
+        self.ratio_locked = ratio_locked
+        self.thickness_nm = thickness_nm
+        self.dtype = dtype
+
+        self.Lambda0 = self.K * n0**2
+        # Index des unverzerrten Gitters (Geometric Locking, ~n0)
+        self.n_ref = float(np.sqrt(self.H_BAR_C / (ratio_locked * a0) / self.K))
+
+    def index_along(self, strain):
+        """Lambda und n fuer Kompression 'strain' entlang einer Hauptachse."""
+        a_local = self.a0 * (1.0 - strain)
+        Lambda = self.H_BAR_C / (self.ratio_locked * a_local)
+        return Lambda, np.sqrt(Lambda / self.K)
+
+    @staticmethod
+    def principal(exx, eyy, exy):
+        """Hauptverzerrungen e1 >= e2 und Winkel theta der e1-Achse zur x-Achse."""
+        mean = 0.5 * (exx + eyy)
+        rad = np.hypot(0.5 * (exx - eyy), exy)
+        theta = 0.5 * np.arctan2(2 * exy, exx - eyy)
+        return mean + rad, mean - rad, theta
+
+    def birefringence(self, exx, eyy, exy):
+        """
+        Delta n = n1 - n2 ohne Ausloeschung (wichtig in float32):
+        n_i = n_ref / sqrt(1 - e_i)  ->  Delta n = n_ref (e1 - e2) / ((s1 + s2) s1 s2), s_i = sqrt(1 - e_i).
+        """
+        mean = 0.5 * (exx + eyy)
+        rad = np.hypot(0.5 * (exx - eyy), exy)
+        s1 = np.sqrt(1.0 - (mean + rad))
+        s2 = np.sqrt(1.0 - (mean - rad))
+        return self.n_ref * 2.0 * rad / ((s1 + s2) * s1 * s2)
+
+    def index_fields(self, field):
+        """Alle Materialfelder eines 2D-Feldes (fuer Plots): dict mit e1, e2, theta, Lambda1/2, n1/2, delta_n."""
+        exx, eyy, exy = strain_components(field)
+        e1, e2, theta = self.principal(exx, eyy, exy)
+        Lambda1, n1 = self.index_along(e1)
+        Lambda2, n2 = self.index_along(e2)
+        return {"e1": e1, "e2": e2, "theta": theta, "Lambda1": Lambda1, "Lambda2": Lambda2,
+                "n1": n1, "n2": n2, "delta_n": self.birefringence(exx, eyy, exy)}
+
+    def retardation(self, delta_n, wavelengths_nm):
+        """Phasenverzoegerung delta = 2 pi t Delta n / lambda, Broadcast [..., L]."""
+        lam = np.asarray(wavelengths_nm, dtype=self.dtype)
+        return (2 * np.pi * self.thickness_nm) * np.asarray(delta_n, dtype=self.dtype)[..., None] / lam
+
+    def _intensity_block(self, exx, eyy, exy, lam, polariscope):
+        """Intensitaet [r, W, L] hinter dem Analysator fuer einen Zeilenblock (2D oder 3D)."""
+        exx, eyy, exy = (np.asarray(c, dtype=self.dtype) for c in (exx, eyy, exy))
+
+        if exx.ndim == 2:
+            half = 0.5 * self.retardation(self.birefringence(exx, eyy, exy), lam)
+            I = np.sin(half)**2
+            if polariscope == "plane":
+                theta = self.principal(exx, eyy, exy)[2]
+                I *= np.sin(2 * theta)[..., None]**2
+            return np.nan_to_num(I, copy=False)
+
+        # 3D: Jones-Kalkuel Scheibe fuer Scheibe (Hauptachsen duerfen entlang z drehen)
+        D = exx.shape[0]
+        slice_t = self.thickness_nm / D
+        shape = exx.shape[1:] + (len(lam),)
+        m00 = np.ones(shape, dtype=np.complex64)
+        m11 = np.ones(shape, dtype=np.complex64)
+        m01 = np.zeros(shape, dtype=np.complex64)
+        m10 = np.zeros(shape, dtype=np.complex64)
+        k = (2 * np.pi * slice_t / np.asarray(lam, dtype=self.dtype))
+        for d in range(D):
+            dn = self.birefringence(exx[d], eyy[d], exy[d])[..., None]
+            theta = self.principal(exx[d], eyy[d], exy[d])[2][..., None]
+            half = 0.5 * k * dn
+            c, s = np.cos(half), np.sin(half)
+            c2, s2 = np.cos(2 * theta), np.sin(2 * theta)
+            j00, j11 = c - 1j * s * c2, c + 1j * s * c2
+            j01 = -1j * s * s2
+            m00, m01, m10, m11 = (j00 * m00 + j01 * m10, j00 * m01 + j01 * m11,
+                                  j01 * m00 + j11 * m10, j01 * m01 + j11 * m11)
+
+        if polariscope == "plane":
+            amp = m10 # Polarisator x, Analysator y
+        else:
+            # Zirkular (Dunkelfeld): Eingang (1, i)/sqrt2, Analysator orthogonal
+            amp = 0.5 * ((m00 + 1j * m01) + 1j * (m10 + 1j * m11))
+        return np.nan_to_num(np.abs(amp)**2, copy=False).astype(self.dtype)
+
+    def _row_blocks(self, field, n_lambda):
+        exx, eyy, exy = strain_components(field)
+        H, W = exx.shape[-2:]
+        depth = exx.shape[0] if exx.ndim == 3 else 1
+        rows = max(1, CHUNK_ELEMENTS // (W * n_lambda * depth))
+        for r in range(0, H, rows):
+            sl = (Ellipsis, slice(r, r + rows), slice(None))
+            yield slice(r, r + rows), exx[sl], eyy[sl], exy[sl]
+
+    def intensity(self, field, wavelengths_nm, polariscope="circular"):
+        """Intensitaetsstapel [H, W, L] (float32) fuer alle Wellenlaengen, blockweise berechnet."""
+        if polariscope not in POLARISCOPES:
+            raise ValueError(f"Unknown polariscope '{polariscope}'. Available: {POLARISCOPES}")
+        lam = np.atleast_1d(np.asarray(wavelengths_nm, dtype=float))
+        exx = strain_components(field)[0]
+        out = np.empty(exx.shape[-2:] + (len(lam),), dtype=self.dtype)
+        for rows, bxx, byy, bxy in self._row_blocks(field, len(lam)):
+            out[rows] = self._intensity_block(bxx, byy, bxy, lam, polariscope)
+        return out
+
+    def render_rgb(self, field, wavelengths_nm=None, polariscope="circular", illuminant=None, exposure=1.0):
+        """
+        Farbige Isochromaten: Spektrum hinter dem Polariskop -> sRGB [H, W, 3] (float32, 0..1).
+        Pro Block wird das Spektrum sofort mit den CIE-Gewichten reduziert.
+        """
+        if polariscope not in POLARISCOPES:
+            raise ValueError(f"Unknown polariscope '{polariscope}'. Available: {POLARISCOPES}")
+        lam = visible_wavelengths() if wavelengths_nm is None else np.asarray(wavelengths_nm, dtype=float)
+        weights = rgb_weights(lam, illuminant) * np.float32(exposure)
+        exx = strain_components(field)[0]
+        out = np.empty(exx.shape[-2:] + (3,), dtype=np.float32)
+        for rows, bxx, byy, bxy in self._row_blocks(field, len(lam)):
+            out[rows] = encode_srgb(self._intensity_block(bxx, byy, bxy, lam, polariscope) @ weights)
+        return out
+
+
+class StrainPatch:
+    def __init__(self, rows, cols, field):
+        """Lokales Verzerrungs-Inkrement: field (exx, eyy, exy) gilt fuer den Ausschnitt [rows, cols]."""
+        self.rows = rows
+        self.cols = cols
+        self.components = strain_components(field)
+
+
+class IncrementalRenderer:
+    def __init__(self, engine, field, wavelengths_nm=None, polariscope="circular", tile=64, tol=1e-5,
+                 illuminant=None, exposure=1.0):
+        """
+        Haelt den aktuellen Verzerrungszustand und das sRGB-Frame [H, W, 3].
+        Eine Kachel wird neu gerechnet, sobald sich eine Komponente seit ihrem letzten Rendern
+        um mehr als tol geaendert hat (kleine Aenderungen summieren sich also nicht unbemerkt auf).
+        """
+        if polariscope not in POLARISCOPES:
+            raise ValueError(f"Unknown polariscope '{polariscope}'. Available: {POLARISCOPES}")
+        self.engine = engine
+        self.polariscope = polariscope
+        self.tile = tile
+        self.tol = tol
+        self.lam = visible_wavelengths() if wavelengths_nm is None else np.asarray(wavelengths_nm, dtype=float)
+        self.weights = rgb_weights(self.lam, illuminant) * np.float32(exposure)
+
+        self.strain = [np.array(c, dtype=engine.dtype) for c in strain_components(field)]
+        self.rendered = [c.copy() for c in self.strain] # Zustand beim letzten Rendern je Pixel
+        self.shape = self.strain[0].shape[-2:]
+        self.frame = np.empty(self.shape + (3,), dtype=np.float32)
+
+        self.n_tiles = -(-self.shape[0] // tile) * -(-self.shape[1] // tile)
+        self.tiles_rendered = 0
+        self._render(0, self.shape[0], 0, self.shape[1])
+        self.tiles_rendered = self.n_tiles
+
+    def _render(self, r0, r1, c0, c1):
+        sl = (Ellipsis, slice(r0, r1), slice(c0, c1))
+        I = self.engine._intensity_block(*(c[sl] for c in self.strain), self.lam, self.polariscope)
+        self.frame[r0:r1, c0:c1] = encode_srgb(I @ self.weights)
+        for cur, done in zip(self.strain, self.rendered):
+            done[sl] = cur[sl]
+
+    def refresh(self, rows=slice(None), cols=slice(None)):
+        """Rendert alle schmutzigen Kacheln, die den Ausschnitt [rows, cols] beruehren. Gibt ihre Anzahl zurueck."""
+        H, W, t = self.shape[0], self.shape[1], self.tile
+        r_start, r_stop, _ = rows.indices(H)
+        c_start, c_stop, _ = cols.indices(W)
+        if r_stop <= r_start or c_stop <= c_start:
+            return 0
+        r0, r1 = r_start // t * t, min(H, -(-r_stop // t) * t)
+        c0, c1 = c_start // t * t, min(W, -(-c_stop // t) * t)
+
+        sl = (Ellipsis, slice(r0, r1), slice(c0, c1))
+        diff = np.zeros((r1 - r0, c1 - c0), dtype=self.engine.dtype)
+        for cur, done in zip(self.strain, self.rendered):
+            d = np.abs(cur[sl] - done[sl])
+            np.fmax(diff, d.max(axis=0) if d.ndim == 3 else d, out=diff)
+        tile_diff = np.maximum.reduceat(np.maximum.reduceat(diff, np.arange(0, r1 - r0, t), axis=0),
+                                        np.arange(0, c1 - c0, t), axis=1)
+
+        dirty = np.argwhere(tile_diff > self.tol)
+        for i, j in dirty:
+            tr, tc = r0 + i * t, c0 + j * t
+            self._render(tr, min(tr + t, H), tc, min(tc + t, W))
+        self.tiles_rendered += len(dirty)
+        return len(dirty)
+
+    def apply(self, increment):
+        """Addiert ein Inkrement (volles Feld oder StrainPatch) und aktualisiert das Frame."""
+        if isinstance(increment, StrainPatch):
+            sl = (Ellipsis, increment.rows, increment.cols)
+            for cur, d in zip(self.strain, increment.components):
+                cur[sl] += d
+            return self.refresh(increment.rows, increment.cols)
+        for cur, d in zip(self.strain, strain_components(increment)):
+            cur += d
+        return self.refresh()
+
+    def stream(self, increments):
+        """
+        Belastungssequenz als Frame-Strom: liefert (step, frame, n_dirty) fuer den aktuellen Zustand
+        und nach jedem Inkrement. 'frame' wird wiederverwendet -> sofort weiterverarbeiten/kopieren.
+        """
+        yield 0, self.frame, 0
+        for step, inc in enumerate(increments, start=1):
+            yield step, self.frame, self.apply(inc)
+
+    def set_field(self, field):
+        """Setzt einen absoluten Verzerrungszustand (z.B. aus einer Datei-Sequenz)."""
+        for cur, new in zip(self.strain, strain_components(field)):
+            cur[...] = new
+        return self.refresh()
+
+
+class FrameWriter:
+    def __init__(self, path, fps=30):
+        """
+        Schreibt Frames als Strom: '*.mp4' ueber eine ffmpeg-Pipe (falls installiert),
+        sonst als PNG-Sequenz im Verzeichnis '<name>_frames/'.
+        """
+        self.path = path
+        self.fps = fps
+        self.count = 0
+        self._proc = None
+        self._ffmpeg = shutil.which("ffmpeg") if path.endswith(".mp4") else None
+        if not self._ffmpeg:
+            self.path = os.path.splitext(path)[0] + "_frames"
+            os.makedirs(self.path, exist_ok=True)
+
+    def write(self, frame):
+        """frame: RGB [H, W, 3] als float in [0, 1] oder bereits als uint8."""
+        rgb8 = frame if frame.dtype == np.uint8 else (np.clip(frame, 0.0, 1.0) * 255 + 0.5).astype(np.uint8)
+        if self._ffmpeg:
+            if self._proc is None:
+                h, w = rgb8.shape[:2]
+                cmd = [self._ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                       "-s", f"{w}x{h}", "-r", str(self.fps), "-i", "-",
+                       "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-c:v", "libx264", "-pix_fmt", "yuv420p", self.path]
+                self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+            self._proc.stdin.write(rgb8.tobytes())
+        else:
+            from PIL import Image
+            # Fast compression: frame sequences are intermediate output
+            Image.fromarray(rgb8).save(os.path.join(self.path, f"frame_{self.count:05d}.png"), compress_level=1)
+        self.count += 1
+
+    def close(self):
+        if self._proc is not None:
+            self._proc.stdin.close()
+            self._proc.wait()
+            self._proc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
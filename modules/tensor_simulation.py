@@ -17,6 +17,8 @@ class BirefringentMaterial:
         We calculate gamma_eff separately for O and E axes.
         """
         self.name = name
+        self.sellmeier_o = tuple(n_o_params)
+        self.sellmeier_e = tuple(n_e_params)
         
         # Physics Constants
         c = 3e8
@@ -41,6 +43,26 @@ class BirefringentMaterial:
         # We will assume m_Phi is the average, but coupling gamma differs.
         self.m_Phi_mean = (omega_o + omega_e) / 2
 
+    @staticmethod
+    def _sellmeier(params, lam_um):
+        # Single-pole Sellmeier: n^2 = 1 + B*L^2 / (L^2 - C), L in micron
+        B, C = params
+        L2 = np.asarray(lam_um, dtype=float)**2
+        return np.sqrt(1 + B * L2 / (L2 - C))
+
+    def n_o(self, lam_um):
+        """Ordinary index (polarization perpendicular to c)."""
+        return self._sellmeier(self.sellmeier_o, lam_um)
+
+    def n_e(self, lam_um):
+        """Extraordinary index (polarization parallel to c)."""
+        return self._sellmeier(self.sellmeier_e, lam_um)
+
+    @property
+    def key(self):
+        """Hashable identity of the optical parameters (for memoization)."""
+        return (self.name, self.sellmeier_o, self.sellmeier_e)
+
 # Sapphire Data (approx UV pole)
 # Ordinary: B=1.43, C=0.072^2
 # Extraordinary: B=1.50, C=0.074^2 (Sapphire is negative unixial n_e < n_o? Check data)
@@ -50,6 +72,20 @@ sapphire = BirefringentMaterial("Sapphire",
                                n_e_params=(1.327, 0.0740**2)) # Hypothetical E-ray data close to O
 
 # --- 2. Simulation Logic ---
+def integrate_langevin(xi_scaled, gamma_damping, m_phi, dt):
+    """Scalar field phi driven by the scaled noise: phi'' = xi - gamma * phi' - m^2 * phi (per sample)."""
+    N = len(xi_scaled)
+    phi_scaled = np.zeros(N)
+    v = 0
+    x = 0
+    
+    for i in range(1, N):
+        acc = xi_scaled[i] - gamma_damping * v - m_phi**2 * x
+        v += acc * dt
+        x += v * dt
+        phi_scaled[i] = x
+    return phi_scaled
+
 def run_tensor_simulation():
     print(f"Initializing Anisotropic Simulation for {sapphire.name}...")
     
@@ -72,16 +108,8 @@ def run_tensor_simulation():
     # Scaled noise
     xi_scaled = np.random.normal(0, 1.0 * SCALE, N)
     
-    phi_scaled = np.zeros(N)
-    v = 0
-    x = 0
     dt = 1/fs
-    
-    for i in range(1, N):
-        acc = xi_scaled[i] - gamma_damping * v - m_phi**2 * x
-        v += acc * dt
-        x += v * dt
-        phi_scaled[i] = x
+    phi_scaled = integrate_langevin(xi_scaled, gamma_damping, m_phi, dt)
         
     phi_fluct = phi_scaled / SCALE
     
@@ -1,147 +1,135 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation, PillowWriter, FFMpegWriter
-from itertools import combinations
+from matplotlib.animation import FuncAnimation
+from matplotlib.collections import LineCollection
 import os
-
-# Configure FFmpeg Path explicitly
-ffmpeg_path = r"C:\Users\Moritz\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_Microsoft.Winget.Source_8wekyb3d8bbwe\ffmpeg-8.0.1-full_build\bin\ffmpeg.exe"
-plt.rcParams['animation.ffmpeg_path'] = ffmpeg_path
-
-# --- 1. Tesserakt Geometrie (4D) ---
-def create_tesseract():
-    # Ein Tesserakt hat 16 Ecken (+/-1, +/-1, +/-1, +/-1)
-    points = []
-    for x in [-1, 1]:
-        for y in [-1, 1]:
-            for z in [-1, 1]:
-                for w in [-1, 1]:
-                    points.append([x, y, z, w])
-    return np.array(points)
-
-# Verbindungen (Kanten) zwischen den Ecken
-def get_edges(points):
-    edges = []
-    # Zwei Punkte sind verbunden, wenn sie sich nur in 1 Koordinate unterscheiden
-    for i, p1 in enumerate(points):
-        for j, p2 in enumerate(points):
-            if i < j:
-                diff = np.sum(np.abs(p1 - p2))
-                if np.isclose(diff, 2): # Abstand 2 bedeutet, nur 1 Koordinate ist anders
-                    edges.append((i, j))
-    return edges
-
-# --- 2. 4D Rotations-Matrizen ---
-def rotate_xw(theta):
-    c, s = np.cos(theta), np.sin(theta)
-    return np.array([
-        [c, 0, 0, -s],
-        [0, 1, 0, 0],
-        [0, 0, 1, 0],
-        [s, 0, 0, c]
-    ])
-
-def rotate_zw(theta):
-    c, s = np.cos(theta), np.sin(theta)
-    return np.array([
-        [1, 0, 0, 0],
-        [0, 1, 0, 0],
-        [0, 0, c, -s],
-        [0, 0, s, c]
-    ])
-
-# --- 3. Projektion 4D -> 3D ---
-# Stereographische oder einfache perspektivische Projektion
-def project_4d_to_3d(points_4d, d=2):
-    points_3d = []
-    for p in points_4d:
-        w = p[3]
-        scale = 1 / (d - w) if d != w else 1
-        points_3d.append(p[:3] * scale) # x, y, z skaliert
-    return np.array(points_3d)
-
-# --- 4. Projektion 3D -> 2D (für den Bildschirm) ---
-def project_3d_to_2d(points_3d):
-    return points_3d[:, :2] # Einfach x, y nehmen (orthographisch)
-
-# --- 5. Animation ---
-fig, ax = plt.subplots(figsize=(8, 8))
-ax.set_xlim(-2, 2)
-ax.set_ylim(-2, 2)
-ax.set_aspect('equal')
-ax.axis('off') # Kein Rahmen, nur reine Geometrie
-plt.title("Schatten der 5. Dimension: Tesserakt -> Hexagon", fontsize=14)
-
-tesseract_points = create_tesseract()
-edges = get_edges(tesseract_points)
-
-# Linien-Objekte für den Plot
-lines = [ax.plot([], [], 'k-', alpha=0.6, linewidth=1.5)[0] for _ in edges]
-points_plot, = ax.plot([], [], 'ro', markersize=4)
-
-def update(frame):
-    angle = frame * 0.02
-    
-    # 1. Rotation im 4D Raum (Das ist die "Physik" der 5. Dimension)
-    # Wir rotieren in zwei Ebenen gleichzeitig für komplexe Schatten
-    rotated_points = tesseract_points @ rotate_xw(angle).T @ rotate_zw(angle * 0.5).T
-    
-    # 2. Projektion auf 3D (Der Übergang in unsere Welt)
-    projected_3d = project_4d_to_3d(rotated_points, d=3)
-    
-    # 3. Drehung des 3D-Objekts (Kamera-Perspektive)
-    # Wir schauen "Kante-voran" (Edge-First) um Hexagone zu sehen
-    # Das simulieren wir durch Projektion auf 2D
-    projected_2d = project_3d_to_2d(projected_3d)
-    
-    # Zeichnen
-    points_plot.set_data(projected_2d[:, 0], projected_2d[:, 1])
-    
-    for line, edge in zip(lines, edges):
-        p1 = projected_2d[edge[0]]
-        p2 = projected_2d[edge[1]]
-        line.set_data([p1[0], p2[0]], [p1[1], p2[1]])
-        
-        # Farbe je nach "Tiefe" (w-Koordinate) ändern
-        # Das visualisiert die 4. Dimension durch Farbe
-        depth = rotated_points[edge[0], 3]
-        color_val = (depth + 1.5) / 3 # Normalisieren 0..1
-        color_val = np.clip(color_val, 0, 1)
-        line.set_color(plt.cm.viridis(color_val))
-
-    return lines + [points_plot]
-
-def init():
-    """Initialize animation state - ensures animation starts from frame 0."""
-    points_plot.set_data([], [])
-    for line in lines:
-        line.set_data([], [])
-    return lines + [points_plot]
-
-print("Generiere Animation... (Das kann paar Sekunden dauern)")
-anim = FuncAnimation(fig, update, frames=200, interval=20, blit=True, init_func=init)
-
-# Save as GIF for documentation
-try:
-    anim.save('tesseract_projection.gif', writer='pillow', fps=30)
-    print("Animation saved to 'tesseract_projection.gif'")
-except Exception as e:
-    print(f"Could not save GIF: {e}")
-
-# Save as MP4
-try:
-    anim.save('tesseract_projection.mp4', writer=FFMpegWriter(fps=30), dpi=100)
-    print("Animation saved to 'tesseract_projection.mp4'")
-except Exception as e:
-    print(f"Could not save MP4: {e}")
-
-print("Beobachte: In bestimmten Winkeln formt der Schatten ein perfektes HEXAGON.")
-print("Das ist der Moment, in dem die 5D-Geometrie als Graphen-Gitter sichtbar wird.")
-
+import shutil
 import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.hypercube import HypercubeView
+from modules.line_raster import LineRasterizer, depth_palette
+from modules.stress_optics import FrameWriter
+
+"""
+Module: tesseract_projection.py
+Zweck: Animation des Schattens eines rotierenden Tesserakts (bzw. N-Wuerfels, --dim N).
+Ablauf:
+    Die Frames werden offscreen gerastert (line_raster.py) und in einem einzigen Durchlauf an
+    die Encoder gestreamt: GIF (Palettenbilder, Dokumentation) und MP4 (ffmpeg-Pipe, falls ffmpeg
+    im PATH liegt). Das interaktive Fenster (ohne --batch) nutzt matplotlib mit einer LineCollection.
+Optionen: --dim N, --frames N, --size BxH (z.B. 1920x1080)
+"""
+
+ANGLE_STEP = 0.02   # Rotationswinkel pro Frame
+GIF_MAX_SIZE = 800  # GIF fuer die Doku: laengere Seite hoechstens 800 px
+GIF_MAX_FRAMES = 200
+
+
+def _title(dim):
+    return ("Schatten der 5. Dimension: Tesserakt -> Hexagon" if dim == 4 else
+            f"Schatten der 5. Dimension: {dim}D-Hyperwuerfel")
+
+
+def render_animation(dim=4, frames=200, size=(800, 800), fps=30,
+                     gif_path="tesseract_projection.gif", mp4_path="tesseract_projection.mp4"):
+    """Rastert alle Frames einmal und schreibt GIF und MP4 gleichzeitig."""
+    width, height = size
+    view = HypercubeView(dim, distance=3.0)
+    palette, first = depth_palette("viridis", alpha=0.6)
+    n_colors = 256 - first
+    raster = LineRasterizer(width, height, extent=(-2, 2, -2, 2),
+                            line_width=max(1, round(2 * height / 800)), point_radius=2.5 * height / 800)
+    raster.set_title(_title(dim))
+
+    video = None
+    if mp4_path and shutil.which("ffmpeg"):
+        video = FrameWriter(mp4_path, fps)
+    elif mp4_path:
+        print("ffmpeg not found in PATH - skipping MP4.")
+
+    gif_step = max(1, int(np.ceil(max(width, height) / GIF_MAX_SIZE)))
+    gif_frames = []
+
+    print(f"Generiere Animation ({frames} Frames, {width}x{height}, {dim}D)...")
+    t0 = time.perf_counter()
+    for frame in range(frames):
+        xy, depth = view.project(frame * ANGLE_STEP)
+        edge_depth = depth[view.edges[:, 0]]
+
+        # Farbe je nach "Tiefe" (hoechste Koordinate): visualisiert die 4. Dimension
+        level = np.clip((edge_depth + view.depth_range) / (2 * view.depth_range), 0, 1)
+        colors = first + np.rint(level * (n_colors - 1)).astype(np.uint8)
+        indexed = raster.render(xy[view.edges], colors, edge_depth, points=xy)
+
+        if video is not None:
+            video.write(raster.to_rgb(palette))
+        if gif_path and frame < GIF_MAX_FRAMES:
+            gif_frames.append(indexed[::gif_step, ::gif_step].copy())
+    render_seconds = time.perf_counter() - t0
+
+    if video is not None:
+        video.close()
+        print(f"Animation saved to '{mp4_path}'")
+
+    if gif_path and gif_frames:
+        from PIL import Image
+        images = [Image.fromarray(f) for f in gif_frames]
+        for im in images:
+            im.putpalette(palette.tobytes()) # L -> P: Indizes bleiben, keine Quantisierung
+        # optimize=False: die Palette ist bereits fest, Pillows Paletten-Kompaktierung je Frame entfaellt
+        images[0].save(gif_path, save_all=True, append_images=images[1:], duration=int(1000 / fps), loop=0,
+                       optimize=False)
+        print(f"Animation saved to '{gif_path}'")
+
+    print(f"Rendering: {render_seconds:.2f} s ({frames / render_seconds:.0f} Frames/s), "
+          f"gesamt {time.perf_counter() - t0:.2f} s")
+
+
+def show_interactive(dim=4):
+    """Interaktives Fenster: alle Kanten als eine LineCollection, ein Update pro Frame."""
+    view = HypercubeView(dim, distance=3.0)
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.set_xlim(-2, 2)
+    ax.set_ylim(-2, 2)
+    ax.set_aspect('equal')
+    ax.axis('off') # Kein Rahmen, nur reine Geometrie
+    plt.title(_title(dim), fontsize=14)
+
+    # Farbe = "Tiefe" in der hoechsten Dimension
+    lines = LineCollection([], cmap='viridis', norm=plt.Normalize(-view.depth_range, view.depth_range),
+                           alpha=0.6, linewidths=1.5)
+    ax.add_collection(lines)
+    points_plot, = ax.plot([], [], 'ro', markersize=4)
+
+    def update(frame):
+        # Rotation im N-dimensionalen Raum + Projektion auf den Bildschirm (eine Matrixoperation)
+        xy, depth = view.project(frame * ANGLE_STEP)
+        points_plot.set_data(xy[:, 0], xy[:, 1])
+        lines.set_segments(xy[view.edges])
+        lines.set_array(depth[view.edges[:, 0]])
+        return [lines, points_plot]
+
+    anim = FuncAnimation(fig, update, frames=200, interval=20, blit=True)
+    plt.show()
+    return anim
+
+
+def _arg(flag, default):
+    return sys.argv[sys.argv.index(flag) + 1] if flag in sys.argv else default
+
 
 if __name__ == "__main__":
+    dim = int(_arg("--dim", 4))
+    frames = int(_arg("--frames", 200))
+    size = tuple(int(v) for v in _arg("--size", "800x800").lower().split("x"))
+
+    render_animation(dim, frames, size)
+    print("Beobachte: In bestimmten Winkeln formt der Schatten ein perfektes HEXAGON.")
+    print("Das ist der Moment, in dem die 5D-Geometrie als Graphen-Gitter sichtbar wird.")
+
     if "--batch" not in sys.argv:
-        plt.show()
+        show_interactive(dim)
     else:
         print("Batch mode: Skipping window display.")
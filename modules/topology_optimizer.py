@@ -0,0 +1,243 @@
+import numpy as np
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from scipy.optimize import minimize
+from scipy.stats import qmc
+
+"""
+Module: topology_optimizer.py
+Zweck: Erweiterbarer Optimierer fuer N-Parameter Gitterbeschreibungen
+       (Gitterkonstante, mehrere Twist-Lagen, Strain, Stacking).
+       Verallgemeinert quantum_tob_optimizer.effective_mass_cost (nur a, twist).
+
+Design:
+  - LatticeDesignSpace: benannte Parameter + Grenzen -> Spalten im Vektor X.
+  - Objectives: vektorisiert, f(X[N, P], space) -> cost[N]. Registriert in OBJECTIVES.
+  - EvaluationCache: Schluessel = (Objective, Design-Raum, gerundeter Parametervektor),
+    bereits besuchte Designs werden nie neu berechnet.
+  - multi_start_optimize: Sobol-Startpunkte, lokale Verfeinerung (L-BFGS-B)
+    parallel in einem Process-Pool.
+"""
+
+class LatticeDesignSpace:
+    def __init__(self, n_layers=1, strain=False, stacking=False,
+                 a_bounds=(0.2, 2.0), twist_bounds=(0.0, 2 * np.pi),
+                 strain_bounds=(-0.05, 0.05), stacking_bounds=(0.0, 1.0)):
+        """
+        Baut den Parametervektor auf:
+        [a, twist_1 ... twist_L, (strain), (stacking)]
+        n_layers=1 ohne Strain/Stacking entspricht exakt dem alten (a, twist) Modell.
+        """
+        self.names = ["a"]
+        self.bounds = [tuple(a_bounds)]
+
+        for i in range(n_layers):
+            self.names.append(f"twist_{i + 1}")
+            self.bounds.append(tuple(twist_bounds))
+
+        if strain:
+            self.names.append("strain")
+            self.bounds.append(tuple(strain_bounds))
+        if stacking:
+            self.names.append("stacking")
+            self.bounds.append(tuple(stacking_bounds))
+
+        self.n_layers = n_layers
+
+    @property
+    def dim(self):
+        return len(self.names)
+
+    def index(self, name):
+        return self.names.index(name)
+
+    def column(self, X, name, default=0.0):
+        """Liefert die Spalte 'name' aus X[N, P] oder einen Default, falls nicht Teil des Designs."""
+        if name in self.names:
+            return X[:, self.index(name)]
+        return np.full(X.shape[0], default)
+
+    def twists(self, X):
+        """Alle Twist-Spalten als Matrix [N, L]."""
+        cols = [self.index(f"twist_{i + 1}") for i in range(self.n_layers)]
+        return X[:, cols]
+
+    def lower(self):
+        return np.array([b[0] for b in self.bounds])
+
+    def upper(self):
+        return np.array([b[1] for b in self.bounds])
+
+
+# --- 1. OBJECTIVES (vektorisiert) ---
+
+def r5d_multilayer(X, space):
+    """
+    Verallgemeinerter 5D-Radius:
+    R_5D = a_eff * (1 + 2 * <sin^2(theta_i)>) * S(stacking)
+    a_eff = a * (1 + strain), S = 1 + 0.5 * sin^2(pi * s)  (AA: s=0, AB: s=1/3, ...)
+    """
+    a = space.column(X, "a")
+    a_eff = a * (1.0 + space.column(X, "strain"))
+    twist_term = 1.0 + 2.0 * np.mean(np.sin(space.twists(X))**2, axis=1)
+    stacking_term = 1.0 + 0.5 * np.sin(np.pi * space.column(X, "stacking"))**2
+    return a_eff * twist_term * stacking_term
+
+def effective_mass_objective(X, space):
+    """Geometrischer Widerstand m_eff ~ 1/R_5D (Supraleitung = Minimum)."""
+    return 1.0 / (r5d_multilayer(X, space) + 1e-9)
+
+def locking_objective(X, space, target_ratio=2.0):
+    """Abstand des Verhaeltnisses R_5D/a zur naechsten Locking-Harmonischen."""
+    ratio = r5d_multilayer(X, space) / space.column(X, "a")
+    return (ratio - target_ratio * np.round(ratio / target_ratio))**2
+
+OBJECTIVES = {
+    "effective_mass": effective_mass_objective,
+    "locking": locking_objective,
+}
+
+def register_objective(name, func):
+    """Fuegt ein vektorisiertes Objective f(X[N, P], space) -> cost[N] hinzu."""
+    OBJECTIVES[name] = func
+
+
+# --- 2. EVALUATION CACHE ---
+
+class EvaluationCache:
+    def __init__(self, decimals=6):
+        """
+        Speichert Kosten unter (Objective-Name, Parameternamen, Grenzen, gerundeter Parametervektor).
+        Derselbe Cache kann so fuer mehrere Objectives / Design-Raeume genutzt werden,
+        ohne Kosten des einen fuer das andere zu liefern.
+        """
+        self.decimals = decimals
+        self.store = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def context(objective_name, space):
+        return (objective_name, tuple(space.names), tuple(space.bounds))
+
+    def key(self, x, context=()):
+        return context + tuple(np.round(np.asarray(x, dtype=float), self.decimals).tolist())
+
+    def evaluate(self, objective, X, space, objective_name):
+        """Bewertet X[N, P]; nur unbekannte Zeilen gehen an das Objective (als ein Batch)."""
+        X = np.atleast_2d(X)
+        context = self.context(objective_name, space)
+        keys = [self.key(x, context) for x in X]
+        costs = np.empty(len(keys))
+
+        todo = {}
+        for i, k in enumerate(keys):
+            if k in self.store:
+                costs[i] = self.store[k]
+                self.hits += 1
+            else:
+                todo.setdefault(k, []).append(i)
+
+        if todo:
+            rows = [idx[0] for idx in todo.values()]
+            fresh = objective(X[rows], space)
+            for (k, idx), val in zip(todo.items(), fresh):
+                self.store[k] = float(val)
+                costs[idx] = val
+            self.misses += len(todo)
+
+        return costs
+
+    def update(self, entries):
+        self.store.update(entries)
+
+    def __len__(self):
+        return len(self.store)
+
+
+# --- 3. MULTI-START REFINEMENT ---
+
+def _refine_start(args):
+    """
+    Worker: lokale L-BFGS-B Verfeinerung eines Startpunkts. Muss picklebar bleiben.
+    Das Objective kommt als Callable im Job mit: bei 'spawn' (Windows/macOS) existieren
+    per register_objective hinzugefuegte Eintraege in OBJECTIVES der Worker nicht.
+    """
+    objective_name, objective, space, x0, decimals, known, maxiter = args
+
+    cache = EvaluationCache(decimals)
+    cache.update(known)
+
+    def fun(x):
+        return cache.evaluate(objective, x[None, :], space, objective_name)[0]
+
+    # Finite-Differenzen-Schritt deutlich groesser als die Cache-Rundung,
+    # sonst fallen Nachbarpunkte auf denselben Schluessel (Gradient = 0).
+    res = minimize(fun, x0, method="L-BFGS-B", bounds=space.bounds,
+                   options={"maxiter": maxiter, "eps": 10.0**(2 - decimals)})
+
+    visited = {k: v for k, v in cache.store.items() if k not in known}
+    return res.x, float(res.fun), visited, cache.hits
+
+def multi_start_optimize(space, objective="effective_mass", n_starts=32, workers=None,
+                         decimals=6, maxiter=200, seed=42, cache=None):
+    """
+    Sobol-Startpunkte + parallele lokale Verfeinerung.
+    workers=1 laeuft ohne Process-Pool (z.B. fuer interaktive Sessions).
+    Gibt (best_x, best_cost, results, cache) zurueck; results ist nach Kosten sortiert.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unbekanntes Objective '{objective}'. Verfuegbar: {sorted(OBJECTIVES)}")
+    cache = cache if cache is not None else EvaluationCache(decimals)
+
+    sampler = qmc.Sobol(d=space.dim, seed=seed)
+    starts = qmc.scale(sampler.random(n_starts), space.lower(), space.upper())
+
+    # Alle Startpunkte in einem Batch vorab bewerten (fuellt den Cache)
+    cache.evaluate(OBJECTIVES[objective], starts, space, objective)
+
+    known = dict(cache.store)
+    jobs = [(objective, OBJECTIVES[objective], space, x0, decimals, known, maxiter) for x0 in starts]
+
+    if workers == 1:
+        outcomes = [_refine_start(job) for job in jobs]
+    else:
+        workers = workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_refine_start, jobs))
+
+    results = []
+    for x, cost, visited, hits in outcomes:
+        cache.update(visited)
+        cache.hits += hits
+        results.append((x, cost))
+    results.sort(key=lambda r: r[1])
+
+    best_x, best_cost = results[0]
+    return best_x, best_cost, results, cache
+
+
+def run_multilayer_optimization(n_layers=3, workers=None):
+    print("--- Multi-Parameter Topology Optimization ---")
+    space = LatticeDesignSpace(n_layers=n_layers, strain=True, stacking=True)
+    print(f"Design-Raum ({space.dim} Parameter): {', '.join(space.names)}")
+
+    best_x, best_cost, results, cache = multi_start_optimize(space, workers=workers)
+
+    print("\nOPTIMALES DESIGN GEFUNDEN:")
+    for name, val in zip(space.names, best_x):
+        if name.startswith("twist"):
+            print(f"{name:<10}: {val:.4f} rad ({np.degrees(val):.1f}°)")
+        else:
+            print(f"{name:<10}: {val:.4f}")
+    print(f"Effektive Masse: {best_cost:.4f} (Relativ)")
+    print(f"Cache: {len(cache)} Designs, {cache.hits} Treffer")
+    print("-" * 40)
+    return best_x, best_cost
+
+if __name__ == "__main__":
+    layers = 3
+    if "--layers" in sys.argv:
+        layers = int(sys.argv[sys.argv.index("--layers") + 1])
+    run_multilayer_optimization(n_layers=layers)
@@ -0,0 +1,170 @@
+import numpy as np
+
+"""
+Module: trajectory_store.py
+Zweck: Kompakter Speicher fuer Strahl- und Teilchenbahnen.
+       Statt Python-Listen (path_x.append) oder dichter solve_ivp-Arrays werden die Zustaende
+       aller Strahlen in vorallokierten float32-Bloecken [chunk, N, C] abgelegt.
+       - stride:   nur jeder k-te Schritt wird gespeichert (Dezimierung beim Schreiben)
+       - capacity: Ring-Modus, nur die letzten 'capacity' Samples bleiben erhalten
+       - simplify: Douglas-Peucker-Dezimierung einer Bahn auf Abruf
+       - resample: Dense-Output-Interpolation (kubisch Hermite mit gespeicherten v, sonst linear)
+       Speicherbedarf: N * S * C * 4 Byte, z.B. 100k Strahlen x 100 Samples x (x, y) = 80 MB.
+"""
+
+
+def hermite_eval(s, h, p0, v0, p1, v1):
+    """Kubische Hermite-Interpolation bei s in [0, 1] (Schrittweite h). Liefert (Position, Geschwindigkeit)."""
+    s2, s3 = s * s, s * s * s
+    p = (2*s3 - 3*s2 + 1) * p0 + (s3 - 2*s2 + s) * h * v0 + (3*s2 - 2*s3) * p1 + (s3 - s2) * h * v1
+    v = (6*s2 - 6*s) / h * (p0 - p1) + (3*s2 - 4*s + 1) * v0 + (3*s2 - 2*s) * v1
+    return p, v
+
+
+def douglas_peucker(points, tolerance):
+    """Indizes der Stuetzpunkte, die die Polylinie points[K, 2] bis auf 'tolerance' wiedergeben."""
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    if n < 3:
+        return np.arange(n)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b <= a + 1:
+            continue
+        seg = points[b] - points[a]
+        rel = points[a + 1:b] - points[a]
+        length = np.hypot(seg[0], seg[1])
+        if length == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / length
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            m = a + 1 + k
+            keep[m] = True
+            stack.append((a, m))
+            stack.append((m, b))
+    return np.flatnonzero(keep)
+
+
+class TrajectoryStore:
+    def __init__(self, n_rays=1, n_components=4, chunk_size=1024, stride=1, capacity=None, dtype=np.float32):
+        """
+        n_rays:       Anzahl gleichzeitig gespeicherter Strahlen N
+        n_components: Zustandskomponenten C, z.B. 2 (x, y) oder 4 (x, y, vx, vy)
+        chunk_size:   Samples pro vorallokiertem Block (waechst blockweise)
+        stride:       nur jeder stride-te append() wird gespeichert
+        capacity:     Ring-Modus mit fester Laenge (None = unbegrenzt, blockweise)
+        """
+        self.n_rays = n_rays
+        self.n_components = n_components
+        self.stride = max(1, int(stride))
+        self.capacity = capacity
+        self.chunk_size = capacity if capacity is not None else chunk_size
+        self.dtype = dtype
+
+        self._chunks = []   # Zustaende [chunk_size, N, C]
+        self._times = []    # Zeiten [chunk_size] (float64)
+        self._calls = 0
+        self._written = 0   # Anzahl geschriebener Samples (inkl. im Ring ueberschriebener)
+        self.ends = np.zeros(n_rays, dtype=np.int64)  # Strahl i ist gueltig bis Sample ends[i]
+
+    def __len__(self):
+        return self._written if self.capacity is None else min(self._written, self.capacity)
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes + t.nbytes for c, t in zip(self._chunks, self._times))
+
+    def append(self, t, states, active=None, force=False):
+        """
+        Speichert die Zustaende states[N, C] zur Zeit t (ausser bei stride-Dezimierung).
+        active: Maske der Strahlen, die noch laufen; eingefrorene Strahlen enden beim letzten Sample.
+        force:  Sample unabhaengig vom stride speichern (z.B. Endzustand).
+        Gibt True zurueck, wenn gespeichert wurde.
+        """
+        call = self._calls
+        self._calls += 1
+        if not force and call % self.stride:
+            return False
+
+        slot = self._written if self.capacity is None else self._written % self.capacity
+        chunk, row = divmod(slot, self.chunk_size)
+        if chunk == len(self._chunks):
+            self._chunks.append(np.empty((self.chunk_size, self.n_rays, self.n_components), dtype=self.dtype))
+            self._times.append(np.empty(self.chunk_size))
+        self._chunks[chunk][row] = np.reshape(states, (self.n_rays, self.n_components))
+        self._times[chunk][row] = t
+        self._written += 1
+
+        if active is None:
+            self.ends[:] = self._written
+        else:
+            self.ends[active] = self._written
+        return True
+
+    def _ordered(self, blocks):
+        """Blockliste -> zeitlich geordnetes Array (View, wenn nur ein Block im Einsatz ist)."""
+        n = len(self)
+        if not blocks:
+            return None
+        if self.capacity is not None:
+            buf = blocks[0]
+            if self._written <= self.capacity:
+                return buf[:n]
+            start = self._written % self.capacity
+            return np.concatenate((buf[start:], buf[:start]))
+        if len(blocks) == 1:
+            return blocks[0][:n]
+        return np.concatenate(blocks)[:n]
+
+    def _ray_range(self, i):
+        """Gueltige Samples von Strahl i als Slice in der geordneten Sicht."""
+        first = self._written - len(self)
+        return slice(0, max(0, int(self.ends[i]) - first))
+
+    def times(self, i=None):
+        t = self._ordered(self._times)
+        if t is None:
+            return np.empty(0)
+        return t if i is None else t[self._ray_range(i)]
+
+    def states(self, i=None):
+        """Alle Zustaende [S, N, C] oder die gueltigen Zustaende von Strahl i [S_i, C]."""
+        s = self._ordered(self._chunks)
+        if s is None:
+            return np.empty((0, self.n_rays, self.n_components), dtype=self.dtype)
+        return s if i is None else s[self._ray_range(i), i]
+
+    def simplify(self, i, tolerance):
+        """Douglas-Peucker-Dezimierung der (x, y)-Bahn von Strahl i. Liefert (t, states)."""
+        t, s = self.times(i), self.states(i)
+        idx = douglas_peucker(s[:, :2], tolerance)
+        return t[idx], s[idx]
+
+    def resample(self, i, t_new):
+        """
+        Zustand von Strahl i zu beliebigen Zeiten t_new (float64).
+        Mit gespeicherten Geschwindigkeiten (C >= 4) kubisch Hermite, sonst linear.
+        """
+        t, s = self.times(i), self.states(i).astype(float)
+        t_new = np.clip(np.asarray(t_new, dtype=float), t[0], t[-1])
+        if len(t) < 2:
+            return np.repeat(s[:1], len(t_new), axis=0)
+
+        k = np.clip(np.searchsorted(t, t_new, side="right") - 1, 0, len(t) - 2)
+        h = (t[k + 1] - t[k])[:, None]
+        u = (t_new - t[k])[:, None] / h
+        a, b = s[k], s[k + 1]
+        if self.n_components < 4:
+            return a + u * (b - a)
+
+        p, v = hermite_eval(u, h, a[:, 0:2], a[:, 2:4], b[:, 0:2], b[:, 2:4])
+        out = a + u * (b - a) # weitere Komponenten linear
+        out[:, 0:2] = p
+        out[:, 2:4] = v
+        return out